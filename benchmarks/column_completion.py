@@ -0,0 +1,162 @@
+"""
+Times ranking completions for a table column (matching.py) per keystroke, with a
+column of last names plus many more carried over from earlier seasons, against
+QCompleter filtering the same names as a string list. Then checks the ranking
+(prefix, then word start, then subsequence, the most used first) and types into a
+coach kind editor offscreen: "hdc" pops up "Head Coach", "ass" completes inline.
+
+run from the repo root:
+    python -m benchmarks.column_completion [num_candidates]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import random
+import statistics
+
+from typing import *
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QCompleter, QLineEdit
+
+from code_rypl.core import Coach
+from code_rypl.model import RplmList
+from code_rypl.table import RplmTableView, ColumnCompleterDelegate
+from code_rypl.matching import ColumnMatcher
+
+SYLLABLES = """
+ba be bi bo bu ka ke ki ko ku la le li lo lu ma me mi mo mu na ne ni no nu ra re
+ri ro ru sa se si so su ta te ti to tu son man berg ski ez
+""".split()
+QUERIES = ["kam", "mc", "smith", "van de", "son", "mnb", "bkt", "bzq", "xq"]
+
+
+def last_names(num_names: int, seed: int = 0) -> list[str]:
+    rand = random.Random(seed)
+    names = {"Smith", "Smithson", "McDonald", "Van der Berg", "Van de Kamp"}
+    while len(names) < num_names:
+        name = "".join(rand.choices(SYLLABLES, k=rand.randint(2, 4))).capitalize()
+        suffix = rand.choice(["", "", " Jr", f"-{rand.choice(SYLLABLES).title()}ton"])
+        names.add(name + suffix)
+    return sorted(names)
+
+
+def keystroke_times(complete: Callable[[str], Any]) -> list[float]:
+    times = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            complete(query[:end])
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name: str, build: float, times: list[float]) -> None:
+    print(
+        f"  {name + ':':<24} build {build * 1e3:>7.1f}ms, per keystroke "
+        f"median {statistics.median(times) * 1e6:>7.0f}us, "
+        f"max {max(times) * 1e6:>7.0f}us"
+    )
+
+
+def main(num_candidates: int) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    rand = random.Random(1)
+    names = last_names(num_candidates)
+    in_column = rand.sample(names, 2_000)
+    counts = {name: rand.randint(1, 5) for name in in_column}
+
+    start = time.perf_counter()
+    matcher = ColumnMatcher(in_column, lambda name: counts.get(name, 0), names)
+    matcher_build = time.perf_counter() - start
+    matcher_times = keystroke_times(matcher.complete)
+
+    start = time.perf_counter()
+    completer = QCompleter(names)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    list_build = time.perf_counter() - start
+
+    def list_complete(typed: str) -> int:
+        completer.setCompletionPrefix(typed)
+        return completer.completionCount()
+
+    list_times = keystroke_times(list_complete)
+
+    print(f"completing from {len(names):,} names ({len(in_column):,} in the column):")
+    report("ColumnMatcher", matcher_build, matcher_times)
+    report("QCompleter string list", list_build, list_times)
+    median = statistics.median(matcher_times)
+    assert median < 1e-3, f"a keystroke took {median * 1e3:.2f}ms (median)"
+
+    # prefixes first, the most used of the column's values before the others
+    counts.update({"Smith": 1, "Smithson": 9})
+    matcher.add("Smith")
+    matcher.add("Smithson")
+    assert matcher.complete("smith")[:2] == ["Smithson", "Smith"]
+    # then word starts and subsequences
+    assert matcher.complete("der b")[0] == "Van der Berg"
+    assert matcher.complete("vdk")[0] == "Van de Kamp"
+    assert matcher.complete("mcd")[0] == "McDonald"
+    matcher.discard("Smithson")
+    counts["Smithson"] = 0
+    assert matcher.complete("smith")[:2] == ["Smith", "Smithson"]
+
+    # typed into a coach kind editor
+    coaches = RplmList(
+        [
+            Coach.from_cols("A", "One", "Head Coach"),
+            Coach.from_cols("B", "Two", "Assistant"),
+            Coach.from_cols("C", "Three", "Assistant"),
+            Coach.from_cols("D", "Four", "Volunteer Assistant"),
+        ]
+    )
+    table = RplmTableView(
+        Coach.num_cols(),
+        num_opt_cols=0,
+        cols_with_completion={2: ColumnCompleterDelegate},
+    )
+    table.load_rplm_list(coaches)
+    table.show()
+    app.processEvents()
+
+    def type_kind(text: str) -> tuple[QLineEdit, QCompleter]:
+        table.setCurrentIndex(coaches.index(0, 2))
+        table.edit(coaches.index(0, 2))
+        app.processEvents()
+        editor = cast(QLineEdit, table.focusWidget())
+        editor.clear()
+        QTest.keyClicks(editor, text)
+        app.processEvents()
+        return editor, editor.completer()
+
+    editor, completer = type_kind("hdc")
+    assert completer.completionMode() == (
+        QCompleter.CompletionMode.UnfilteredPopupCompletion
+    )
+    assert completer.model().index(0, 0).data() == "Head Coach"
+    table.closeEditor(editor, ColumnCompleterDelegate.EndEditHint.RevertModelCache)
+
+    editor, completer = type_kind("ass")
+    assert completer.completionMode() == QCompleter.CompletionMode.InlineCompletion
+    # used twice, so before the volunteers
+    assert completer.model().index(0, 0).data() == "Assistant"
+    # the rest of the completion after what was typed
+    assert editor.text() == "assistant", editor.text()
+    table.closeEditor(editor, ColumnCompleterDelegate.EndEditHint.RevertModelCache)
+
+    # values added to the column are completed from
+    coaches.set_rplm_field(1, 2, "Goalie Coach")
+    editor, completer = type_kind("goa")
+    assert editor.text() == "goalie Coach", editor.text()
+    table.close()
+    print("  ranked and completed in a coach editor")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,67 @@
+"""
+Checks the Qt-free core (core.py, the renderers, export and the batch exporter)
+imports without loading PySide6, and times a fresh interpreter importing it against
+importing the Qt models (model.py).
+
+run from the repo root:
+    python -m benchmarks.core_import
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import subprocess
+
+from typing import *
+
+CORE_MODULES = (
+    "code_rypl.core",
+    "code_rypl.export",
+    "code_rypl.batch_export",
+    "code_rypl.recent",
+    "code_rypl.renderers.default",
+)
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+seconds = time.perf_counter() - start
+print(json.dumps(dict(
+    seconds=seconds,
+    qt=sorted(m for m in sys.modules if m.split(".")[0] == "PySide6"),
+)))
+"""
+
+
+def import_in_fresh_interpreter(modules: Sequence[str]) -> dict[str, Any]:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=tuple(modules))],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # the last line, anything imported may print before it
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def best_of(modules: Sequence[str], repeat: int = 5) -> tuple[float, list[str]]:
+    results = [import_in_fresh_interpreter(modules) for _ in range(repeat)]
+    return min(r["seconds"] for r in results), results[0]["qt"]
+
+
+def main() -> None:
+    core, core_qt = best_of(CORE_MODULES)
+    assert not len(core_qt), f"importing the core loaded {core_qt}"
+
+    models, models_qt = best_of(("code_rypl.model",))
+    assert len(models_qt), "expected model.py to load PySide6"
+
+    print(f"import the core (no PySide6): {core * 1e3:>6.0f}ms")
+    print(f"import model.py (PySide6):    {models * 1e3:>6.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
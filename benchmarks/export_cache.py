@@ -0,0 +1,91 @@
+"""
+Times re-exporting a roster with the export cache (export_cache.py): the first
+export, a re-export after changing one player, a re-export with nothing changed,
+and after a coach is added in front of the others (which renumbers the default
+renderer's coach abbreviations). Each must write the same file as an uncached export.
+
+run from the repo root:
+    python -m benchmarks.export_cache [num_rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import pathlib
+import tempfile
+import contextlib
+
+from typing import *
+
+from code_rypl.core import RplmFile, Coach
+from code_rypl.export import ExportStats
+from code_rypl.renderers.default import RplmFileRenderer
+
+from .storage_memory import roster_rows
+
+META = dict(school="Test School", sport="Hockey", category="Men's", season="2022-23")
+
+
+def new_renderer() -> RplmFileRenderer:
+    # RplmFileRenderer prints while parsing the meta
+    with contextlib.redirect_stdout(None):
+        return RplmFileRenderer(**META)
+
+
+def check_export(
+    model: RplmFile, output: pathlib.Path, uncached: pathlib.Path
+) -> tuple[float, ExportStats]:
+    start = time.perf_counter()
+    stats = model.export_to(str(output), renderer=new_renderer())
+    seconds = time.perf_counter() - start
+
+    model.export_to(str(uncached), renderer=new_renderer(), use_cache=False)
+    assert output.read_bytes() == uncached.read_bytes(), "the cached export differs"
+    return seconds, stats
+
+
+def main(num_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = pathlib.Path(tmpdir)
+        output, uncached = root / "export.txt", root / "uncached.txt"
+        model = RplmFile(
+            filename=str(root / "roster.rplm"),
+            **META,
+            players=roster_rows(num_rows),
+            coaches=[
+                Coach.from_cols(f"C{n}", "Coachson", "Assistant") for n in range(5)
+            ],
+        )
+
+        def report(name: str, seconds: float, stats: ExportStats) -> None:
+            print(
+                f"{name:<22} {seconds * 1e3:>8.1f}ms  {stats.rendered:>7,} rendered"
+                f"  {'written' if stats.written else 'not written'}"
+            )
+
+        report("first export:", *check_export(model, output, uncached))
+
+        model.players.set_rplm_field(num_rows // 2, 0, "Changed")
+        seconds, stats = check_export(model, output, uncached)
+        assert stats.rendered == 1 and stats.written, stats
+        report("one player changed:", seconds, stats)
+
+        seconds, stats = check_export(model, output, uncached)
+        assert stats.rendered == 0 and not stats.written, stats
+        report("nothing changed:", seconds, stats)
+
+        # the assistants are numbered in order, adding one renumbers the rest
+        model.coaches.insert(0, Coach.from_cols("New", "Coach", "Assistant"))
+        seconds, stats = check_export(model, output, uncached)
+        assert stats.rendered == 6 and stats.written, stats
+        report("coach added in front:", seconds, stats)
+
+        model.set_meta(season="2023-24")
+        seconds, stats = check_export(model, output, uncached)
+        assert stats.rendered == num_rows + 6, stats
+        report("meta changed:", seconds, stats)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
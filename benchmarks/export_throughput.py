@@ -0,0 +1,103 @@
+"""
+Times exporting a roster to a .txt file with the default renderer, for the
+buffered export pipeline (export.py) and the old export_into which rendered
+through a writelines generator (and printed every coach). The pipeline is timed
+both with the renderer's batch methods and row by row. All must write the same file.
+
+run from the repo root:
+    python -m benchmarks.export_throughput [num_rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import pathlib
+import tempfile
+
+from typing import *
+from typing import TextIO
+
+from code_rypl.model import RplmFile, Coach
+from code_rypl.renderers.default import RplmFileRenderer
+
+from .storage_memory import roster_rows
+
+META = dict(school="Test School", sport="Hockey", category="Men's", season="2022-23")
+
+
+def legacy_export_into(model: RplmFile, file: TextIO, renderer: Any) -> None:
+    file.writelines(
+        renderer.render_player(**player.as_fields()) + "\n"
+        for player in model.players
+        if not player.isempty()
+    )
+    file.writelines(
+        renderer.render_coach(**coach.as_fields()) + "\n"
+        for coach in model.coaches
+        if (not coach.isempty(), print(coach))[0]
+    )
+
+
+class RowRenderer:
+    """
+    the default renderer without its batch methods
+    """
+
+    def __init__(self, renderer: RplmFileRenderer) -> None:
+        self.render_player = renderer.render_player
+        self.render_coach = renderer.render_coach
+
+
+def timed_export(filename: str, export: Callable[[TextIO], Any]) -> float:
+    start = time.perf_counter()
+    with open(filename, "w") as file:
+        export(file)
+    return time.perf_counter() - start
+
+
+def main(num_rows: int) -> None:
+    model = RplmFile(
+        **META,
+        players=roster_rows(num_rows),
+        coaches=[Coach.from_cols(f"C{n}", "Coachson", "Assistant") for n in range(5)],
+    )
+    # RplmFileRenderer prints while parsing the meta, make them up front
+    legacy_renderer = RplmFileRenderer(**META)
+    row_renderer = RowRenderer(RplmFileRenderer(**META))
+    renderer = RplmFileRenderer(**META)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        legacy_file = str(pathlib.Path(tmpdir) / "legacy.txt")
+        rows_file = str(pathlib.Path(tmpdir) / "rows.txt")
+        new_file = str(pathlib.Path(tmpdir) / "export.txt")
+
+        legacy = timed_export(
+            legacy_file, lambda f: legacy_export_into(model, f, legacy_renderer)
+        )
+        by_row = timed_export(
+            rows_file,
+            lambda f: model.export_into(f, renderer=row_renderer),  # type: ignore
+        )
+        stats = None
+
+        def export(file: TextIO) -> None:
+            nonlocal stats
+            stats = model.export_into(file, renderer=renderer)
+
+        new = timed_export(new_file, export)
+
+        expected = pathlib.Path(legacy_file).read_text()
+        assert expected == pathlib.Path(rows_file).read_text(), "the exports differ"
+        assert expected == pathlib.Path(new_file).read_text(), "the exports differ"
+        size = pathlib.Path(new_file).stat().st_size
+
+    print(f"{num_rows:,} rows, {size:,} B exported")
+    print(f"  legacy export_into: {legacy:>7.2f}s ({num_rows / legacy:>10,.0f} rows/s)")
+    print(f"  pipeline, per row:  {by_row:>7.2f}s ({num_rows / by_row:>10,.0f} rows/s)")
+    print(f"  pipeline, batched:  {new:>7.2f}s ({num_rows / new:>10,.0f} rows/s)")
+    print(f"  reported: {stats}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
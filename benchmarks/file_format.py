@@ -0,0 +1,113 @@
+"""
+Compares the v1 (a map per row) and v2 (string table + index columns) .rplm
+formats: file size, open time (list and ColumnStore models), save time, and the
+memory held by the opened model. Also checks both round trip to the same rows.
+
+run from the repo root:
+    python -m benchmarks.file_format [num_rows ...]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import pathlib
+import tempfile
+import tracemalloc
+
+from typing import *
+
+from code_rypl.model import RplmFile, Coach
+
+from .storage_memory import roster_rows
+
+DEFAULT_SIZES = (10_000, 200_000)
+
+
+def timed(work: Callable[[], Any], repeat: int = 3) -> tuple[Any, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = work()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def held_bytes(work: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = work()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def rows_of(model: RplmFile) -> tuple[list, list]:
+    return (
+        [r.as_cols() for r in model.players],
+        [r.as_cols() for r in model.coaches],
+    )
+
+
+def main(num_rows: int) -> None:
+    source = RplmFile(
+        school="Test School",
+        sport="Hockey",
+        category="Men's",
+        season="2022-23",
+        players=roster_rows(num_rows),
+        coaches=[
+            Coach.from_cols(f"C{n}", "Coachson", "Assistant Coach") for n in range(8)
+        ],
+    )
+    expected = rows_of(source)
+
+    print(f"{num_rows:,} players")
+    print(
+        f"{'format':>6} | {'size':>12} | {'save':>8} | {'open':>8} "
+        f"| {'open cols':>9} | {'model held':>12}"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {}
+        for version in (1, 2):
+            filename = str(pathlib.Path(tmpdir) / f"roster_v{version}.rplm")
+            source.format_version = version
+
+            def save() -> None:
+                pathlib.Path(filename).unlink(missing_ok=True)
+                source.save_to_file(filename)
+
+            _, save_time = timed(save)
+            size = pathlib.Path(filename).stat().st_size
+
+            model, open_time = timed(lambda: RplmFile.open(filename))
+            assert model.format_version == version, "format not detected"
+            assert rows_of(model) == expected, f"v{version} did not round trip"
+            assert model.meta_as_dict() == source.meta_as_dict()
+
+            _, open_cols_time = timed(lambda: RplmFile.open(filename, columnar=True))
+            held = held_bytes(lambda: RplmFile.open(filename))
+
+            results[version] = (size, save_time, open_time)
+            print(
+                f"{'v' + str(version):>6} | {size:>10,} B | {save_time * 1e3:>6.0f}ms "
+                f"| {open_time * 1e3:>6.0f}ms | {open_cols_time * 1e3:>7.0f}ms "
+                f"| {held:>10,} B"
+            )
+
+        (size1, save1, open1), (size2, save2, open2) = results[1], results[2]
+        print(
+            f"v2 vs v1: {size2 / size1:.0%} of the size, "
+            f"{save2 / save1:.0%} of the save time, {open2 / open1:.0%} of the open time"
+        )
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        main(size)
@@ -0,0 +1,126 @@
+"""
+Replays scripted keystrokes against an offscreen RplmTableView of players and
+reports the p50/p99 latency of a keystroke (the key press and release, and the
+events they post, eg: repaints) for rosters of several sizes, to catch input lag:
+    typing:   typing names, numbers and positions into a row's cells
+    tab:      tabbing through the cells of the rows
+    insert:   Alt+Enter, inserting a row below
+    remove:   Shift+Delete, removing the row
+
+run from the repo root:
+    python -m benchmarks.keystroke_latency [num_rows ...]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import statistics
+
+from typing import *
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from code_rypl.core import Player
+from code_rypl.model import RplmList
+from code_rypl.table import RplmTableView
+
+from .storage_memory import roster_rows
+
+# (key, modifiers), or the text typed into a cell
+Keystroke = Union[tuple[Qt.Key, Qt.KeyboardModifier], str]
+
+NO_MODIFIER = Qt.KeyboardModifier.NoModifier
+TAB = (Qt.Key.Key_Tab, NO_MODIFIER)
+ROW = ["Alex", "Smithson", "12", "Forward"]
+SCRIPTS: dict[str, list[Keystroke]] = {
+    "typing": [field for _ in range(5) for field in ROW],
+    "tab": [TAB] * 200,
+    "insert": [(Qt.Key.Key_Return, Qt.KeyboardModifier.AltModifier)] * 100,
+    "remove": [(Qt.Key.Key_Delete, Qt.KeyboardModifier.ShiftModifier)] * 50,
+}
+ROSTER_SIZES = [100, 1_000, 10_000, 100_000]
+# over this a keystroke is noticeably slow
+P99_BUDGET = 0.050
+
+
+def press(app: QApplication, table: RplmTableView, keystroke: Keystroke) -> float:
+    """
+    seconds to handle the keystroke, a key or a character typed into the focused
+    widget (which is an editor once typing starts)
+    """
+    start = time.perf_counter()
+    if isinstance(keystroke, str):
+        QTest.keyClicks(app.focusWidget() or table, keystroke)
+    else:
+        QTest.keyClick(app.focusWidget() or table, *keystroke)
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def replay(
+    app: QApplication, table: RplmTableView, script: list[Keystroke]
+) -> list[float]:
+    times: list[float] = []
+    for keystroke in script:
+        if isinstance(keystroke, str):
+            # a cell's text, then tab to the next cell
+            times.extend(press(app, table, char) for char in keystroke)
+            times.append(press(app, table, TAB))
+        else:
+            times.append(press(app, table, keystroke))
+    return times
+
+
+def measure(app: QApplication, num_rows: int) -> dict[str, list[float]]:
+    rplm_list = RplmList(list(roster_rows(num_rows)))
+    table = RplmTableView(Player.num_cols(), num_opt_cols=1)
+    table.load_rplm_list(rplm_list)
+    table.resize(1000, 800)
+    table.show()
+    app.processEvents()
+
+    times = {}
+    for name, script in SCRIPTS.items():
+        # each script starts from the top left cell of the middle of the roster
+        table.setCurrentIndex(rplm_list.index(len(rplm_list) // 2, 0))
+        table.setFocus()
+        app.processEvents()
+        before = len(rplm_list)
+        times[name] = replay(app, table, script)
+        if name == "insert":
+            assert len(rplm_list) == before + len(script), "rows were not inserted"
+        elif name == "remove":
+            assert len(rplm_list) == before - len(script), "rows were not removed"
+
+    typed = rplm_list.get_rplm(num_rows // 2).as_cols()
+    assert typed == tuple(ROW), "the typed row is not in the roster"
+    table.close()
+    return times
+
+
+def main(roster_sizes: list[int]) -> None:
+    app = cast(QApplication, QApplication.instance() or QApplication(sys.argv))
+    print(f"{'keystroke latency':<20}{'p50':>10}{'p99':>10}{'max':>10}")
+    slow = []
+    for num_rows in roster_sizes:
+        print(f"{num_rows:,} rows:")
+        for name, times in measure(app, num_rows).items():
+            p50 = statistics.median(times)
+            p99 = statistics.quantiles(times, n=100, method="inclusive")[98]
+            print(
+                f"  {name:<18}{p50 * 1e3:>8.2f}ms{p99 * 1e3:>8.2f}ms"
+                f"{max(times) * 1e3:>8.2f}ms"
+            )
+            if p99 > P99_BUDGET:
+                slow.append(f"{name} with {num_rows:,} rows")
+    assert not len(slow), f"p99 over {P99_BUDGET * 1e3:.0f}ms: {', '.join(slow)}"
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or ROSTER_SIZES)
@@ -0,0 +1,128 @@
+"""
+Times opening a v1 .rplm file with the compiled section validators (schema.py)
+against the old loader that built every row through Player(**fields) and checked
+the file with asserts. Also checks a damaged file is reported with every problem
+and its row number in one RplmFileError.
+
+run from the repo root:
+    python -m benchmarks.load_validation [num_rows]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import time
+import pathlib
+import tempfile
+
+from typing import *
+
+import msgpack  # type: ignore[import]
+
+from code_rypl.model import RplmFile, Player, Coach
+from code_rypl.schema import RplmFileError
+
+from .storage_memory import roster_rows
+
+
+def legacy_open(filename: str) -> RplmFile:
+    # the loader before the compiled validators
+    with open(filename, "rb") as file:
+        unpacker = msgpack.Unpacker(file)
+        sections: dict[str, Any] = {}
+        for _ in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            if key == "meta":
+                sections[key] = unpacker.unpack()
+            elif key in ("players", "coaches"):
+                rplm_type = Player if key == "players" else Coach
+                sections[key] = [
+                    rplm_type(**unpacker.unpack())
+                    for _ in range(unpacker.read_array_header())
+                ]
+            else:
+                unpacker.skip()
+
+    assert "meta" in sections, f"missing meta section in {file}"
+    meta = sections["meta"]
+    assert set(meta) == set(RplmFile.metadata_spec)
+    assert "players" in sections, f"missing players section in {file}"
+    assert "coaches" in sections, f"missing coaches section in {file}"
+    return RplmFile(
+        **meta,
+        players=sections["players"],
+        coaches=sections["coaches"],
+        filename=filename,
+        format_version=1,
+    )
+
+
+def best_of(work: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_damaged(tmpdir: str) -> None:
+    filename = str(pathlib.Path(tmpdir) / "damaged.rplm")
+    players = [p.as_fields() for p in roster_rows(50)]
+    players[3]["num"] = 7  # type: ignore[assignment]
+    del players[10]["posn"]
+    players[20] = ["not", "a", "map"]  # type: ignore[call-overload]
+    with open(filename, "wb") as file:
+        msgpack.pack(
+            dict(
+                meta=dict(school="S", sport="", category=""),
+                players=players,
+                coaches=[dict(first="A", last="B", kind="Head Coach", extra="x")],
+            ),
+            file,
+        )
+
+    try:
+        RplmFile.open(filename)
+    except RplmFileError as err:
+        found = {(p.section, p.row) for p in err.problems}
+        print(f"damaged file reported {err.num_problems} problems:\n{err}")
+        assert found == {
+            ("meta", None),
+            ("players", 3),
+            ("players", 10),
+            ("players", 20),
+            ("coaches", 0),
+        }, found
+    else:
+        raise AssertionError("the damaged file opened")
+
+
+def main(num_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        check_damaged(tmpdir)
+
+        filename = str(pathlib.Path(tmpdir) / "roster.rplm")
+        RplmFile(
+            school="Test School", players=roster_rows(num_rows), format_version=1
+        ).save_to_file(filename)
+
+        expected = [p.as_cols() for p in legacy_open(filename).players]
+        assert [p.as_cols() for p in RplmFile.open(filename).players] == expected
+
+        before = best_of(lambda: legacy_open(filename))
+        after = best_of(lambda: RplmFile.open(filename))
+        columnar = best_of(lambda: RplmFile.open(filename, columnar=True))
+
+    print(f"open {num_rows:,} rows (v1 file)")
+    print(f"  asserts + Player(**fields): {before * 1e3:>7.0f}ms")
+    print(
+        f"  compiled validator:         {after * 1e3:>7.0f}ms ({before / after:.1f}x)"
+    )
+    print(f"  compiled, into ColumnStore: {columnar * 1e3:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,143 @@
+"""
+Counts RplmList.data() calls and wall time per edit in an offscreen RplmTableView,
+comparing the precise row/cell signals against the old behaviour of ending every
+edit with a layoutChanged. Rows are inserted and popped both inside the viewport
+and below it (and appended), which cost the same either way: QTableView lays out
+and repaints the whole viewport whenever the row count changes.
+
+run from the repo root:
+    python -m benchmarks.model_signals [num_rows] [edits_per_op]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+from typing import *
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from code_rypl.model import Player, RplmList
+from code_rypl.table import RplmTableView
+
+
+class CountingRplmList(RplmList):
+    data_calls = 0
+
+    def data(self, index, role):  # type: ignore
+        self.data_calls += 1
+        return super().data(index, role)
+
+
+class LegacySignalsRplmList(CountingRplmList):
+    """
+    emulates the old behaviour, the edit signals are swallowed and every edit
+    ends with a layoutChanged instead
+    """
+
+    def _legacy(self, edit: Callable[..., Any], *args: Any) -> Any:
+        blocked = self.blockSignals(True)
+        try:
+            ret = edit(*args)
+        finally:
+            self.blockSignals(blocked)
+        self.layoutChanged.emit()
+        return ret
+
+    def insert(self, row, rplm):
+        return self._legacy(super().insert, row, rplm)
+
+    def pop(self, row):
+        return self._legacy(super().pop, row)
+
+    def set_rplm_field(self, row, col, value):
+        return self._legacy(super().set_rplm_field, row, col, value)
+
+
+def swap(rplm_list: RplmList, row: int) -> None:
+    # what dropMimeData does
+    src, dest = rplm_list.get_rplm_field(row, 0), rplm_list.get_rplm_field(row, 1)
+    rplm_list.set_rplm_field(row, 1, src)
+    rplm_list.set_rplm_field(row, 0, dest)
+
+
+# rows this far past the middle of the roster are well below the viewport
+BELOW_VIEWPORT = 1_000
+
+
+def below(rplm_list: RplmList, row: int) -> int:
+    return min(row + BELOW_VIEWPORT, len(rplm_list) - 1)
+
+
+EDITS: dict[str, Callable[[RplmList, int], Any]] = {
+    "insert": lambda ls, row: ls.insert(row, Player.empty()),
+    "pop": lambda ls, row: ls.pop(row),
+    "insert below": lambda ls, row: ls.insert(below(ls, row), Player.empty()),
+    "pop below": lambda ls, row: ls.pop(below(ls, row)),
+    "append": lambda ls, row: ls.append(Player.empty()),
+    "set cell": lambda ls, row: ls.set_rplm_field(row, 0, f"Name{row}"),
+    "clear cell": lambda ls, row: ls.set_rplm_field(row, 1, ""),
+    "drag swap": swap,
+}
+
+
+def run(
+    app: QApplication, list_type: Type[CountingRplmList], num_rows: int, num_edits: int
+) -> dict[str, tuple[float, float]]:
+    rplm_list = list_type(
+        [
+            Player.from_cols(f"First{n}", f"Last{n}", str(n % 100), "")
+            for n in range(num_rows)
+        ]
+    )
+    view = RplmTableView(Player.num_cols(), num_opt_cols=1)
+    view.load_rplm_list(rplm_list)
+    view.resize(720, 450)
+    view.show()
+    view.scrollTo(rplm_list.index(num_rows // 2, 0))
+    app.processEvents()
+
+    results = {}
+    for name, edit in EDITS.items():
+        rplm_list.data_calls = 0
+        start = time.perf_counter()
+        for n in range(num_edits):
+            edit(rplm_list, num_rows // 2 + n)
+            # let the view handle the signals and repaint
+            app.processEvents()
+        elapsed = time.perf_counter() - start
+        results[name] = (rplm_list.data_calls / num_edits, elapsed / num_edits)
+
+    view.close()
+    return results
+
+
+def main(num_rows: int, num_edits: int) -> None:
+    app = cast(QApplication, QApplication.instance() or QApplication(sys.argv[:1]))
+
+    before = run(app, LegacySignalsRplmList, num_rows, num_edits)
+    after = run(app, CountingRplmList, num_rows, num_edits)
+
+    print(f"{num_rows:,} rows, {num_edits} edits per operation")
+    print(
+        f"{'edit':>12} | {'data()/edit before':>18} | {'after':>8} "
+        f"| {'ms/edit before':>14} | {'after':>8}"
+    )
+    for name in EDITS:
+        (calls_before, time_before), (calls_after, time_after) = (
+            before[name],
+            after[name],
+        )
+        print(
+            f"{name:>12} | {calls_before:>18.0f} | {calls_after:>8.0f} "
+            f"| {time_before * 1e3:>14.3f} | {time_after * 1e3:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [50_000, 50][len(args) :]))
@@ -0,0 +1,125 @@
+"""
+Times exporting a roster to txt, csv, json lines and msgpack in one pass (see
+export.export_formats) against exporting each format on its own, which renders
+every row once per format. Checks the txt matches export_into and the other
+formats read back to the same rows.
+
+run from the repo root:
+    python -m benchmarks.multi_format_export [num_rows]
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import csv
+import json
+import time
+import pathlib
+import tempfile
+import contextlib
+
+from typing import *
+
+import msgpack  # type: ignore[import]
+
+from code_rypl.core import RplmFile, Coach
+from code_rypl.export import EXPORT_FORMATS
+from code_rypl.renderers.default import RplmFileRenderer
+
+from .storage_memory import roster_rows
+
+META = dict(school="Test School", sport="Hockey", category="Men's", season="2022-23")
+
+
+class CountingRenderer:
+    """
+    the default renderer, counting the rows it renders
+    """
+
+    def __init__(self) -> None:
+        with contextlib.redirect_stdout(None):
+            self.renderer = RplmFileRenderer(**META)
+        self.rendered = 0
+
+    def suggested_filename(self) -> None | str:
+        return self.renderer.suggested_filename()
+
+    def render_player(self, **fields: str) -> str:
+        self.rendered += 1
+        return self.renderer.render_player(**fields)  # type: ignore[arg-type]
+
+    def render_coach(self, **fields: str) -> str:
+        self.rendered += 1
+        return self.renderer.render_coach(**fields)  # type: ignore[arg-type]
+
+    def render_players(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        self.rendered += len(columns[0])
+        return self.renderer.render_players(columns)
+
+    def render_coaches(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        self.rendered += len(columns[0])
+        return self.renderer.render_coaches(columns)
+
+
+def main(num_rows: int) -> None:
+    model = RplmFile(
+        **META,
+        players=roster_rows(num_rows),
+        coaches=[Coach.from_cols(f"C{n}", "Coachson", "Assistant") for n in range(5)],
+    )
+    num_exported = num_rows + len(model.coaches)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = pathlib.Path(tmpdir)
+        filenames = {
+            name: str(root / f"one_pass{sink.suffix}")
+            for name, sink in EXPORT_FORMATS.items()
+        }
+
+        separate_renderers = []
+        start = time.perf_counter()
+        for name, sink in EXPORT_FORMATS.items():
+            renderer = CountingRenderer()
+            separate_renderers.append(renderer)
+            model.export_formats(
+                {name: str(root / f"separate{sink.suffix}")},
+                renderer=renderer,  # type: ignore[arg-type]
+            )
+        separate = time.perf_counter() - start
+
+        renderer = CountingRenderer()
+        start = time.perf_counter()
+        model.export_formats(filenames, renderer=renderer)  # type: ignore[arg-type]
+        one_pass = time.perf_counter() - start
+
+        assert renderer.rendered == num_exported, renderer.rendered
+        assert sum(r.rendered for r in separate_renderers) == 4 * num_exported
+
+        for name, sink in EXPORT_FORMATS.items():
+            one = pathlib.Path(filenames[name]).read_bytes()
+            assert one == (root / f"separate{sink.suffix}").read_bytes(), name
+
+        # the txt is what export_into writes
+        expected = io.StringIO()
+        model.export_into(expected, renderer=CountingRenderer())  # type: ignore[arg-type]
+        with open(filenames["txt"]) as file:
+            lines = file.read().splitlines()
+        assert lines == expected.getvalue().splitlines()
+
+        # and the structured formats hold the same rows and lines
+        with open(filenames["csv"], newline="", encoding="utf-8") as file:
+            from_csv = [row["line"] for row in csv.DictReader(file)]
+        with open(filenames["jsonl"], encoding="utf-8") as file:
+            from_jsonl = [json.loads(line)["line"] for line in file]
+        with open(filenames["msgpack"], "rb") as file:
+            from_msgpack = [record["line"] for record in msgpack.Unpacker(file)]
+        assert from_csv == from_jsonl == from_msgpack == lines
+
+    print(f"{num_exported:,} rows into {', '.join(EXPORT_FORMATS)}:")
+    print(f"  a pass per format: {separate:.3f}s ({4 * num_exported:,} rows rendered)")
+    print(f"  one pass:          {one_pass:.3f}s ({renderer.rendered:,} rows rendered)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
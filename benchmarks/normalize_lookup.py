@@ -0,0 +1,200 @@
+"""
+Checks the sport and category normalization (renderers/aliases.py) against a corpus
+of misspellings, and times normalize calls per second for exact, misspelled, and
+unknown inputs against the loops over every alias they replaced.
+
+run from the repo root:
+    python -m benchmarks.normalize_lookup
+"""
+
+from __future__ import annotations
+
+import time
+import itertools
+
+from typing import *
+
+from code_rypl.renderers import tools
+from code_rypl.renderers.tools import (
+    matchify,
+    normalize_sports,
+    normalize_category,
+    sport_abrev_to_formal_name,
+    category_formal_to_variations,
+)
+from code_rypl.renderers.default import abbv_sport
+
+# what was typed -> what it should normalize to, None if it should not resolve
+SPORT_CORPUS: dict[str, None | str] = {
+    # exact, as before
+    "hky": "Hockey",
+    "Hockey": "Hockey",
+    "field hockey": "Field Hockey",
+    "FHKY": "Field Hockey",
+    "bball": "Basketball",
+    "fb": "Football",
+    "Soc": "Soccer",
+    # misspelled
+    "basketbal": "Basketball",
+    "baskteball": "Basketball",
+    "Basket ball": "Basketball",
+    "lacrose": "Lacrosse",
+    "lacrsose": "Lacrosse",
+    "Lacross": "Lacrosse",
+    "hocky": "Hockey",
+    "hockee": "Hockey",
+    "feild hockey": "Field Hockey",
+    "field hocky": "Field Hockey",
+    "soccor": "Soccer",
+    "socer": "Soccer",
+    "footbal": "Football",
+    "foot ball": "Football",
+    "basebal": "Baseball",
+    "basball": "Baseball",
+    "sofball": "Softball",
+    "softbal": "Softball",
+    # not sports, or too short to guess
+    "golf": None,
+    "tennis": None,
+    "swimming": None,
+    "hk": None,
+    "f": None,
+    "": None,
+    # escaped, kept as is
+    ":Curling": ":Curling",
+}
+
+CATEGORY_CORPUS: dict[str, None | str] = {
+    "men": "Men's",
+    "Men's": "Men's",
+    "MENS": "Men's",
+    "m": "Men's",
+    "women": "Women's",
+    "Women's": "Women's",
+    "female": "Women's",
+    "none": "None",
+    "enby": "None",
+    # misspelled
+    "womens'": "Women's",
+    "wommen": "Women's",
+    "womn": "Women's",
+    "woman's": "Women's",
+    "femal": "Women's",
+    "mael": "Men's",
+    "nnoe": "None",
+    # as close to male as female, and to men as women
+    "fmale": None,
+    "wmen": None,
+    # too short to guess
+    "wm": None,
+    # unknown
+    "coed": None,
+    "mixed": None,
+    ":Mixed": ":Mixed",
+}
+
+
+def old_normalize_sports(sport: str) -> None | str:
+    # the loop normalize_sports used to run on every call
+    matchable = matchify(sport)
+    for abbrev, full_name in sport_abrev_to_formal_name.items():
+        if matchable in {abbrev, matchify(full_name)}:
+            return full_name
+    return None
+
+
+def old_normalize_category(raw_cato: str) -> None | str:
+    matchable = matchify(raw_cato).rstrip("s'").replace(" ", "").replace("-", "")
+    for formal, variations in category_formal_to_variations.items():
+        if matchable in variations:
+            return formal
+    return None
+
+
+def check_corpus() -> None:
+    wrong = [
+        (typed, expected, normalize(typed))
+        for corpus, normalize in (
+            (SPORT_CORPUS, normalize_sports),
+            (CATEGORY_CORPUS, normalize_category),
+        )
+        for typed, expected in corpus.items()
+        if normalize(typed) != expected
+    ]
+    assert not len(wrong), "\n".join(
+        f"{typed!r}: expected {expected!r}, got {got!r}"
+        for typed, expected, got in wrong
+    )
+
+    # the exact inputs still normalize as they used to
+    for typed in SPORT_CORPUS:
+        if (old := old_normalize_sports(typed)) is not None:
+            assert normalize_sports(typed) == old, typed
+            assert abbv_sport(typed) == abbv_sport(old), typed
+    for typed in CATEGORY_CORPUS:
+        if (old := old_normalize_category(typed)) is not None:
+            assert normalize_category(typed) == old, typed
+
+
+def calls_per_second(normalize: Callable[[str], Any], inputs: list[str]) -> float:
+    calls = 0
+    start = time.perf_counter()
+    for typed in itertools.islice(itertools.cycle(inputs), 200_000):
+        normalize(typed)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    check_corpus()
+    print(
+        f"{len(SPORT_CORPUS) + len(CATEGORY_CORPUS)} sports and categories "
+        "normalized as expected"
+    )
+
+    exact = [typed for typed in SPORT_CORPUS if old_normalize_sports(typed)]
+    misspelled = [
+        typed
+        for typed, expected in SPORT_CORPUS.items()
+        if expected is not None and old_normalize_sports(typed) is None
+    ]
+    unknown = ["golf", "tennis", "swimming", "rugby"]
+    exact_categories = [
+        typed for typed in CATEGORY_CORPUS if old_normalize_category(typed)
+    ]
+    misspelled_categories = [
+        typed
+        for typed, expected in CATEGORY_CORPUS.items()
+        if expected is not None and old_normalize_category(typed) is None
+    ]
+
+    def uncached(normalize: Callable[[str], Any]) -> Callable[[str], Any]:
+        # each misspelling searched afresh, as if it was never typed before
+        def call(typed: str) -> Any:
+            tools.sport_aliases.closest.cache_clear()
+            tools.category_aliases.closest.cache_clear()
+            return normalize(typed)
+
+        return call
+
+    print("normalize calls per second:")
+    for name, normalize, inputs in (
+        ("sports, exact (before)", old_normalize_sports, exact),
+        ("sports, exact", normalize_sports, exact),
+        ("sports, misspelled", normalize_sports, misspelled),
+        ("sports, misspelled uncached", uncached(normalize_sports), misspelled),
+        ("sports, unknown uncached", uncached(normalize_sports), unknown),
+        ("categories, exact (before)", old_normalize_category, exact_categories),
+        ("categories, exact", normalize_category, exact_categories),
+        ("categories, misspelled", normalize_category, misspelled_categories),
+        (
+            "categories, misspelled uncached",
+            uncached(normalize_category),
+            misspelled_categories,
+        ),
+    ):
+        print(f"  {name + ':':<33} {calls_per_second(normalize, inputs):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
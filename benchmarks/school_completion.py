@@ -0,0 +1,174 @@
+"""
+Times completing school names from a generated directory of institutions with the
+flattened trie (schools.py) against QCompleter filtering the same names as a string
+list, per keystroke while typing. Then types into a school input offscreen to check
+the completer (completion.py) only loads the directory once focused and finds names
+from any word, eg: "state" finds "Ohio State University".
+
+run from the repo root:
+    python -m benchmarks.school_completion [num_schools]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import random
+import pathlib
+import tempfile
+import statistics
+
+from typing import *
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import (
+    QApplication,
+    QCompleter,
+    QLineEdit,
+    QWidget,
+    QVBoxLayout,
+)
+
+from code_rypl.schools import SchoolIndex
+from code_rypl.completion import SchoolCompleter
+
+PLACES = """
+Alabama Alaska Arizona Arkansas California Colorado Connecticut Delaware Florida
+Georgia Hawaii Idaho Illinois Indiana Iowa Kansas Kentucky Louisiana Maine Maryland
+Michigan Minnesota Mississippi Missouri Montana Nebraska Nevada Ohio Oklahoma Oregon
+Pennsylvania Tennessee Texas Utah Vermont Virginia Washington Wisconsin Wyoming
+Boston Chicago Denver Houston Phoenix Portland Seattle Austin Dallas Memphis Albany
+Springfield Franklin Clinton Madison Georgetown Salem Fairview Riverside Lakeside
+""".split()
+KINDS = [
+    "{} University",
+    "{} State University",
+    "University of {}",
+    "{} College",
+    "{} Community College",
+    "{} Institute of Technology",
+    "{} Technical College",
+    "St. {} College",
+    "{} A&M University",
+    "{} Christian University",
+]
+QUERIES = ["ohio state", "state", "university of tex", "tech", "st. bos", "zzz"]
+
+
+def school_names(num_schools: int, seed: int = 0) -> list[str]:
+    rand = random.Random(seed)
+    names = {"Ohio State University"}
+    while len(names) < num_schools:
+        place = rand.choice(PLACES)
+        if rand.random() < 0.5:  # eg: "North Ohio", "Ohio Valley"
+            place = rand.choice(
+                [f"{rand.choice(['North', 'South', 'East', 'West'])} {place}"]
+                + [f"{place} {rand.choice(['Valley', 'Southern', 'Central'])}"]
+            )
+        name = rand.choice(KINDS).format(place)
+        if rand.random() < 0.5:  # eg: "Ohio University-Boston"
+            name = f"{name}-{rand.choice(PLACES)}"
+        names.add(name)
+    return sorted(names)
+
+
+def keystroke_times(complete: Callable[[str], Any]) -> list[float]:
+    times = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            complete(query[:end])
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name: str, build: float, times: list[float]) -> None:
+    print(
+        f"  {name + ':':<24} build {build * 1e3:>7.1f}ms, per keystroke "
+        f"median {statistics.median(times) * 1e6:>7.0f}us, "
+        f"max {max(times) * 1e6:>7.0f}us"
+    )
+
+
+def main(num_schools: int) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    names = school_names(num_schools)
+
+    start = time.perf_counter()
+    index = SchoolIndex(names)
+    index_build = time.perf_counter() - start
+    index_times = keystroke_times(index.complete)
+
+    start = time.perf_counter()
+    completer = QCompleter(names)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setFilterMode(Qt.MatchFlag.MatchContains)
+    list_build = time.perf_counter() - start
+
+    def list_complete(typed: str) -> int:
+        completer.setCompletionPrefix(typed)
+        return completer.completionCount()
+
+    list_times = keystroke_times(list_complete)
+
+    print(f"completing from {len(names):,} schools:")
+    report("trie (schools.py)", index_build, index_times)
+    report("QCompleter string list", list_build, list_times)
+    assert max(index_times) < 1e-3, "a keystroke took over a millisecond"
+
+    # word start matches come after the names starting with what was typed
+    found = index.complete("state", limit=len(names))
+    assert "Ohio State University" in found
+    later_word = [not name.casefold().startswith("state") for name in found]
+    assert later_word == sorted(later_word)
+    assert index.complete("ohio state")[0] == "Ohio State University"
+    assert index.complete("zzz") == []
+
+    # typed into the school input
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "schools.txt"
+        path.write_text("# a test directory\n" + "\n".join(names), encoding="utf-8")
+        loads = []
+
+        def load() -> SchoolIndex:
+            loads.append(time.perf_counter())
+            return SchoolIndex.load(path)
+
+        # another input has the focus when the window is shown
+        window = QWidget()
+        layout = QVBoxLayout(window)
+        other, line_edit = QLineEdit(), QLineEdit()
+        layout.addWidget(other)
+        layout.addWidget(line_edit)
+        school_completer = SchoolCompleter(line_edit, load)
+        other.setFocus()
+        window.show()
+        app.processEvents()
+        assert not len(loads), "loaded the schools before the input was focused"
+
+        start = time.perf_counter()
+        line_edit.setFocus()
+        app.processEvents()
+        load_time = time.perf_counter() - start
+        assert len(loads) == 1, "did not load the schools when focused"
+
+        QTest.keyClicks(line_edit, "Ohio Sta")
+        app.processEvents()
+        model = school_completer.completion_model
+        shown = [
+            model.data(model.index(row), Qt.ItemDataRole.DisplayRole)
+            for row in range(model.rowCount())
+        ]
+        assert "Ohio State University" in shown, shown
+        assert len(loads) == 1
+        window.close()
+
+    print(f"  loaded the directory on first focus in {load_time * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8_000)
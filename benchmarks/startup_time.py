@@ -0,0 +1,122 @@
+"""
+Startup report: starts the GUI offscreen in a fresh interpreter under -X importtime
+and reports the time to import the app and to show the first (untitled) window,
+and the slowest imports. Checks GitPython (the dev build info is cached, see
+versioning.py) and the renderers are not loaded on the way, and that msgpack is
+not imported with the app (the recovery journal's worker thread is its first user).
+
+run from the repo root (the first run after a commit fills the build info cache):
+    python -m benchmarks.startup_time [num_slowest]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+from typing import *
+
+# modules that should not be imported to show the first window
+DEFERRED = ("git", "code_rypl.renderers.default", "code_rypl.renderers.test")
+# modules that should not be imported with the app, only once they are used
+DEFERRED_IMPORTS = DEFERRED + ("msgpack",)
+
+PROBE = """
+import os, sys, json, time
+start = time.perf_counter()
+from code_rypl.app import CodeRyplApplication
+imported = time.perf_counter()
+loaded_with_app = [name for name in {deferred_imports!r} if name in sys.modules]
+app = CodeRyplApplication(sys.argv)
+document = app.new_document()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps(dict(
+    imports=imported - start,
+    first_window=shown - start,
+    loaded_with_app=loaded_with_app,
+    loaded=[name for name in {deferred!r} if name in sys.modules],
+)))
+document.close()
+"""
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTime]:
+    """
+    the lines -X importtime writes, eg: "import time:       425 |     223243 |   code_rypl.app"
+    """
+    found = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        found.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), depth))
+    return found
+
+
+def start_once(tmpdir: str) -> tuple[dict[str, Any], list[ImportTime]]:
+    env = dict(
+        os.environ,
+        QT_QPA_PLATFORM="offscreen",
+        CODE_RYPL_RECOVERY_DIR=os.path.join(tmpdir, "recovery"),
+        CODE_RYPL_RECENT_FILE=os.path.join(tmpdir, "recent.msgpack"),
+    )
+    # time the imports as installed, ie from cached bytecode
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    done = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE.format(deferred=DEFERRED, deferred_imports=DEFERRED_IMPORTS),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if done.returncode != 0:
+        raise RuntimeError(f"the app failed to start:\n{done.stderr[-2000:]}")
+    lines = [line for line in done.stdout.splitlines() if line.startswith("{")]
+    return json.loads(lines[-1]), parse_importtime(done.stderr)
+
+
+def main(num_slowest: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start_once(tmpdir)  # warm up the bytecode and build info caches
+        report, imports = min(
+            (start_once(tmpdir) for _ in range(3)), key=lambda r: r[0]["first_window"]
+        )
+
+    print(f"import code_rypl.app: {report['imports'] * 1e3:>6.0f}ms")
+    print(f"first window shown:   {report['first_window'] * 1e3:>6.0f}ms")
+    print(f"modules imported:     {len(imports)}")
+
+    print(f"\nslowest imports (self time, cumulative):")
+    for imported in sorted(imports, key=lambda i: -i.self_us)[:num_slowest]:
+        print(
+            f"  {imported.self_us / 1e3:>6.1f}ms {imported.cumulative_us / 1e3:>7.1f}ms"
+            f"  {imported.module}"
+        )
+
+    loaded_with_app, loaded = report["loaded_with_app"], report["loaded"]
+    assert not len(loaded_with_app), f"imported with the app: {loaded_with_app}"
+    assert not len(loaded), f"loaded while starting: {loaded}"
+    print(f"\nnot imported with the app: {', '.join(DEFERRED_IMPORTS)}")
+    print(f"not loaded to show the first window: {', '.join(DEFERRED)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 15)
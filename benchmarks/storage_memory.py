@@ -0,0 +1,86 @@
+"""
+Compares the memory used by a roster stored as a list of Player rows (the
+default RplmList layout) against the same roster in a ColumnStore.
+
+The first ColumnStore of a size also grows the interpreter's table of interned
+strings (kept for the whole process, and reused by later stores), so each layout is
+measured after a warm up build of the same size, and the first build is shown on
+its own. That one time cost outweighs the saving for small rosters (about 1k rows),
+the saving only shows for large ones.
+
+run from the repo root:
+    python -m benchmarks.storage_memory [num_rows ...]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import random
+import tracemalloc
+
+from typing import *
+
+from code_rypl.model import Player
+from code_rypl.column_store import ColumnStore
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+POSITIONS = ("", "G", "F", "C", "D", "LW", "RW", "Goalie", "Forward", "Defense")
+
+
+def _fresh(string: str) -> str:
+    # make a new string object, like decoding a file would, so nothing is shared
+    return string.encode().decode()
+
+
+def roster_rows(num_rows: int, *, seed: int = 0) -> Iterator[Player]:
+    rand = random.Random(seed)
+    firsts = [f"First{n}" for n in range(500)]
+    lasts = [f"Lastname{n}" for n in range(20_000)]
+    for _ in range(num_rows):
+        yield Player(
+            first=_fresh(rand.choice(firsts)),
+            last=_fresh(rand.choice(lasts)),
+            num=_fresh(str(rand.randrange(100))),
+            posn=_fresh(rand.choice(POSITIONS)),
+        )
+
+
+def measure(build: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        kept = build()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main(sizes: Sequence[int]) -> None:
+    print(
+        f"{'rows':>10} | {'list[Player]':>14} | {'ColumnStore':>14} | {'saving':>7} | "
+        f"{'first build':>14}"
+    )
+    print(f"{'':->10}-+-{'':->14}-+-{'':->14}-+-{'':->7}-+-{'':->14}")
+    for num_rows in sizes:
+        # the first build pays for the interned strings' table growing
+        first_bytes = measure(lambda: ColumnStore(Player, roster_rows(num_rows)))
+        col_bytes = measure(lambda: ColumnStore(Player, roster_rows(num_rows)))
+        measure(lambda: list(roster_rows(num_rows)))
+        row_bytes = measure(lambda: list(roster_rows(num_rows)))
+        print(
+            f"{num_rows:>10,} | "
+            f"{row_bytes / num_rows:>10.1f} B/r | "
+            f"{col_bytes / num_rows:>10.1f} B/r | "
+            f"{row_bytes / col_bytes:>6.1f}x | "
+            f"{first_bytes / num_rows:>10.1f} B/r"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
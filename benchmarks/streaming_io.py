@@ -0,0 +1,112 @@
+"""
+Measures the peak memory (tracemalloc) of opening and saving a .rplm file relative
+to the size of the loaded model, for the streaming Unpacker/Packer path and the
+old whole-file msgpack.unpack / msgpack.pack path.
+
+run from the repo root:
+    python -m benchmarks.streaming_io [num_rows]
+"""
+
+from __future__ import annotations
+
+import gc
+import io
+import sys
+import tempfile
+import pathlib
+import tracemalloc
+
+from typing import *
+
+import msgpack  # type: ignore[import]
+
+from code_rypl.model import RplmFile, Player, Coach
+
+from .storage_memory import roster_rows
+
+# the streaming path may use at most this much more than the model while working,
+# plus the buffers that do not grow with the roster (the Unpacker's read buffer, a
+# chunk of packed rows), which are most of the peak for small rosters
+MAX_PEAK_OVERHEAD = 0.25
+FIXED_BUFFER_BYTES = 4 * 1024 * 1024
+
+
+def legacy_open(filename: str) -> RplmFile:
+    with open(filename, "rb") as file:
+        data = msgpack.unpack(file)
+    return RplmFile(
+        **data["meta"],
+        players=(Player(**p) for p in data["players"]),
+        coaches=(Coach(**c) for c in data["coaches"]),
+        filename=filename,
+    )
+
+
+def legacy_save(model: RplmFile, filename: str) -> None:
+    with open(filename, "wb") as file:
+        msgpack.pack(model._to_save_dict(), file)
+
+
+def traced(work: Callable[[], Any]) -> tuple[Any, int, int]:
+    """
+    returns (result, bytes still held after, peak bytes while working)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = work()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current, peak
+
+
+def main(num_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = str(pathlib.Path(tmpdir) / "roster.rplm")
+        RplmFile(
+            school="Test School",
+            sport="Hockey",
+            category="Men's",
+            season="2022-23",
+            players=roster_rows(num_rows),
+            # the map-per-row layout the legacy path reads, see file_format.py for v2
+            format_version=1,
+        ).save_to_file(filename)
+        print(f"{num_rows:,} players, {pathlib.Path(filename).stat().st_size:,} B file")
+
+        for label, opener in (("legacy", legacy_open), ("streaming", RplmFile.open)):
+            model, held, peak = traced(lambda: opener(filename))
+            print(
+                f"open  {label:>9}: model {held:>12,} B, peak {peak:>12,} B "
+                f"({peak / held - 1:+.0%})"
+            )
+            del model
+
+        model = RplmFile.open(filename)
+        _, model_bytes, _ = traced(lambda: RplmFile.open(filename))
+        for label, saver in (
+            ("legacy", legacy_save),
+            ("streaming", lambda m, f: m.save_to_file(f)),
+        ):
+            _, _, peak = traced(lambda: saver(model, filename))
+            print(
+                f"save  {label:>9}: peak {peak:>12,} B "
+                f"({peak / model_bytes:.0%} of the model)"
+            )
+
+        # the streaming paths should stay close to the size of the model itself, the
+        # allowance scales with the model so this holds for any size of roster
+        def allowed(model_bytes: int) -> float:
+            return model_bytes * MAX_PEAK_OVERHEAD + FIXED_BUFFER_BYTES
+
+        _, held, peak = traced(lambda: RplmFile.open(filename))
+        assert peak - held <= allowed(held), "open peak is not bounded"
+        _, _, peak = traced(lambda: model.save_to_file(filename))
+        assert peak <= allowed(model_bytes), "save peak is not bounded"
+        print("bounded ok")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,120 @@
+"""
+Times RplmList.data(), called for every visible cell and role on every repaint:
+data() calls per second for the roles a repaint asks for, over a roster with some
+empty cells (which show their column's prompt in gray), kept as rows and column by
+column (column_store.py), and the time to repaint a full viewport of an offscreen
+RplmTableView.
+
+run from the repo root:
+    python -m benchmarks.table_paint [num_rows]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import statistics
+
+from typing import *
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from code_rypl.core import Player
+from code_rypl.model import RplmList
+from code_rypl.table import RplmTableView
+from code_rypl.column_store import ColumnStore
+
+from .storage_memory import roster_rows
+
+# what the item delegate asks for each cell it paints
+PAINT_ROLES = (
+    Qt.ItemDataRole.FontRole,
+    Qt.ItemDataRole.TextAlignmentRole,
+    Qt.ItemDataRole.ForegroundRole,
+    Qt.ItemDataRole.CheckStateRole,
+    Qt.ItemDataRole.DecorationRole,
+    Qt.ItemDataRole.DisplayRole,
+    Qt.ItemDataRole.BackgroundRole,
+)
+VISIBLE_ROWS = 40
+REPAINTS = 50
+
+
+def roster(num_rows: int) -> list[Player]:
+    players = list(roster_rows(num_rows))
+    # every fifth row is missing its number and position
+    for player in players[::5]:
+        player.set_col(2, "")
+        player.set_col(3, "")
+    return players
+
+
+def data_calls_per_second(rplm_list: RplmList) -> float:
+    cells = [
+        rplm_list.index(row, col)
+        for row in range(VISIBLE_ROWS)
+        for col in range(Player.num_cols())
+    ]
+    data = rplm_list.data
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 1.0:
+        for index in cells:
+            for role in PAINT_ROLES:
+                data(index, role)
+        calls += len(cells) * len(PAINT_ROLES)
+    return calls / (time.perf_counter() - start)
+
+
+def repaint_times(table: RplmTableView) -> list[float]:
+    viewport = table.viewport()
+    times = []
+    for _ in range(REPAINTS):
+        start = time.perf_counter()
+        viewport.repaint()
+        times.append(time.perf_counter() - start)
+        QApplication.processEvents()
+    return times
+
+
+def main(num_rows: int) -> None:
+    app = QApplication.instance() or QApplication(sys.argv)
+    players = roster(num_rows)
+    rplm_list = RplmList(players)
+    columnar = RplmList(ColumnStore(Player, players))
+
+    # empty cells show the prompt in gray, the others their value
+    for checked in (rplm_list, columnar):
+        assert checked.data(checked.index(0, 2), Qt.ItemDataRole.DisplayRole) == "num"
+        assert checked.data(checked.index(0, 2), Qt.ItemDataRole.ForegroundRole)
+        assert checked.data(checked.index(1, 3), Qt.ItemDataRole.ForegroundRole) is None
+        assert checked.data(checked.index(1, 0), Qt.ItemDataRole.EditRole) == (
+            players[1].get_col(0)
+        )
+
+    per_second = data_calls_per_second(rplm_list)
+    columnar_per_second = data_calls_per_second(columnar)
+
+    table = RplmTableView(Player.num_cols(), num_opt_cols=1)
+    table.load_rplm_list(rplm_list)
+    table.resize(1000, VISIBLE_ROWS * table.verticalHeader().defaultSectionSize())
+    table.show()
+    app.processEvents()
+    times = repaint_times(table)
+    table.close()
+
+    print(f"painting a {num_rows:,} row roster:")
+    print(f"  data():         {per_second:>12,.0f} calls/s")
+    print(f"  data(), column: {columnar_per_second:>12,.0f} calls/s")
+    print(
+        f"  full viewport:  median {statistics.median(times) * 1e3:.2f}ms, "
+        f"max {max(times) * 1e3:.2f}ms ({REPAINTS} repaints)"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
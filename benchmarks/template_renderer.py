@@ -0,0 +1,101 @@
+"""
+Compiles a renderer template that spells out the default renderer's lines (see
+renderers/compiled.py) and times exporting a roster with it against the
+hand-written default renderer, batched and row by row. Both must write the same file.
+
+run from the repo root:
+    python -m benchmarks.template_renderer [num_rows]
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import json
+import sys
+import time
+import tempfile
+import contextlib
+
+from typing import *
+
+from code_rypl.core import RplmFile, Coach
+from code_rypl.renderers import load_renderer
+
+from .storage_memory import roster_rows
+from .export_throughput import RowRenderer
+
+META = dict(school="Test School", sport="Hockey", category="Men's", season="2022-23")
+
+# the lines of renderers/default.py
+DEFAULT_TEMPLATE = dict(
+    player="{call}{num}\t{inst_school}'s {posn?, }{first} {last} ({num}), "
+    "\t{first} {last} ({num}), \t{last}",
+    coach="{call}{kind_abbv}\t{inst_school}'s {kind}, {first} {last}, "
+    "\t{first} {last}, \t{last}",
+    filename="{call}{season}",
+)
+
+
+def timed_export(model: RplmFile, renderer: Any, repeat: int = 5) -> tuple[float, str]:
+    best, text = float("inf"), ""
+    for _ in range(repeat):
+        # a fresh renderer each time, the coach abbreviations count up as they go
+        with contextlib.redirect_stdout(None):
+            fresh = renderer()
+        out = io.StringIO()
+        start = time.perf_counter()
+        model.export_into(out, renderer=fresh)
+        best = min(best, time.perf_counter() - start)
+        text = out.getvalue()
+    return best, text
+
+
+def main(num_rows: int) -> None:
+    model = RplmFile(
+        **META,
+        players=roster_rows(num_rows),
+        coaches=[
+            Coach.from_cols(f"C{n}", "Coachson", kind)
+            for n, kind in enumerate(["Head", "Assistant", "Assistant", "Assistant"])
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["CODE_RYPL_RENDERERS_DIR"] = tmpdir
+        with open(os.path.join(tmpdir, "spelled_out.json"), "w") as file:
+            json.dump(DEFAULT_TEMPLATE, file)
+
+        start = time.perf_counter()
+        template_cls = load_renderer("spelled_out")
+        compile_time = time.perf_counter() - start
+        default_cls = load_renderer("default")
+
+        def new(cls: type) -> Callable[[], Any]:
+            return lambda: cls(**META)
+
+        def by_row(cls: type) -> Callable[[], Any]:
+            return lambda: RowRenderer(cls(**META))
+
+        results = {
+            "default, batched": timed_export(model, new(default_cls)),
+            "template, batched": timed_export(model, new(template_cls)),
+            "default, per row": timed_export(model, by_row(default_cls)),
+            "template, per row": timed_export(model, by_row(template_cls)),
+        }
+        with contextlib.redirect_stdout(None):
+            names = (new(default_cls)(), new(template_cls)())
+        assert names[0].suggested_filename() == names[1].suggested_filename().upper()
+
+    expected = results["default, batched"][1]
+    for name, (_, text) in results.items():
+        assert text == expected, f"{name} differs from the default renderer"
+
+    print(f"compiled the template in {compile_time * 1e3:.1f}ms")
+    rows = num_rows + len(model.coaches)
+    for name, (seconds, _) in results.items():
+        print(f"  {name + ':':<19} {seconds:.3f}s ({rows / seconds:>10,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
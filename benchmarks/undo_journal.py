@@ -0,0 +1,124 @@
+"""
+Checks the undo journal replays random edit sequences exactly (undo everything
+gets back the original rows, redo everything gets back the edited rows) and
+reports the memory it holds, including for a 100k row remove_empty_lines.
+
+run from the repo root:
+    python -m benchmarks.undo_journal [num_rows] [num_edits]
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import random
+import tracemalloc
+
+from typing import *
+
+from code_rypl.model import Player, RplmList
+from code_rypl.column_store import ColumnStore
+from code_rypl.undo import UndoJournal
+
+
+def snapshot(rplm_list: RplmList) -> list[tuple[str, ...]]:
+    return [r.as_cols() for r in rplm_list]
+
+
+def random_edit(rplm_list: RplmList, rand: random.Random) -> None:
+    kind = rand.random()
+    row = rand.randrange(len(rplm_list))
+    if kind < 0.5:
+        rplm_list.set_rplm_field(row, rand.randrange(4), rand.choice(["", "a", "b c"]))
+    elif kind < 0.7:
+        rplm_list.insert(row, Player.from_cols("x", "y", str(row), ""))
+    elif kind < 0.8:
+        rplm_list.insert(row, Player.empty())
+    elif kind < 0.95:
+        rplm_list.pop(row)
+    else:
+        rplm_list.remove_empty_lines()
+
+
+def check_replay(num_rows: int, num_edits: int, *, columnar: bool) -> None:
+    rand = random.Random(num_rows)
+    rows = [
+        Player.empty() if n % 4 == 0 else Player.from_cols(f"F{n}", f"L{n}", str(n), "")
+        for n in range(num_rows)
+    ]
+    rplm_list = RplmList(ColumnStore(Player, rows) if columnar else rows)
+    # no coalescing and no budget so every edit can be checked
+    journal = UndoJournal(rplm_list, byte_budget=sys.maxsize, coalesce_seconds=-1)
+
+    original = snapshot(rplm_list)
+    for _ in range(num_edits):
+        random_edit(rplm_list, rand)
+    edited = snapshot(rplm_list)
+
+    while journal.undo():
+        pass
+    assert snapshot(rplm_list) == original, "undoing every edit did not restore"
+    while journal.redo():
+        pass
+    assert snapshot(rplm_list) == edited, "redoing every edit did not re-apply"
+
+    print(
+        f"replay ok: {num_edits} edits on {num_rows:,} rows "
+        f"({'ColumnStore' if columnar else 'list'}), journal held {journal.nbytes:,} B"
+    )
+
+
+def check_coalescing() -> None:
+    now = [0.0]
+    rplm_list = RplmList([Player.empty()])
+    journal = UndoJournal(rplm_list, clock=lambda: now[0])
+
+    for text in ("J", "Jo", "Joe"):
+        rplm_list.set_rplm_field(0, 0, text)
+        now[0] += 0.5
+    now[0] += 10
+    rplm_list.set_rplm_field(0, 0, "Joseph")
+
+    assert journal.undo() and rplm_list.get_rplm_field(0, 0) == "Joe"
+    assert journal.undo() and rplm_list.get_rplm_field(0, 0) == ""
+    assert not journal.undo()
+    print("coalescing ok: 3 quick sets of one cell undo as 1 step")
+
+
+def check_bulk_footprint(num_rows: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    rplm_list = RplmList(
+        Player.empty() if n % 2 else Player.from_cols(f"F{n}", f"L{n}", str(n), "")
+        for n in range(num_rows)
+    )
+    gc.collect()
+    list_bytes, _ = tracemalloc.get_traced_memory()
+
+    journal = UndoJournal(rplm_list)
+    before, _ = tracemalloc.get_traced_memory()
+    rplm_list.remove_empty_lines()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"remove_empty_lines on {num_rows:,} rows: model ~{list_bytes:,} B, "
+        f"journal {journal.nbytes:,} B, total memory change {after - before:+,} B"
+    )
+    assert journal.nbytes < list_bytes / 10, "the journal should be a small fraction"
+
+    journal.undo()
+    assert len(rplm_list) == num_rows
+
+
+def main(num_rows: int, num_edits: int) -> None:
+    check_coalescing()
+    for columnar in (False, True):
+        check_replay(200, num_edits, columnar=columnar)
+    check_bulk_footprint(num_rows)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100_000, 2_000][len(args) :]))
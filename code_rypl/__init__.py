@@ -1,7 +1,20 @@
-from .app import run, CodeRyplApplication
-from .document import CodeRyplDocumentWindow
-from .model import Player, Coach, Rplm, RplmFile, RplmList
+from .core import Player, Coach, Rplm
 from .renderers.template import RplmFileRenderer
 
-if __name__ == "__main__":
-    run()
+# the gui (and so PySide6) is only imported once one of these is used, so the core
+# (see core.py) can be imported without it
+_GUI_NAMES = {
+    "run": "app",
+    "CodeRyplApplication": "app",
+    "CodeRyplDocumentWindow": "document",
+    "RplmFile": "model",
+    "RplmList": "model",
+}
+
+
+def __getattr__(name: str):
+    if name in _GUI_NAMES:
+        import importlib
+
+        return getattr(importlib.import_module(f".{_GUI_NAMES[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 try:
-    from code_rypl import run
+    # just the core, the gui is imported by code_rypl.run (see __init__.py)
+    import code_rypl
 except ModuleNotFoundError as err:
     import sys
 
@@ -23,4 +24,15 @@ except ModuleNotFoundError as err:
 
 
 if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["export"]:
+        from code_rypl.batch_export import main
+
+        sys.exit(main(sys.argv[2:]))
+
+    # a static import (not code_rypl.run, which is loaded lazily) so that
+    # pyinstaller finds the gui modules when freezing the app
+    from code_rypl.app import run
+
     run()
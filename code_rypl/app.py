@@ -9,9 +9,12 @@ from . import versioning
 
 
 from .document import CodeRyplDocumentWindow
+from .model import blocking_popup
+from . import recovery
+from .recent import RecentFiles
 
 import PySide6
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QMessageBox
 
 print(f"using PySide version {PySide6.__version__}")
 print("--- CodeRypl version info ---")
@@ -26,13 +29,68 @@ class CodeRyplApplication(QApplication):
         super().__init__(*args, **kwargs)
 
         self._documents: list[CodeRyplDocumentWindow] = []
+        self._offered_recovery = False
+        # shared by the Open Recent menus of every document
+        self.recent_files = RecentFiles()
 
     def new_document(self, filename: None | str = None) -> CodeRyplDocumentWindow:
+        # the first document opened also gets back anything lost in a crash
+        if not self._offered_recovery:
+            self._offered_recovery = True
+            self.offer_recovery()
+
         document = CodeRyplDocumentWindow(self, filename)
         self._documents.append(document)
         document.show()
         return document
 
+    def offer_recovery(self) -> None:
+        """
+        asks to replay the journals left behind by crashed sessions (see recovery.py)
+        """
+        for path in recovery.orphaned_journals():
+            try:
+                header, records = recovery.read_journal(path)
+            except Exception as err:
+                print(f"setting aside unreadable recovery journal {path}: {err}")
+                recovery.set_aside(path)
+                continue
+
+            if not len(records):  # nothing unsaved
+                path.unlink()
+                continue
+
+            name = header["filename"] or "an untitled document"
+            popup = QMessageBox()
+            popup.setWindowTitle("Recover Unsaved Edits")
+            popup.setText(
+                f"CodeRypl closed unexpectedly with {len(records)} unsaved edit(s) "
+                f"to {name}. Recover them?"
+            )
+            popup.setStandardButtons(QMessageBox.Yes | QMessageBox.Discard)
+            popup.setDefaultButton(QMessageBox.Yes)
+            popup.setIcon(QMessageBox.Warning)
+
+            if popup.exec() != QMessageBox.Yes:
+                path.unlink()
+                continue
+
+            try:
+                journal = recovery.recover(path)
+            except Exception as err:
+                # or it would fail again on every launch
+                failed = recovery.set_aside(path)
+                blocking_popup(
+                    f"Could not recover ({type(err).__name__}): {err}\n\n"
+                    f"The unsaved edits were kept in {failed}"
+                )
+                continue
+
+            document = CodeRyplDocumentWindow(self)
+            document.load_file_model(journal.model, recovery=journal)
+            self._documents.append(document)
+            document.show()
+
     def closeEvent(self, event) -> None:
         print("Closing all documents")
         for document in self._documents:
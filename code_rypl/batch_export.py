@@ -0,0 +1,224 @@
+"""
+Exporting many .rplm files from the command line, without the GUI:
+
+    python -m code_rypl export <files or dirs> [--renderer=default] [--jobs N] [--out DIR]
+        [--format txt --format csv ...]
+
+Each file is loaded, rendered and written in a worker process. A file that fails
+is reported and the rest of the batch carries on. The exit status is 1 if any file
+failed.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import pathlib
+import argparse
+
+from typing import *
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .core import RplmFile
+from .export import EXPORT_FORMATS
+from .renderers import load_renderer
+
+
+class FileResult(NamedTuple):
+    source: str
+    output: None | str
+    rows: int
+    seconds: float
+    error: None | str  # None if it exported
+
+    def __str__(self) -> str:
+        if self.error is not None:
+            return f"FAILED {self.source}: {self.error}"
+        return (
+            f"{self.source} -> {self.output} ({self.rows:,} rows, {self.seconds:.3f}s)"
+        )
+
+
+def find_rplm_files(paths: Iterable[str]) -> list[pathlib.Path]:
+    """
+    the given files, and the .rplm files anywhere under the given directories
+    """
+    found: list[pathlib.Path] = []
+    for raw in paths:
+        path = pathlib.Path(raw)
+        if path.is_dir():
+            found.extend(sorted(path.rglob("*.rplm")))
+        else:
+            found.append(path)  # a missing file is reported when it is exported
+    return found
+
+
+def output_path(source: pathlib.Path, out_dir: None | pathlib.Path) -> pathlib.Path:
+    return (source.parent if out_dir is None else out_dir) / (source.stem + ".txt")
+
+
+def format_outputs(output: str, formats: Sequence[str]) -> dict[str, str]:
+    """
+    eg: "out/a.txt", ["txt", "csv"] -> {"txt": "out/a.txt", "csv": "out/a.csv"}
+    """
+    path = pathlib.Path(output)
+    return {
+        name: str(path.with_suffix(EXPORT_FORMATS[name].suffix)) for name in formats
+    }
+
+
+def export_file(
+    source: str, output: str, renderer_name: str, formats: Sequence[str] = ("txt",)
+) -> FileResult:
+    """
+    exports one .rplm file into output (and the other formats next to it), run
+    in the worker processes
+    """
+    start = time.perf_counter()
+    try:
+        model = RplmFile.open(source)
+        renderer = load_renderer(renderer_name)(**model.meta_as_dict())
+        if list(formats) == ["txt"]:
+            # no export cache, it would be left next to every source in the batch,
+            # in directories that may be shared or read-only
+            stats = model.export_to(output, renderer=renderer, use_cache=False)
+        else:
+            outputs = format_outputs(output, formats)
+            stats = model.export_formats(outputs, renderer=renderer)
+            output = ", ".join(outputs.values())
+    except Exception as err:
+        return FileResult(
+            source, None, 0, time.perf_counter() - start, f"{type(err).__name__}: {err}"
+        )
+    return FileResult(source, output, stats.rows, time.perf_counter() - start, None)
+
+
+def export_files(
+    jobs: list[tuple[str, str]],
+    renderer_name: str,
+    num_workers: int,
+    formats: Sequence[str] = ("txt",),
+) -> Iterator[FileResult]:
+    """
+    exports each (source, output), yielding the results as they finish
+    """
+    if num_workers <= 1:
+        for source, output in jobs:
+            yield export_file(source, output, renderer_name, formats)
+        return
+
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        pending = {
+            pool.submit(export_file, source, output, renderer_name, formats): source
+            for source, output in jobs
+        }
+        for future in as_completed(pending):
+            try:
+                yield future.result()
+            except Exception as err:  # eg: the worker process died
+                yield FileResult(
+                    pending[future], None, 0, 0.0, f"{type(err).__name__}: {err}"
+                )
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m code_rypl export",
+        description="export .rplm files into replacement .txt files",
+    )
+    parser.add_argument("paths", nargs="+", help=".rplm files or directories of them")
+    parser.add_argument(
+        "--renderer",
+        default="default",
+        help="the renderer used for every file, built in or the name of a template "
+        "in the renderers dir (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: one per cpu)",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        dest="formats",
+        action="append",
+        choices=list(EXPORT_FORMATS),
+        help="a format to export, repeat it to export several from one pass over "
+        "each file (default: txt)",
+    )
+    parser.add_argument(
+        "--out",
+        type=pathlib.Path,
+        default=None,
+        help="directory for the .txt files (default: next to each .rplm file)",
+    )
+    args = parser.parse_args(argv)
+    # in order, without repeats
+    args.formats = list(dict.fromkeys(args.formats or ["txt"]))
+    return args
+
+
+def main(argv: Sequence[str]) -> int:
+    args = parse_args(argv)
+    # check the renderer (and compile its template) once, not in every worker
+    try:
+        load_renderer(args.renderer)
+    except ValueError as err:
+        print(err, file=sys.stderr)
+        return 2
+
+    sources = find_rplm_files(args.paths)
+    if not len(sources):
+        print("no .rplm files found", file=sys.stderr)
+        return 1
+    if args.out is not None:
+        args.out.mkdir(parents=True, exist_ok=True)
+
+    # two sources exporting into the same file would overwrite each other
+    jobs: list[tuple[str, str]] = []
+    results: list[FileResult] = []
+    claimed: dict[pathlib.Path, pathlib.Path] = {}
+    for source in sources:
+        output = output_path(source, args.out)
+        if output in claimed:
+            results.append(
+                FileResult(
+                    str(source),
+                    None,
+                    0,
+                    0.0,
+                    f"would overwrite {output} exported from {claimed[output]}",
+                )
+            )
+            continue
+        claimed[output] = source
+        jobs.append((str(source), str(output)))
+
+    for result in results:
+        print(result)
+
+    start = time.perf_counter()
+    num_workers = max(1, min(args.jobs, len(jobs)))
+    for result in export_files(jobs, args.renderer, num_workers, args.formats):
+        print(result)
+        results.append(result)
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result.error is not None]
+    rows = sum(result.rows for result in results)
+    print(
+        f"exported {len(results) - len(failed)} of {len(results)} files, "
+        f"{rows:,} rows in {elapsed:.2f}s with {num_workers} worker(s) "
+        f"({len(jobs) / elapsed if elapsed > 0 else 0:,.1f} files/s, "
+        f"{rows / elapsed if elapsed > 0 else 0:,.0f} rows/s)"
+    )
+    if len(failed):
+        print(f"{len(failed)} file(s) failed:", file=sys.stderr)
+        for result in failed:
+            print(f"  {result.source}: {result.error}", file=sys.stderr)
+        return 1
+    return 0
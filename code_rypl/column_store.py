@@ -0,0 +1,381 @@
+"""
+A column-oriented backing store for RplmList.
+
+Instead of one Rplm object (plus its `_cols` dict) per row, every column is kept
+as its own compact sequence. Low-cardinality columns (eg: a player's `posn` or a
+coach's `kind`) are dictionary encoded into an array of small integer codes, the
+rest are plain lists of interned strings so repeated names share one object.
+
+Rows are handed out as lightweight views that satisfy the Rplm api. A view is
+positional: it reads and writes whatever row sits at its index, so it should not
+be held across a structural change (insert, pop, etc) of the store.
+"""
+
+from __future__ import annotations
+
+import sys
+import itertools
+from array import array
+
+from typing import *
+
+if TYPE_CHECKING:
+    from .core import Rplm, RplmRows
+
+R = TypeVar("R", bound="Rplm")
+
+# (max number of distinct values, array typecode) from smallest to largest
+_CODE_WIDTHS = ((1 << 8, "B"), (1 << 16, "H"), (1 << 32, "I"))
+
+
+class EncodedColumn:
+    """
+    a dictionary encoded column of strings, stored as an array of codes into a
+    table of the distinct values seen so far
+    """
+
+    __slots__ = ("_codes", "_values", "_index")
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self._codes = array("B")
+        self._values: list[str] = []
+        self._index: dict[str, int] = {}
+        self.extend(values)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._values
+        return (values[code] for code in self._codes)
+
+    def __getitem__(self, row: int) -> str:
+        return self._values[self._codes[row]]
+
+    def __setitem__(self, row: int, value: str) -> None:
+        self._codes[row] = self._encode(value)
+
+    def __delitem__(self, row: int | slice) -> None:
+        del self._codes[row]
+
+    # NOTE: encode before touching self._codes, encoding may swap in a wider array
+
+    def insert(self, row: int, value: str) -> None:
+        code = self._encode(value)
+        self._codes.insert(row, code)
+
+    def append(self, value: str) -> None:
+        code = self._encode(value)
+        self._codes.append(code)
+
+    def extend(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.append(value)
+
+    def insert_many(self, row: int, values: Iterable[str]) -> None:
+        codes = [self._encode(value) for value in values]
+        self._codes[row:row] = array(self._codes.typecode, codes)
+
+    def compress(self, selectors: Sequence[bool]) -> None:
+        self._codes = array(
+            self._codes.typecode, itertools.compress(self._codes, selectors)
+        )
+
+    def cardinality(self) -> int:
+        return len(self._values)
+
+    def _encode(self, value: str) -> int:
+        code = self._index.get(value)
+        if code is not None:
+            return code
+
+        code = len(self._values)
+        self._values.append(value)
+        self._index[value] = code
+
+        # widen the code array once it can no longer hold the new code
+        for limit, typecode in _CODE_WIDTHS:
+            if code < limit:
+                if typecode != self._codes.typecode:
+                    self._codes = array(typecode, self._codes)
+                break
+        else:
+            raise OverflowError("too many distinct values in an encoded column")
+
+        return code
+
+
+class PlainColumn(list):
+    """
+    a column of interned strings, so repeated values share one string object
+    """
+
+    __slots__ = ()
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        super().__init__(map(sys.intern, values))
+
+    def __setitem__(self, row, value) -> None:  # type: ignore[override]
+        super().__setitem__(row, sys.intern(value))
+
+    def insert(self, row, value) -> None:  # type: ignore[override]
+        super().insert(row, sys.intern(value))
+
+    def append(self, value) -> None:  # type: ignore[override]
+        super().append(sys.intern(value))
+
+    def extend(self, values) -> None:  # type: ignore[override]
+        super().extend(map(sys.intern, values))
+
+    def insert_many(self, row: int, values: Iterable[str]) -> None:
+        super().__setitem__(slice(row, row), list(map(sys.intern, values)))
+
+    def compress(self, selectors: Sequence[bool]) -> None:
+        # values are already interned, bypass __setitem__
+        super().__setitem__(slice(None), list(itertools.compress(self, selectors)))
+
+
+Column = Union[EncodedColumn, PlainColumn]
+
+
+class RplmRowView:
+    """
+    mixin for the per-type row view classes handed out by a ColumnStore.
+    it overrides every Rplm method that would touch `_cols` to read from the store
+    """
+
+    # NOTE: Rplm is not slotted so the views still get a __dict__, but views are
+    # only created on access and never stored so their size does not matter
+    __slots__ = ("_store", "_row")
+
+    _store: ColumnStore
+    _row: int
+
+    def __init__(self, store: ColumnStore, row: int) -> None:
+        self._store = store
+        self._row = row
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(enumerate(self.as_cols()))})"
+
+    def hashstr(self) -> str:
+        return "({})".format(", ".join(self.as_cols()))
+
+    def as_cols(self) -> tuple[str, ...]:
+        return self._store.row_values(self._row)
+
+    def get_col(self, col: int) -> str:
+        return self._store.get(self._row, col)
+
+    def set_col(self, col: int, value: str) -> None:
+        self._store.set(self._row, col, value)
+
+    def field(self, name: str) -> str:
+        return self._store.get(self._row, self.field_spec[name])  # type: ignore[attr-defined]
+
+    def as_fields(self) -> dict[str, str]:
+        values = self.as_cols()
+        return {f: values[col] for f, col in self.field_spec.items()}  # type: ignore[attr-defined]
+
+    def isempty(self) -> bool:
+        return not any(self.as_cols())
+
+    def detached(self) -> Rplm:
+        """
+        returns a standalone copy of the row that does not refer to the store
+        """
+        return self._store.data_type.from_cols(*self.as_cols())
+
+
+_view_types: dict[type, type] = {}
+
+
+def view_type_for(data_type: Type[R]) -> Type[R]:
+    """
+    makes (and caches) a row view class that is a subclass of `data_type`
+    so isinstance checks and the classmethods (prompt_for_col, etc) still work
+    """
+    view_type = _view_types.get(data_type)
+    if view_type is None:
+        view_type = _view_types[data_type] = type(
+            f"{data_type.__name__}View",
+            (RplmRowView, data_type),
+            {"__slots__": ()},
+        )
+    return view_type  # type: ignore[return-value]
+
+
+class ColumnStore(MutableSequence[R]):
+    """
+    A list-like container of Rplm rows stored column by column.
+    Use as the `data` of an RplmList in place of an iterable of rows.
+    """
+
+    data_type: Type[R]
+    _view_type: Callable[[ColumnStore, int], R]
+    _columns: tuple[Column, ...]
+
+    # the RplmRows using this store (if any), it is told about every set
+    owner: None | RplmRows = None
+
+    def __init__(
+        self,
+        data_type: Type[R],
+        rows: Iterable[Rplm] = (),
+        *,
+        encoded: None | Iterable[str] = None,
+    ) -> None:
+        self.data_type = data_type
+        self._view_type = view_type_for(data_type)  # type: ignore[assignment]
+
+        spec = data_type.field_spec
+        encoded = set(
+            getattr(data_type, "encoded_fields", ()) if encoded is None else encoded
+        )
+        assert encoded <= set(spec), f"unknown encoded fields {encoded - set(spec)}"
+        self.encoded_fields = frozenset(encoded)
+
+        encoded_cols = {spec[f] for f in encoded}
+        self._columns = tuple(
+            EncodedColumn() if col in encoded_cols else PlainColumn()
+            for col in range(data_type.num_cols())
+        )
+
+        self.extend(rows)
+
+    @classmethod
+    def from_cols(
+        cls,
+        data_type: Type[R],
+        cols: Iterable[Iterable[str]],
+        *,
+        encoded: None | Iterable[str] = None,
+    ) -> ColumnStore[R]:
+        """
+        build a store straight from column sequences without making any rows
+        """
+        store = cls(data_type, encoded=encoded)
+        cols = tuple(cols)
+        assert (
+            len(cols) == data_type.num_cols()
+        ), f"expected {data_type.num_cols()} columns, got {len(cols)}"
+        for column, values in zip(store._columns, cols):
+            column.extend(values)
+        assert len(set(map(len, store._columns))) == 1, "columns of unequal length"
+        return store
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}[{self.data_type.__name__}](len={len(self)})"
+
+    def new_like(self, rows: Iterable[Rplm] = ()) -> ColumnStore[R]:
+        """
+        a new store of the same row type and encoding holding `rows`
+        """
+        return type(self)(self.data_type, rows, encoded=self.encoded_fields)
+
+    # --- cell access ---
+
+    def get(self, row: int, col: int) -> str:
+        return self._columns[col][row]
+
+    def set(self, row: int, col: int, value: str) -> None:
+        column = self._columns[col]
+        old = column[row]
+        if old == value:
+            return
+        column[row] = value
+        if self.owner is not None:
+            self.owner._rplm_changed(self._view_type(self, row), col, old)
+
+    def row_values(self, row: int) -> tuple[str, ...]:
+        return tuple(column[row] for column in self._columns)
+
+    def column(self, col: int) -> Sequence[str]:
+        """
+        returns the values of a column (read only, do not mutate)
+        """
+        return self._columns[col]  # type: ignore[return-value]
+
+    def cardinality(self, col: int) -> int:
+        column = self._columns[col]
+        if isinstance(column, EncodedColumn):
+            return column.cardinality()
+        else:
+            return len(set(column))
+
+    # --- MutableSequence interface ---
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __iter__(self) -> Iterator[R]:
+        view_type = self._view_type
+        return (view_type(self, row) for row in range(len(self)))
+
+    @overload
+    def __getitem__(self, row: int) -> R: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> list[R]: ...
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self._view_type(self, r) for r in range(*row.indices(len(self)))]
+        return self._view_type(self, self._normalize_row(row))
+
+    def __setitem__(self, row, rplm) -> None:  # type: ignore[override]
+        assert not isinstance(row, slice), "slice assignment is not supported"
+        row = self._normalize_row(row)
+        for column, value in zip(self._columns, rplm.as_cols()):
+            column[row] = value
+
+    def __delitem__(self, row: int | slice) -> None:
+        if not isinstance(row, slice):
+            row = self._normalize_row(row)
+        for column in self._columns:
+            del column[row]
+
+    def insert(self, row: int, rplm: Rplm) -> None:
+        for column, value in zip(self._columns, rplm.as_cols()):
+            column.insert(row, value)
+
+    def append(self, rplm: Rplm) -> None:
+        for column, value in zip(self._columns, rplm.as_cols()):
+            column.append(value)
+
+    def extend(self, rows: Iterable[Rplm]) -> None:
+        columns = self._columns
+        for rplm in rows:
+            for column, value in zip(columns, rplm.as_cols()):
+                column.append(value)
+
+    def insert_many(self, row: int, rows: Sequence[Rplm]) -> None:
+        """
+        insert several rows at once, one splice per column instead of one per row
+        """
+        row_cols = [rplm.as_cols() for rplm in rows]
+        for col, column in enumerate(self._columns):
+            column.insert_many(row, [cols[col] for cols in row_cols])
+
+    def pop(self, row: int = -1) -> R:
+        row = self._normalize_row(row)
+        rplm = self.data_type.from_cols(*self.row_values(row))
+        del self[row]
+        return rplm
+
+    def compress(self, selectors: Iterable[bool]) -> None:
+        """
+        keep only the rows whose selector is truthy, in one pass per column
+        """
+        selectors = list(selectors)
+        assert len(selectors) == len(self), "one selector is needed per row"
+        for column in self._columns:
+            column.compress(selectors)
+
+    def _normalize_row(self, row: int) -> int:
+        length = len(self)
+        if row < 0:
+            row += length
+        if not 0 <= row < length:
+            raise IndexError(f"row {row} out of range for {self!r}")
+        return row
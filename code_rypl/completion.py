@@ -0,0 +1,92 @@
+"""
+Completers for the metadata inputs that search their own index (see schools.py)
+instead of letting QCompleter filter a string list on every keystroke.
+"""
+
+from __future__ import annotations
+
+from typing import *
+
+from PySide6.QtCore import (
+    Qt,
+    QEvent,
+    QObject,
+    QModelIndex,
+    QAbstractListModel,
+)
+from PySide6.QtWidgets import QCompleter, QLineEdit
+
+from .schools import SchoolIndex
+
+
+class SchoolCompletionModel(QAbstractListModel):
+    """
+    the schools completing what was typed, the index is only loaded when first
+    needed (eg: the first time the input is focused)
+    """
+
+    def __init__(
+        self,
+        parent: None | QObject = None,
+        load: Callable[[], SchoolIndex] = SchoolIndex.load,
+    ) -> None:
+        super().__init__(parent)
+        self._load = load
+        self._index: None | SchoolIndex = None
+        self._matches: list[str] = []
+
+    @property
+    def index_loaded(self) -> bool:
+        return self._index is not None
+
+    def school_index(self) -> SchoolIndex:
+        if self._index is None:
+            self._index = self._load()
+        return self._index
+
+    def set_typed(self, text: str) -> None:
+        matches = self.school_index().complete(text)
+        if matches == self._matches:
+            return
+        self.beginResetModel()
+        self._matches = matches
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._matches)
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole):  # type: ignore
+        if role in {Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole}:
+            if 0 <= index.row() < len(self._matches):
+                return self._matches[index.row()]
+        return None
+
+
+class SchoolCompleter(QCompleter):
+    """
+    a popup of the schools with a word starting with what was typed, loads the
+    schools the first time the line edit is focused
+    """
+
+    def __init__(
+        self,
+        line_edit: QLineEdit,
+        load: Callable[[], SchoolIndex] = SchoolIndex.load,
+    ) -> None:
+        super().__init__(line_edit)
+        self._line_edit = line_edit
+        self.completion_model = model = SchoolCompletionModel(self, load)
+        self.setModel(model)
+        # the model already holds only the matches, in order
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        # the model is updated before the line edit asks the completer to complete
+        line_edit.textEdited.connect(model.set_typed)
+        line_edit.installEventFilter(self)
+        line_edit.setCompleter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if watched is self._line_edit and event.type() == QEvent.Type.FocusIn:
+            self.completion_model.school_index()
+        return super().eventFilter(watched, event)
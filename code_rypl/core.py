@@ -0,0 +1,1487 @@
+"""
+The rows, metadata and .rplm file I/O of a document, with no Qt dependency.
+
+This is everything needed to open, edit, save and render a .rplm file, so batch
+tools (see batch_export.py) can use it without importing PySide6. The Qt models
+the GUI edits through are layered on top in model.py: RplmList and
+ColumnValueIndex subclass RplmRows and ColumnValues here and turn the change
+hooks (_begin_insert, _end_insert, ...) into the matching Qt signals.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import mmap
+import time
+import functools
+import itertools
+import contextlib
+from array import array
+
+from typing import *
+from typing import TextIO, BinaryIO
+
+import pathlib
+
+from .renderers.template import RplmFileRenderer
+from .column_store import ColumnStore
+from .edits import (
+    Edit,
+    EditGroup,
+    CellSet,
+    RowsInserted,
+    RowsRemoved,
+    EmptyRowsRemoved,
+    EmptyRowsInserted,
+    index_runs,
+)
+from .renderers.tools import normalize_title
+from .undo import UndoJournal
+
+# msgpack is imported where it is used, so it is not loaded until a file is opened
+# or saved (it is a noticeable part of starting the GUI otherwise)
+if TYPE_CHECKING:
+    import msgpack  # type: ignore[import]
+
+    from .export import ExportStats
+from .saving import write_atomically
+from .schema import (
+    Problems,
+    RplmFileError,
+    check_meta,
+    section_validator,
+    row_factory,
+)
+
+R = TypeVar("R", bound="Rplm")
+F = TypeVar("F", bound="RplmFile")
+
+# content digests are sums of row hashes, kept to 64 bits
+_DIGEST_MASK = (1 << 64) - 1
+
+# rows packed into memory at a time when saving, before being written out
+SAVE_CHUNK_ROWS = 1024
+
+# v2 .rplm files start with these bytes, v1 files start with a msgpack map
+RPLM_V2_MAGIC = b"RPLM\x00"
+# the format new files are saved in, opened files are saved in the format they had.
+# v2 is opt in (--rplm-v2) as older builds and other tools only read v1
+DEFAULT_FORMAT_VERSION = 2 if {"--rplm-v2"} & set(sys.argv) else 1
+
+# past this many separate runs of removed (or restored) rows a model reset is cheaper
+# for the view than a begin/end signal pair per run
+MAX_PRECISE_REMOVE_RUNS = 32
+
+
+@contextlib.contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    pauses the cyclic garbage collector, for bulk loads that allocate lots of
+    (acyclic) rows which would otherwise set off repeated full collections
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _row_hash(cols: tuple[str, ...]) -> int:
+    return hash(cols) & _DIGEST_MASK
+
+
+class Rplm:
+
+    field_spec: ClassVar[dict[str, int]]
+    # low-cardinality fields a ColumnStore dictionary encodes
+    encoded_fields: ClassVar[tuple[str, ...]] = ()
+    _cols: dict[int, str]
+
+    # the RplmRows holding this row (if any), it is told about every set_col
+    _owner: None | RplmRows = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls is Rplm:
+            raise TypeError("cannot instantiate abstract class Rplm")
+        return object.__new__(cls)
+
+    def __init__(self, **kwargs: str) -> None:
+
+        spec = self.field_spec
+
+        assert (
+            len(extras := set(kwargs) - set(spec)) == 0
+        ), f"unexpedted kwargs: {extras}"
+
+        assert (
+            len(missing := set(spec) - set(kwargs)) == 0
+        ), f"missing kwargs: {missing}"
+
+        assert set(spec) == set(kwargs), (
+            f"argument errors, got {set(kwargs)}, "
+            "however this assert should not have been reached, please report this bug"
+        )
+
+        # kept in column order so as_cols can just take the values
+        self._cols = {col: kwargs[f] for f, col in spec.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._cols})"
+
+    @classmethod
+    def from_cols(self: Type[R], *args: str) -> R:
+        assert len(args) == len(
+            self.field_spec
+        ), f"expected {len(self.field_spec)}, got {len(args)}"
+        return self(**{f: args[col] for f, col in self.field_spec.items()})
+
+    @classmethod
+    def trusted(cls: Type[R], cols: dict[int, str]) -> R:
+        """
+        makes a row without any checks, cols must map every column (in column
+        order) to a str. for loaders that have validated their data (see schema.py)
+        """
+        rplm = object.__new__(cls)
+        rplm._cols = cols
+        return rplm
+
+    def hashstr(self) -> str:
+        return "({})".format(", ".join(self._cols.values()))
+
+    def as_cols(self) -> tuple[str, ...]:
+        return tuple(self._cols.values())
+
+    def get_col(self, col: int) -> str:
+        return self._cols[col]
+
+    def set_col(self, col: int, value: str) -> None:
+        old = self._cols[col]
+        if old == value:
+            return
+        self._cols[col] = value
+        if self._owner is not None:
+            self._owner._rplm_changed(self, col, old)
+
+    def field(self, name: str) -> str:
+        return self._cols[self.field_spec[name]]
+
+    def as_fields(self) -> dict[str, str]:
+        return {f: self.field(f) for f in self.field_spec}
+
+    def isempty(self) -> bool:
+        return set(self._cols.values()) == {""}
+
+    @classmethod
+    def empty(cls: Type[R]) -> R:
+        return cls(**{f: "" for f in cls.field_spec})
+
+    @classmethod
+    def num_cols(cls) -> int:
+        return len(cls.field_spec)  # type: ignore
+
+    @classmethod
+    @functools.cache
+    def prompts(cls) -> tuple[str, ...]:
+        """
+        the prompt (field name) of each column, in column order
+        """
+        by_col = {col: prompt for prompt, col in cls.field_spec.items()}
+        return tuple(by_col[col] for col in range(len(by_col)))
+
+    @classmethod
+    def prompt_for_col(cls, col: int) -> str:
+        prompts = cls.prompts()
+        if not 0 <= col < len(prompts):
+            raise RuntimeError(f"unknown column {col} for {cls.__name__}")
+        return prompts[col]
+
+
+class Player(Rplm):
+
+    # TODO: make this a tuple
+    field_spec = dict(
+        first=0,
+        last=1,
+        num=2,
+        posn=3,
+    )
+
+    encoded_fields = ("posn",)
+
+
+class Coach(Rplm):
+
+    field_spec = dict(
+        first=0,
+        last=1,
+        kind=2,
+    )
+
+    encoded_fields = ("kind",)
+
+
+class MetaAsDict(TypedDict):
+    school: str
+    sport: str
+    category: str
+    season: str
+
+
+class PlayerAsDict(TypedDict):
+    first: str
+    last: str
+    num: str
+    posn: str
+
+
+class CoachAsDict(TypedDict):
+    first: str
+    last: str
+    kind: str
+
+
+class SaveDict(TypedDict):
+    meta: MetaAsDict
+    players: tuple[PlayerAsDict, ...]
+    coaches: tuple[CoachAsDict, ...]
+
+
+def pack_rplm(
+    meta: MetaAsDict,
+    players: tuple[int, Iterable[tuple[str, ...]]],
+    coaches: tuple[int, Iterable[tuple[str, ...]]],
+) -> Iterator[bytes]:
+    """
+    packs the same layout as RplmFile._to_save_dict() would, but yields a chunk of
+    rows at a time so the whole file is never held in memory as dicts or bytes.
+    the rows are given as (number of rows, column tuples)
+    """
+    import msgpack  # type: ignore[import]
+
+    packer = msgpack.Packer(autoreset=False)
+
+    packer.pack_map_header(3)
+    packer.pack("meta")
+    packer.pack(meta)
+
+    for section, rplm_type, (num_rows, rows) in (
+        ("players", Player, players),
+        ("coaches", Coach, coaches),
+    ):
+        spec = rplm_type.field_spec.items()
+        packer.pack(section)
+        packer.pack_array_header(num_rows)
+        for count, cols in enumerate(rows, start=1):
+            packer.pack({f: cols[col] for f, col in spec})
+            if count % SAVE_CHUNK_ROWS == 0:
+                yield packer.bytes()
+                packer.reset()
+
+    yield packer.bytes()
+    packer.reset()
+
+
+class _StringTable(dict):
+    """
+    maps each distinct str to its index, adding the ones it has not seen yet
+    """
+
+    def __missing__(self, string: str) -> int:
+        self[string] = index = len(self)
+        return index
+
+
+def pack_rplm_v2(
+    meta: MetaAsDict,
+    players: tuple[int, Iterable[tuple[str, ...]]],
+    coaches: tuple[int, Iterable[tuple[str, ...]]],
+) -> Iterator[bytes]:
+    """
+    the v2 layout is RPLM_V2_MAGIC then a msgpack stream of:
+        - a header map: version, meta, and the rows / field names of each section
+          and the size / index typecode of the string table
+        - the string table, an array of every distinct str in the rows
+        - for each section, for each field: a bin of the little-endian indices of
+          that column's values in the string table
+    takes the same arguments as pack_rplm
+    """
+    import msgpack  # type: ignore[import]
+
+    strings = _StringTable()
+
+    sections = []
+    for section, rplm_type, (num_rows, rows) in (
+        ("players", Player, players),
+        ("coaches", Coach, coaches),
+    ):
+        columns = [array("I") for _ in range(rplm_type.num_cols())]
+        # transpose a chunk of rows at a time so the interning runs in map()
+        rows = iter(rows)
+        while len(chunk := tuple(itertools.islice(rows, SAVE_CHUNK_ROWS))):
+            for column, values in zip(columns, zip(*chunk)):
+                column.extend(map(strings.__getitem__, values))
+        assert all(len(c) == num_rows for c in columns), f"{section} changed length"
+        sections.append((section, rplm_type, columns))
+
+    typecode = "B" if len(strings) <= 0xFF else "H" if len(strings) <= 0xFFFF else "I"
+
+    packer = msgpack.Packer(autoreset=False)
+    packer.pack(
+        dict(
+            version=2,
+            meta=meta,
+            rows={section: len(columns[0]) for section, _, columns in sections},
+            fields={
+                section: list(rplm_type.field_spec)
+                for section, rplm_type, _ in sections
+            },
+            strings=len(strings),
+            index=typecode,
+        )
+    )
+    yield RPLM_V2_MAGIC + packer.bytes()
+    packer.reset()
+
+    packer.pack_array_header(len(strings))
+    for count, string in enumerate(strings, start=1):
+        packer.pack(string)
+        if count % (SAVE_CHUNK_ROWS * 4) == 0:
+            yield packer.bytes()
+            packer.reset()
+    yield packer.bytes()
+    packer.reset()
+
+    for _, rplm_type, columns in sections:
+        for field, col in rplm_type.field_spec.items():
+            indices = array(typecode, columns[col])
+            if sys.byteorder == "big":
+                indices.byteswap()
+            packer.pack(indices.tobytes())
+            yield packer.bytes()
+            packer.reset()
+
+
+_PACKERS: dict[int, Callable[..., Iterator[bytes]]] = {1: pack_rplm, 2: pack_rplm_v2}
+
+
+class RplmPreview(NamedTuple):
+    """
+    what RplmFile.peek reads, the meta and row counts of a file
+    """
+
+    meta: MetaAsDict
+    num_players: int
+    num_coaches: int
+    format_version: int
+
+
+class SaveSnapshot(NamedTuple):
+    """
+    an immutable copy of an RplmFile to save, see RplmFile.snapshot()
+    """
+
+    filename: str
+    meta: MetaAsDict
+    players: tuple[tuple[str, ...], ...]
+    coaches: tuple[tuple[str, ...], ...]
+    format_version: int
+    # the RplmFile's state when taken, see RplmFile.set_as_saved
+    generation: int
+    digest: int
+    ordered_digest: int
+
+    def packed_chunks(self) -> Iterator[bytes]:
+        return _PACKERS[self.format_version](
+            self.meta,
+            (len(self.players), self.players),
+            (len(self.coaches), self.coaches),
+        )
+
+
+class ColumnValues:
+    """
+    reference counted set of the values in one RplmRows column, empty strings are
+    not counted. ColumnValueIndex (model.py) makes it a Qt list model, the
+    _begin_*/_end_* and _changed hooks are called around every change to the values
+    for that. the values are in no particular order, a removed value's place is
+    taken by the last one
+    """
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        super().__init__()
+        self._counts: dict[str, int] = {}
+        self._values: list[str] = []
+        # value -> its position in _values
+        self._rows: dict[str, int] = {}
+        self._count_all(values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    # NOTE: no __iter__, PySide then stops the QCompleter seeing inserted rows
+    def values(self) -> tuple[str, ...]:
+        return tuple(self._values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._counts
+
+    def count(self, value: str) -> int:
+        return self._counts.get(value, 0)
+
+    def add(self, value: str) -> None:
+        if value == "":
+            return
+        counts = self._counts
+        if value in counts:
+            counts[value] += 1
+        else:
+            row = len(self._values)
+            self._begin_insert(row, row)
+            counts[value] = 1
+            self._rows[value] = row
+            self._values.append(value)
+            self._end_insert()
+
+    def discard(self, value: str) -> None:
+        counts = self._counts
+        if value == "" or value not in counts:
+            return
+        elif counts[value] > 1:
+            counts[value] -= 1
+        else:
+            values, rows = self._values, self._rows
+            row, last = rows[value], len(values) - 1
+            if row != last:
+                # swap it with the last value, so only the end of the list is removed
+                moved = values[last]
+                values[row], values[last] = moved, value
+                rows[moved], rows[value] = row, last
+                self._changed(row, last)
+            self._begin_remove(last, last)
+            del counts[value]
+            del rows[value]
+            values.pop()
+            self._end_remove()
+
+    def reset(self, values: Iterable[str]) -> None:
+        self._begin_reset()
+        self._counts.clear()
+        self._values.clear()
+        self._rows.clear()
+        self._count_all(values)
+        self._end_reset()
+
+    def _count_all(self, values: Iterable[str]) -> None:
+        counts = self._counts
+        for value in values:
+            if value != "":
+                counts[value] = counts.get(value, 0) + 1
+        self._values.extend(counts)
+        self._rows.update((value, row) for row, value in enumerate(self._values))
+
+    # --- change hooks ---
+
+    def _begin_insert(self, first: int, last: int) -> None:
+        pass
+
+    def _end_insert(self) -> None:
+        pass
+
+    def _begin_remove(self, first: int, last: int) -> None:
+        pass
+
+    def _end_remove(self) -> None:
+        pass
+
+    def _begin_reset(self) -> None:
+        pass
+
+    def _end_reset(self) -> None:
+        pass
+
+    def _changed(self, first: int, last: int) -> None:
+        pass
+
+
+class RplmRows(Generic[R]):
+    """
+    the rows of one section with their edit tracking, see RplmList in model.py for
+    the Qt model over them. the _begin_*/_end_* and _cell_changed hooks are called
+    around every change so a subclass can tell its views, they do nothing here
+    """
+
+    _data: list[R] | ColumnStore[R]
+
+    # the type of the column value indexes, the Qt models in model.py override it
+    values_type: ClassVar[Type[ColumnValues]] = ColumnValues
+
+    def __init__(
+        self,
+        data: Iterable[R] | ColumnStore[R],
+        normalizers: dict[int, Callable[[str], str]] | None = None,
+    ):
+        super().__init__()
+
+        # input sanitization
+        normalizers = {} if normalizers is None else normalizers
+
+        # a ColumnStore is used as is, anything else is stored as a list of rows
+        self._data = data if isinstance(data, ColumnStore) else list(data)
+        assert len(self._data) > 0, f"cannot create an empty {type(self).__name__}"
+
+        self._data_type = data_type = (
+            data.data_type if isinstance(data, ColumnStore) else type(self._data[0])
+        )
+
+        if len(normalizers) > 0:
+            assert (
+                max(normalizers) < data_type.num_cols()
+            ), f"normalizers contain columns out of range, such include {set(n for n in normalizers if n > data_type.num_cols())}"
+
+        self._normalizers = normalizers
+
+        # edit tracking (see RplmFile.changed), the digest is the sum of the row hashes
+        # so it can be updated in constant time as rows are added, removed, or edited.
+        # NOTE: being a sum it does not see rows that are only re-ordered, so when it
+        # matches RplmFile.changed checks the order too (see RplmFile.ordered_digest)
+        self.edit_generation = 0
+        self.content_digest = 0
+        # the columns that keep a value index, built on first use (see column_values)
+        self._value_indexes: dict[int, ColumnValues] = {}
+        self._adopt_all()
+
+        # told about every edit as it is made, see edits.py
+        self.edit_listeners: list[Callable[[RplmRows, Edit], None]] = []
+        self._edit_group: None | list[Edit] = None
+
+    def add_normalizer(self, col: int, normalizer: Callable[[str], str]) -> None:
+        assert col < self._data_type.num_cols(), f"column {col} out of range"
+        assert col not in self._normalizers, f"column {col} already has a normalizer"
+        self._normalizers[col] = normalizer
+
+    def isempty(self) -> bool:
+        return len(self._data) == 0 or all(d.isempty() for d in self._data)
+
+    # --- edit tracking ---
+
+    def _adopt_all(self) -> None:
+        data = self._data
+        if isinstance(data, ColumnStore):
+            data.owner = self
+        else:
+            for rplm in data:
+                rplm._owner = self
+        self.content_digest = sum(_row_hash(r.as_cols()) for r in data) & _DIGEST_MASK
+        self.edit_generation += 1
+        for col, value_index in self._value_indexes.items():
+            value_index.reset(r.get_col(col) for r in data)
+
+    def _adopt(self, rplm: R) -> None:
+        if not isinstance(self._data, ColumnStore):
+            rplm._owner = self
+        self.content_digest = (
+            self.content_digest + _row_hash(rplm.as_cols())
+        ) & _DIGEST_MASK
+        self.edit_generation += 1
+        for col, value_index in self._value_indexes.items():
+            value_index.add(rplm.get_col(col))
+
+    def _disown(self, rplm: R) -> None:
+        rplm._owner = None
+        self.content_digest = (
+            self.content_digest - _row_hash(rplm.as_cols())
+        ) & _DIGEST_MASK
+        self.edit_generation += 1
+        for col, value_index in self._value_indexes.items():
+            value_index.discard(rplm.get_col(col))
+
+    def _rplm_changed(self, rplm: Rplm, col: int, old: str) -> None:
+        """
+        called by a row (or the ColumnStore) after one of its columns is set
+        """
+        cols = rplm.as_cols()
+        old_cols = cols[:col] + (old,) + cols[col + 1 :]
+        self.content_digest = (
+            self.content_digest + _row_hash(cols) - _row_hash(old_cols)
+        ) & _DIGEST_MASK
+        self.edit_generation += 1
+        value_index = self._value_indexes.get(col)
+        if value_index is not None:
+            value_index.discard(old)
+            value_index.add(cols[col])
+
+    def hashstr(self) -> str:
+        return f"(players:{'|'.join(d.hashstr() for d in self._data)})"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}[{self._data_type.__name__}](...)"
+
+    def __iter__(self) -> Iterator[R]:
+        return iter(self._data)
+
+    def get_col_set(self, col: int) -> Set[str]:
+        return set(self.column_values(col).values())
+
+    def column_values(self, col: int) -> ColumnValues:
+        """
+        the live index of the distinct non-empty values in a column, it is built on
+        first use then kept up to date as rows are added, removed, and edited
+        """
+        value_index = self._value_indexes.get(col)
+        if value_index is None:
+            assert col < self._data_type.num_cols(), f"column {col} out of range"
+            value_index = self._value_indexes[col] = self.values_type(
+                r.get_col(col) for r in self._data
+            )
+        return value_index
+
+    def get_rplm_field(self, row: int, col: int) -> str:
+        data = self._data
+        # without making a row view
+        if isinstance(data, ColumnStore):
+            return data.get(row, col)
+        return data[row].get_col(col)
+
+    def get_rplm(self, row: int) -> R:
+        return self._data[row]
+
+    def set_rplm_field(self, row: int, col: int, value) -> None:
+        self._set_cell(row, col, self._normalize_field(col, value))
+
+    def _normalize_field(self, col: int, value: str) -> str:
+
+        value = value.strip()
+
+        if value == self._data_type.prompt_for_col(col):
+            value = ""
+
+        normed_value = self._normalizers.get(col, lambda _: _)(value)
+
+        return value if normed_value is None else normed_value
+
+    def _normalized_rows(self, rplms: Iterable[R]) -> list[R]:
+        """
+        applies the same normalization as set_rplm_field to every field of the rows,
+        rows that are already normal are kept as is
+        """
+        num_cols = self._data_type.num_cols()
+        prompts = [self._data_type.prompt_for_col(col) for col in range(num_cols)]
+        normalizers = [self._normalizers.get(col) for col in range(num_cols)]
+
+        normalized = []
+        for rplm in rplms:
+            cols = rplm.as_cols()
+            normed_cols = []
+            for value, prompt, normalizer in zip(cols, prompts, normalizers):
+                value = value.strip()
+                if value == prompt:
+                    value = ""
+                if normalizer is not None:
+                    normed_value = normalizer(value)
+                    value = value if normed_value is None else normed_value
+                normed_cols.append(value)
+            normed = tuple(normed_cols)
+            normalized.append(
+                rplm if normed == cols else self._data_type.from_cols(*normed)
+            )
+        return normalized
+
+    def append(self, rplm: R):
+        self.insert(len(self._data), rplm)
+
+    def insert(self, row: int, rplm: R) -> None:
+        self._insert_rows(row, [rplm])
+
+    # --- bulk edits ---
+    # these normalize the rows in one pass and signal the views once per batch
+
+    def extend(self, rplms: Iterable[R]) -> None:
+        self.insert_many(len(self._data), rplms)
+
+    def insert_many(self, row: int, rplms: Iterable[R]) -> None:
+        self._insert_rows(row, self._normalized_rows(rplms))
+
+    def remove_rows(self, ranges: Iterable[range | tuple[int, int]]) -> None:
+        """
+        remove the rows in each range (or (start, stop) pair), they may overlap
+        """
+        rows = sorted(
+            set(
+                itertools.chain.from_iterable(
+                    r if isinstance(r, range) else range(*r) for r in ranges
+                )
+            )
+        )
+        assert len(rows) == 0 or (
+            rows[0] >= 0 and rows[-1] < len(self._data)
+        ), f"rows out of range for {self}"
+
+        with self.grouped_edits():
+            self._remove_runs(index_runs(rows))
+            self._ensure_not_empty()
+
+    def replace_all(self, rplms: Iterable[R]) -> None:
+        """
+        swap out every row for `rplms` with a single model reset
+        """
+        new = self._normalized_rows(rplms)
+        if len(new) == 0:
+            new = [self._data_type.empty()]  # type: ignore[list-item]
+
+        data = self._data
+        old_cols = tuple(r.as_cols() for r in data)
+
+        self._begin_reset()
+        if isinstance(data, ColumnStore):
+            self._data = data.new_like(new)
+        else:
+            for rplm in data:
+                rplm._owner = None
+            self._data = new
+        self._adopt_all()
+        self._end_reset()
+
+        with self.grouped_edits():
+            self._record(RowsRemoved(0, old_cols))
+            self._record(RowsInserted(0, tuple(r.as_cols() for r in new)))
+
+    def refresh(self) -> None:
+        """
+        re-query everything in the attached views, the edit methods emit their own
+        precise signals so this is only needed after changing rows behind its back
+        """
+        if len(self._data) == 0:
+            self._append_empty()
+        self._layout_changed()
+
+    def pop(self, row: int) -> R:
+        with self.grouped_edits():
+            (item,) = self._remove_rows(row, row + 1)
+            self._ensure_not_empty()
+        return item
+
+    def remove_empty_lines(self) -> None:
+        with self.grouped_edits():
+            self._remove_empty_rows(
+                array("I", (row for row, r in enumerate(self._data) if r.isempty()))
+            )
+            self._ensure_not_empty()
+
+    # --- edit primitives ---
+    # each one calls the change hooks and reports itself as an Edit (see
+    # edits.py) to the edit listeners, the Edits replay through these as well
+
+    def _record(self, edit: Edit) -> None:
+        if self._edit_group is not None:
+            self._edit_group.append(edit)
+        else:
+            for listener in self.edit_listeners:
+                listener(self, edit)
+
+    @contextlib.contextmanager
+    def grouped_edits(self) -> Iterator[None]:
+        """
+        report all the edits made inside the block as one EditGroup (ie one undo step)
+        """
+        if self._edit_group is not None:  # already grouping
+            yield
+            return
+
+        group: list[Edit] = []
+        self._edit_group = group
+        try:
+            yield
+        finally:
+            self._edit_group = None
+            if len(group) == 1:
+                self._record(group[0])
+            elif len(group) > 1:
+                self._record(EditGroup(tuple(group)))
+
+    def _rows_from_cols(self, rows: Iterable[tuple[str, ...]]) -> list[R]:
+        return [self._data_type.from_cols(*cols) for cols in rows]
+
+    def _set_cell(self, row: int, col: int, value: str) -> None:
+        rplm = self._data[row]
+        old = rplm.get_col(col)
+        if old == value:
+            return
+
+        rplm.set_col(col, value)
+
+        self._cell_changed(row, col)
+        self._record(CellSet(row, col, old, value))
+
+    def _insert_rows(
+        self, row: int, rplms: Sequence[R], *, record: bool = True
+    ) -> None:
+        if len(rplms) == 0:
+            return
+        self._begin_insert(row, row + len(rplms) - 1)
+        data = self._data
+        # one splice for the whole batch instead of shifting the tail once per row
+        if isinstance(data, ColumnStore):
+            data.insert_many(row, rplms)
+        else:
+            data[row:row] = rplms
+        for rplm in rplms:
+            self._adopt(rplm)
+        self._end_insert()
+        if record:
+            self._record(RowsInserted(row, tuple(r.as_cols() for r in rplms)))
+
+    def _remove_rows(self, start: int, stop: int, *, record: bool = True) -> list[R]:
+        data = self._data
+        removed = data[start:stop]
+        if isinstance(data, ColumnStore):
+            # the views would point at other rows once these are gone
+            removed = [r.detached() for r in removed]  # type: ignore[attr-defined]
+
+        self._begin_remove(start, stop - 1)
+        for rplm in removed:
+            self._disown(rplm)
+        del data[start:stop]
+        self._end_remove()
+
+        if record:
+            self._record(RowsRemoved(start, tuple(r.as_cols() for r in removed)))
+        return removed
+
+    def _remove_runs(
+        self, runs: Sequence[tuple[int, int]], *, record: bool = True
+    ) -> None:
+        """
+        remove the rows in the ascending, non-overlapping (start, stop) `runs`
+        """
+        if len(runs) <= MAX_PRECISE_REMOVE_RUNS:
+            # remove from the bottom up so the earlier runs do not shift
+            for start, stop in reversed(runs):
+                self._remove_rows(start, stop, record=record)
+            return
+
+        data = self._data
+        removed = [
+            (start, tuple(data[row].as_cols() for row in range(start, stop)))
+            for start, stop in (runs if record else ())
+        ]
+        keep = [True] * len(data)
+        for start, stop in runs:
+            keep[start:stop] = [False] * (stop - start)
+
+        self._begin_reset()
+        if isinstance(data, ColumnStore):
+            data.compress(keep)
+        else:
+            self._data = [r for r, kept in zip(data, keep) if kept]
+        # re-count everything in one pass instead of disowning each removed row
+        self._adopt_all()
+        self._end_reset()
+
+        # recorded bottom up, the same as the precise removal would be
+        for start, rows in reversed(removed):
+            self._record(RowsRemoved(start, rows))
+
+    def _remove_empty_rows(self, indices: array) -> None:
+        """
+        remove the (known to be empty) rows at the ascending `indices`
+        """
+        if len(indices) == 0:
+            return
+        self._remove_runs(index_runs(indices), record=False)
+        self._record(EmptyRowsRemoved(indices))
+
+    def _restore_empty_rows(self, indices: array) -> None:
+        """
+        put back empty rows at the ascending `indices` (where they will end up)
+        """
+        if len(indices) == 0:
+            return
+
+        runs = index_runs(indices)
+        if len(runs) <= MAX_PRECISE_REMOVE_RUNS:
+            # top down, the indices are positions in the restored list
+            for start, stop in runs:
+                empties = [self._data_type.empty() for _ in range(start, stop)]
+                self._insert_rows(start, empties, record=False)  # type: ignore[arg-type]
+        else:
+            # merge the empty rows in with one pass instead of an insert per row
+            self._begin_reset()
+            data = self._data
+            total = len(data) + len(indices)
+            empty_rows = set(indices)
+            existing = iter(data)
+            merged = (
+                self._data_type.empty() if row in empty_rows else next(existing)
+                for row in range(total)
+            )
+            if isinstance(data, ColumnStore):
+                self._data = data.new_like(merged)
+            else:
+                self._data = list(merged)  # type: ignore[arg-type]
+            self._adopt_all()
+            self._end_reset()
+
+        self._record(EmptyRowsInserted(indices))
+
+    def _append_empty(self) -> None:
+        empty = self._data_type.empty()
+        self._data.append(empty)  # type: ignore
+        self._adopt(empty)  # type: ignore
+
+    def _ensure_not_empty(self) -> None:
+        # there is always at least one (maybe empty) row to edit
+        if len(self._data) == 0:
+            self._insert_rows(0, [self._data_type.empty()])  # type: ignore[list-item]
+
+    def select_cell(self, row: int, col: int) -> None:
+        """
+        moves the selection of any attached views to the cell
+        """
+        pass
+
+    # --- change hooks ---
+    # called around each change to the rows, the first and last rows are inclusive
+
+    def _begin_insert(self, first: int, last: int) -> None:
+        pass
+
+    def _end_insert(self) -> None:
+        pass
+
+    def _begin_remove(self, first: int, last: int) -> None:
+        pass
+
+    def _end_remove(self) -> None:
+        pass
+
+    def _begin_reset(self) -> None:
+        pass
+
+    def _end_reset(self) -> None:
+        pass
+
+    def _cell_changed(self, row: int, col: int) -> None:
+        pass
+
+    def _layout_changed(self) -> None:
+        pass
+
+
+class RplmFile:
+
+    metadata_spec: ClassVar[set[str]] = {"school", "sport", "category", "season"}
+
+    filename: None | str
+    format_version: int
+    school: str
+    sport: str
+    category: str
+    season: str
+    players: RplmRows[Player]
+    coaches: RplmRows[Coach]
+
+    # the type of the row lists, the Qt models in model.py override it
+    rows_type: ClassVar[Type[RplmRows]] = RplmRows
+
+    def __init__(
+        self,
+        *,
+        filename: None | str = None,
+        school: str = "",
+        sport: str = "",
+        category: str = "",
+        season: str = "",
+        players: Iterable[Player] | None = None,
+        coaches: Iterable[Coach] | None = None,
+        columnar: bool = False,
+        format_version: int = DEFAULT_FORMAT_VERSION,
+    ) -> None:
+        super().__init__()
+
+        assert format_version in _PACKERS, f"unknown .rplm format {format_version}"
+        self.format_version = format_version
+
+        players = [Player.empty()] if players is None else players
+        coaches = [Coach.empty()] if coaches is None else coaches
+
+        # optionally keep the rows column by column, see column_store.py
+        if columnar:
+            if not isinstance(players, ColumnStore):
+                players = ColumnStore(Player, players)
+            if not isinstance(coaches, ColumnStore):
+                coaches = ColumnStore(Coach, coaches)
+
+        self.players = self.rows_type(players)
+        self.coaches = coaches = self.rows_type(coaches)
+
+        coaches.add_normalizer(2, normalize_title)
+
+        self.undo_journal = UndoJournal(self.players, self.coaches)
+
+        self.school = school
+        self.sport = sport
+        self.category = category
+        self.season = season
+
+        self.filename = filename
+
+        # bumped by set_meta, the rows keep their own generation (see RplmRows)
+        self._meta_generation = 0
+        self._last_save_generation: int | None = None
+        self._last_save_digest: int | None = None
+        self._last_save_ordered_digest: int | None = None
+        # (edit generation, ordered digest) of the last ordered_digest()
+        self._ordered_digest: None | tuple[int, int] = None
+
+        # told about every set_meta, like RplmRows.edit_listeners
+        self.meta_listeners: list[Callable[[RplmFile, dict[str, str]], None]] = []
+
+    def set_as_saved_now(self) -> None:
+        self.set_as_saved(
+            self.edit_generation(), self.content_digest(), self.ordered_digest()
+        )
+
+    def set_as_saved(self, generation: int, digest: int, ordered_digest: int) -> None:
+        """
+        marks the state from edit_generation() / content_digest() / ordered_digest()
+        as the saved one, eg: when a background save of an earlier snapshot finishes
+        """
+        self._last_save_generation = generation
+        self._last_save_digest = digest
+        self._last_save_ordered_digest = ordered_digest
+
+    def changed(self) -> bool:
+        """
+        check for edits since the last save, in constant time unless the rows are
+        the same as when saved. edits that were undone by hand are reported as
+        unchanged since the digests match again, rows that were only re-ordered
+        (eg: dragged) are reported as changed
+        """
+        if self._last_save_generation == self.edit_generation():
+            return False
+        if self._last_save_digest != self.content_digest():
+            return True
+        # the same rows, but the digest is a sum so they may be in another order
+        return self._last_save_ordered_digest != self.ordered_digest()
+
+    def edit_generation(self) -> int:
+        """
+        monotonically increasing count of the edits made to this file
+        """
+        return (
+            self._meta_generation
+            + self.players.edit_generation
+            + self.coaches.edit_generation
+        )
+
+    def content_digest(self) -> int:
+        """
+        a hash of the metadata and rows, kept up to date incrementally by the RplmRows
+        """
+        return hash(
+            (
+                self.school,
+                self.sport,
+                self.category,
+                self.season,
+                self.filename,
+                self.players.content_digest,
+                self.coaches.content_digest,
+            )
+        )
+
+    def ordered_digest(self) -> int:
+        """
+        a hash of the rows in order, it takes time linear in the rows so it is only
+        worked out once per edit generation (and only when changed() needs it)
+        """
+        generation = self.edit_generation()
+        if self._ordered_digest is None or self._ordered_digest[0] != generation:
+            rows = (
+                tuple(rplm.as_cols() for rplm in self.players),
+                tuple(rplm.as_cols() for rplm in self.coaches),
+            )
+            self._ordered_digest = (generation, hash(rows))
+        return self._ordered_digest[1]
+
+    @classmethod
+    def open(cls: Type[F], filename: str, *, columnar: bool = False) -> F:
+        path = pathlib.Path(filename)
+        assert path.exists(), f"{filename} does not exist"
+        assert path.is_file(), f"{filename} is not a file"
+        assert path.suffix == ".rplm", f"{filename} is not a .rplm file"
+
+        with path.open("rb") as file, paused_gc():
+            if file.read(len(RPLM_V2_MAGIC)) == RPLM_V2_MAGIC:
+                file_model = cls._from_file_v2(file, columnar=columnar)
+            else:
+                file.seek(0)
+                file_model = cls._from_file(file, columnar=columnar)
+        file_model.set_as_saved_now()
+        return file_model
+
+    @classmethod
+    def peek(cls, filename: str) -> RplmPreview:
+        """
+        reads just the meta and row counts of a file without decoding the rows.
+        instant for v2 files (it is all in the header), v1 files have their player
+        rows skipped over to reach the coaches
+        """
+        import msgpack  # type: ignore[import]
+
+        path = pathlib.Path(filename)
+        assert path.is_file(), f"{filename} is not a file"
+        assert path.suffix == ".rplm", f"{filename} is not a .rplm file"
+
+        with path.open("rb") as file, contextlib.ExitStack() as stack:
+            source: BinaryIO | mmap.mmap
+            try:
+                source = stack.enter_context(
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+            except (ValueError, OSError):  # eg: empty files, some filesystems
+                source = file
+
+            if source.read(len(RPLM_V2_MAGIC)) == RPLM_V2_MAGIC:
+                header = msgpack.Unpacker(source).unpack()
+                assert isinstance(header, dict), f"malformed header in {filename}"
+                meta = header["meta"]
+                counts = header["rows"]
+                version = 2
+            else:
+                source.seek(0)
+                unpacker = msgpack.Unpacker(source)
+                meta, counts, version = None, {}, 1
+                for _ in range(unpacker.read_map_header()):
+                    key = unpacker.unpack()
+                    if key == "meta":
+                        meta = unpacker.unpack()
+                    elif key in ("players", "coaches"):
+                        counts[key] = unpacker.read_array_header()
+                        for _ in range(counts[key]):
+                            unpacker.skip()
+                    else:
+                        unpacker.skip()
+
+        assert meta is not None, f"missing meta section in {filename}"
+        assert set(meta) == set(
+            cls.metadata_spec
+        ), f"missing meta fields: {set(cls.metadata_spec) - set(meta)}"
+        assert "players" in counts, f"missing players section in {filename}"
+        assert "coaches" in counts, f"missing coaches section in {filename}"
+        return RplmPreview(meta, counts["players"], counts["coaches"], version)
+
+    def check_save_target(self, filename: str) -> None:
+        path = pathlib.Path(filename)
+
+        if path.exists():
+            assert path.is_file(), f"{filename} is not a file"
+
+        assert path.suffix == ".rplm", f"{filename} is not a .rplm file"
+
+    def save_to_file(self, filename: str) -> None:
+        """
+        saves on the calling thread, see model.BackgroundSaver to save off of it
+        """
+        self.check_save_target(filename)
+
+        write_atomically(filename, self._packed_chunks)
+
+        if filename == self.filename:
+            self.set_as_saved_now()
+
+    def snapshot(self, filename: str) -> SaveSnapshot:
+        """
+        copies what is needed to save (the row tuples share their strings with the
+        model) so the file can be written on another thread while editing continues
+        """
+        players = tuple(rplm.as_cols() for rplm in self.players)
+        coaches = tuple(rplm.as_cols() for rplm in self.coaches)
+        return SaveSnapshot(
+            filename,
+            self.meta_as_dict(),
+            players,
+            coaches,
+            self.format_version,
+            self.edit_generation(),
+            self.content_digest(),
+            # the same as ordered_digest(), from the rows already copied
+            hash((players, coaches)),
+        )
+
+    def _packed_chunks(self) -> Iterator[bytes]:
+        return _PACKERS[self.format_version](
+            self.meta_as_dict(),
+            (len(self.players), (rplm.as_cols() for rplm in self.players)),
+            (len(self.coaches), (rplm.as_cols() for rplm in self.coaches)),
+        )
+
+    def _into_file(self, into: BinaryIO) -> None:
+        for chunk in self._packed_chunks():
+            into.write(chunk)
+
+    def _to_save_dict(self) -> SaveDict:
+        return SaveDict(
+            meta=self.meta_as_dict(),
+            players=tuple(p.as_fields() for p in self.players),  # type: ignore
+            coaches=tuple(c.as_fields() for c in self.coaches),  # type: ignore
+        )
+
+    @classmethod
+    def _from_file(cls: Type[F], file: BinaryIO, *, columnar: bool = False) -> F:
+        import msgpack  # type: ignore[import]
+
+        source = getattr(file, "name", repr(file))
+        problems = Problems()
+
+        # stream the sections in, validating and building each row as it is read
+        # instead of unpacking the whole file into dicts first
+        unpacker = msgpack.Unpacker(file)
+
+        sections: dict[str, Any] = {}
+        try:
+            num_sections = unpacker.read_map_header()
+        except ValueError:
+            problems.add("file", None, "expected a map of sections")
+            raise RplmFileError(source, problems)
+
+        for _ in range(num_sections):
+            key = unpacker.unpack()
+            if key == "meta":
+                sections[key] = unpacker.unpack()
+            elif key == "players":
+                sections[key] = cls._unpack_rows(
+                    unpacker, Player, key, problems, columnar=columnar
+                )
+            elif key == "coaches":
+                sections[key] = cls._unpack_rows(
+                    unpacker, Coach, key, problems, columnar=columnar
+                )
+            else:
+                unpacker.skip()
+
+        for section in ("meta", "players", "coaches"):
+            if section not in sections:
+                problems.add(section, None, "missing section")
+        if "meta" in sections:
+            check_meta(sections["meta"], cls.metadata_spec, problems)
+        problems.raise_any(source)
+
+        return cls(
+            **sections["meta"],
+            players=sections["players"],
+            coaches=sections["coaches"],
+            filename=file.name,
+            columnar=columnar,
+            format_version=1,
+        )
+
+    @staticmethod
+    def _unpack_rows(
+        unpacker: msgpack.Unpacker,
+        rplm_type: Type[R],
+        section: str,
+        problems: Problems,
+        *,
+        columnar: bool,
+    ) -> list[R] | ColumnStore[R]:
+        try:
+            num_rows = unpacker.read_array_header()
+        except ValueError:
+            problems.add(section, None, "expected an array of rows")
+            unpacker.skip()
+            return []
+        rows = cast(
+            Iterator[R],
+            section_validator(rplm_type, section)(
+                (unpacker.unpack() for _ in range(num_rows)), problems
+            ),
+        )
+        return ColumnStore(rplm_type, rows) if columnar else list(rows)
+
+    @classmethod
+    def _from_file_v2(cls: Type[F], file: BinaryIO, *, columnar: bool = False) -> F:
+        """
+        reads the rest of a v2 file after the magic bytes, see pack_rplm_v2
+        """
+        import msgpack  # type: ignore[import]
+
+        source = getattr(file, "name", repr(file))
+        problems = Problems()
+
+        unpacker = msgpack.Unpacker(file)
+
+        header = unpacker.unpack()
+        if not isinstance(header, dict) or header.get("version") != 2:
+            problems.add("header", None, "not a version 2 header")
+            problems.raise_any(source)
+        for key, kind in (
+            ("rows", dict),
+            ("fields", dict),
+            ("strings", int),
+            ("index", str),
+        ):
+            if not isinstance(header.get(key), kind):
+                problems.add("header", None, f"{key!r} should be a {kind.__name__}")
+        if header.get("index") not in ("B", "H", "I"):
+            problems.add("header", None, f"bad index typecode {header.get('index')!r}")
+        check_meta(header.get("meta"), cls.metadata_spec, problems)
+        problems.raise_any(source)
+
+        strings: list[str] = unpacker.unpack()
+        if not isinstance(strings, list) or len(strings) != header["strings"]:
+            problems.add("strings", None, "truncated string table")
+            problems.raise_any(source)
+        for index, string in enumerate(strings):
+            if type(string) is not str:
+                problems.add("strings", index, "expected a str")
+        lookup = strings.__getitem__
+
+        sections: dict[str, Any] = {}
+        for section, rplm_type in (("players", Player), ("coaches", Coach)):
+            num_rows = header["rows"].get(section)
+            fields = header["fields"].get(section)
+            spec = rplm_type.field_spec
+            if type(num_rows) is not int or not isinstance(fields, list):
+                problems.add(section, None, "missing from the header")
+                continue
+            if set(fields) != set(spec):
+                problems.add(section, None, f"expected fields {list(spec)}")
+                continue
+
+            # the columns in column order, holding the shared strings of the table
+            columns: list[Any] = [None] * len(spec)
+            for field in fields:
+                raw = unpacker.unpack()
+                indices = array(header["index"])
+                if type(raw) is bytes and len(raw) % indices.itemsize == 0:
+                    indices.frombytes(raw)
+                if sys.byteorder == "big":
+                    indices.byteswap()
+                if len(indices) != num_rows:
+                    problems.add(section, None, f"truncated {field!r} column")
+                    continue
+                if len(indices) and max(indices) >= len(strings):
+                    for row, index in enumerate(indices):
+                        if index >= len(strings):
+                            problems.add(section, row, f"bad string index in {field!r}")
+                    continue
+                columns[spec[field]] = list(map(lookup, indices))
+
+            if problems.total:  # keep looking for problems, but do not build rows
+                continue
+            sections[section] = (
+                ColumnStore.from_cols(rplm_type, columns)
+                if columnar
+                else list(map(row_factory(rplm_type), *columns))
+            )
+
+        problems.raise_any(source)
+        return cls(
+            **header["meta"],
+            players=sections["players"],
+            coaches=sections["coaches"],
+            filename=file.name,
+            columnar=columnar,
+            format_version=2,
+        )
+
+    @classmethod
+    def untitled(cls: Type[F]) -> F:
+        return cls(filename=None)
+
+    def isempty(self) -> bool:
+        return (
+            self.players.isempty()
+            and self.coaches.isempty()
+            and set(m.strip() for m in self.meta_as_dict().values()) == {""}  # type: ignore
+        )
+
+    def hashstr(self) -> str:
+        return hash(
+            "|".join(
+                (
+                    self.school,
+                    self.sport,
+                    self.category,
+                    self.season,
+                    str(self.filename),
+                    self.players.hashstr(),
+                    self.coaches.hashstr(),
+                )
+            )
+        )
+
+    def meta_as_dict(self) -> MetaAsDict:
+        return dict(
+            school=self.school,
+            sport=self.sport,
+            category=self.category,
+            season=self.season,
+        )
+
+    def set_meta(
+        self,
+        school: None | str = None,
+        sport: None | str = None,
+        category: None | str = None,
+        season: None | str = None,
+    ):
+        changes = {
+            field: value
+            for field, value in dict(
+                school=school, sport=sport, category=category, season=season
+            ).items()
+            if value is not None
+        }
+
+        if school is not None:
+            self.school = school
+        if sport is not None:
+            self.sport = sport
+        if category is not None:
+            self.category = category
+        if season is not None:
+            self.season = season
+        self._meta_generation += 1
+
+        for listener in self.meta_listeners:
+            listener(self, changes)
+
+    def export_into(self, file: TextIO, *, renderer: RplmFileRenderer) -> ExportStats:
+        # imported here as export.py builds on this module
+        from .export import export_rplm
+
+        return export_rplm(self, file, renderer)
+
+    def export_to(
+        self, filename: str, *, renderer: RplmFileRenderer, use_cache: bool = True
+    ) -> ExportStats:
+        """
+        exports into filename, only rendering the rows changed since the last export
+        (see export_cache.py), the renderer must be newly made
+        """
+        from .export_cache import export_to_file
+
+        return export_to_file(self, filename, renderer, use_cache=use_cache)
+
+    def export_formats(
+        self, filenames: Mapping[str, str], *, renderer: RplmFileRenderer
+    ) -> ExportStats:
+        """
+        exports into several formats in one pass, eg: {"txt": ..., "csv": ...}, see
+        export.EXPORT_FORMATS
+        """
+        from .export import export_formats
+
+        return export_formats(self, filenames, renderer)
+
+    def remove_empty_lines(self) -> None:
+        self.players.remove_empty_lines()
+        self.coaches.remove_empty_lines()
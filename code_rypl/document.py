@@ -7,6 +7,9 @@ import time
 from typing import *
 
 from .model import RplmFile, RplmList, blocking_popup
+from .model import BackgroundSaver, SaveResult
+from .recovery import RecoveryJournal
+from . import recent
 from .table import RplmTableView
 
 # import the necessary modules
@@ -28,8 +31,16 @@ from PySide6.QtWidgets import (
 )
 
 from .renderers import tools as renderer_tools
+from .renderers import (
+    available_renderers,
+    load_renderer,
+    renderer_exists,
+    renderers_dir,
+)
+from .renderers.template import RplmFileRenderer
 from .model import Player, Coach
 from .table import ColumnCompleterDelegate
+from .completion import SchoolCompleter
 
 
 UNSAVED_UI_CHECK_INTERVAL = 1000  # milliseconds
@@ -45,16 +56,21 @@ if len(renderer_args) == 0:
 else:
     (renderer_name,) = renderer_args
 
-if renderer_name == "default":
-    from .renderers.default import RplmFileRenderer as ChosenRenderer  # type: ignore
-elif renderer_name == "test":
-    from .renderers.test import RplmFileRenderer as ChosenRenderer  # type: ignore
-else:
-    raise NotImplementedError(
-        f"cutom renderers not implemented yet, got `--renderer={renderer_name}`"
+# a template is only compiled once it is first used, see renderers/compiled.py
+if not renderer_exists(renderer_name):
+    raise ValueError(
+        f"unknown renderer `--renderer={renderer_name}`, expected one of "
+        f"{', '.join(available_renderers())} (templates go in {renderers_dir()})"
     )
 
 
+def chosen_renderer() -> Type[RplmFileRenderer]:
+    """
+    the renderer picked with --renderer=, only imported once it is first used
+    """
+    return load_renderer(renderer_name)
+
+
 # class TwoFullTabWidget(QTabWidget):
 #     def showEvent(self, event: QtGui.QShowEvent) -> None:
 #         super().showEvent(event)
@@ -86,8 +102,10 @@ class CodeRyplMenuBar(QMenuBar):
         self.file_menu = file_menu = self.addMenu("File")
         file_menu.addAction("New", self.doc.app.new_document, "Ctrl+N")
         file_menu.addAction("Open", self.open_file, "Ctrl+O")
+        # filled in each time it is shown, so the previews are up to date
+        self.recent_menu = recent_menu = file_menu.addMenu("Open Recent")
+        recent_menu.aboutToShow.connect(self._fill_recent_menu)
         file_menu.addSeparator()
-        # TODO: add open recent
         file_menu.addAction("Save", self.doc.save, "Ctrl+S")
         file_menu.addAction("Save As", self.doc.save_as, "Ctrl+Shift+S")
         file_menu.addSeparator()
@@ -98,18 +116,19 @@ class CodeRyplMenuBar(QMenuBar):
     def _setup_edit_menu(self) -> None:
         edit_menu = self.addMenu("Edit")
 
-        # TODO: consider how to add this... maybe!? (probs need to integrate with RplmList)
-        # edit_menu.addAction(
-        #     "Undo",
-        #     lambda: blocking_popup("Undo not implemented"),
-        #     "Ctrl+Z",
-        # )
-        # edit_menu.addAction(
-        #     "Redo",
-        #     lambda: blocking_popup("Redo not implemented"),
-        #     "Ctrl+Shift+Z",
-        # )
-        
+        # lambdas so the journal of the currently loaded model is used
+        edit_menu.addAction(
+            "Undo",
+            lambda: self.doc.model.undo_journal.undo(),
+            "Ctrl+Z",
+        )
+        edit_menu.addAction(
+            "Redo",
+            lambda: self.doc.model.undo_journal.redo(),
+            "Ctrl+Shift+Z",
+        )
+        edit_menu.addSeparator()
+
         # remove empty lines
         edit_menu.addAction(
             "Delete Line",
@@ -120,27 +139,57 @@ class CodeRyplMenuBar(QMenuBar):
         )
         edit_menu.addAction("Remove Empty Lines", self.remove_empty_lines)
 
+    def _fill_recent_menu(self) -> None:
+        recent_files = self.doc.app.recent_files
+        menu = self.recent_menu
+        menu.clear()
+
+        entries = recent_files.previews()
+        if not len(entries):
+            menu.addAction("No Recent Files").setEnabled(False)
+            return
+
+        for filename, preview in entries:
+            action = menu.addAction(
+                recent.describe(filename, preview),
+                # *_ takes the checked arg some Qt versions pass
+                lambda *_, filename=filename: self.open_path(filename),
+            )
+            assert action is not None
+            action.setToolTip(filename)
+        menu.addSeparator()
+        menu.addAction("Clear Recent", recent_files.clear)
+
     def open_file(self) -> None:
         filename, _ = QFileDialog.getOpenFileName(
             self, "Open File", str(self.doc._last_export_path), "RPLM Files (*.rplm)"
         )
+        self.open_path(filename)
 
-        # TODO: add a proper check to see if the file is already open, using app. switch focus
-
-        if filename in (
-            (other_doc := d).model.filename for d in self.doc.app._documents
-        ):
-            other_doc.switch_focus()
+    def open_path(self, filename: str) -> None:
+        if filename == "":  # then open canceled
             return
 
-        if filename == "":  # then open canceled
+        # recent files are stored resolved, so compare them resolved
+        path = pathlib.Path(filename).resolve()
+        for other_doc in self.doc.app._documents:
+            other = other_doc.model.filename
+            if other is not None and pathlib.Path(other).resolve() == path:
+                other_doc.switch_focus()
+                return
+
+        if not path.is_file():
+            blocking_popup(f"cannot open {filename!r}, the file no longer exists")
+            self.doc.app.recent_files.remove(str(path))
             return
-        elif self.doc.model.isempty():
-            self.doc.load_file_model(RplmFile.open(filename))
-        elif filename:
-            self.doc.app.new_document(filename)
-        else:
-            blocking_popup(f"error opening file {filename!r}")
+
+        try:
+            if self.doc.model.isempty():
+                self.doc.load_file_model(RplmFile.open(str(path)))
+            else:
+                self.doc.app.new_document(str(path))
+        except Exception as err:
+            blocking_popup(f"error opening file {filename!r}: {err}")
 
     def remove_empty_lines(self) -> None:
         self.doc.model.remove_empty_lines()
@@ -165,6 +214,17 @@ class CodeRyplDocumentWindow(QMainWindow):
 
         self.init_layout()
 
+        # saves are written on a worker thread, see _on_saved
+        self._saver = saver = BackgroundSaver(self)
+        saver.saved.connect(self._on_saved)
+        # the filename being saved as, the document is renamed once it is written
+        self._saving_as: None | str = None
+
+        # unsaved edits are journaled in case of a crash, see recovery.py
+        self._recovery: None | RecoveryJournal = None
+        # set when the user chooses to close without saving
+        self._changes_discarded = False
+
         self.load_file_model(
             RplmFile.untitled() if filename is None else RplmFile.open(filename)
         )
@@ -205,17 +265,66 @@ class CodeRyplDocumentWindow(QMainWindow):
         if self.model.filename is None:
             self.save_as()
         else:
-            self.model.save_to_file(self.model.filename)
+            self._save_in_background(self.model.filename)
+
+    def _save_in_background(self, filename: str) -> None:
+        try:
+            self._saver.save(self.model, filename)
+        except Exception as e:
+            blocking_popup(f"Error saving file({type(e).__name__}): {e}")
+            raise e
+
+    def _on_saved(self, result: SaveResult) -> None:
+        model, snapshot = result.model, result.snapshot
+        # a save as only renames the document once the new file is written
+        renaming = model is self.model and snapshot.filename == self._saving_as
+        if renaming:
+            self._saving_as = None
+
+        if result.error is not None:
+            err = result.error
+            blocking_popup(f"Error saving file({type(err).__name__}): {err}")
+            return
+
+        if renaming:
+            self._rename(snapshot.filename)
+
+        # edits made while saving are still unsaved, so use the snapshot's state
+        if model is self.model and snapshot.filename == model.filename:
+            model.set_as_saved(
+                snapshot.generation, snapshot.digest, snapshot.ordered_digest
+            )
+            self._refresh_title()
+            if self._recovery is not None and result.stat is not None:
+                self._recovery.compact(
+                    snapshot.filename, snapshot.generation, result.stat
+                )
 
     def save_as(self) -> None:
 
+        filename = self._ask_save_as_filename()
+        if filename is None:  # then save canceled
+            return
+
+        # TODO: maybe spruce this up?
+        try:
+            self.model.check_save_target(filename)
+        except Exception as e:
+            blocking_popup(f"Error saving file({type(e).__name__}): {e}")
+            raise e
+
+        filename = str(pathlib.Path(filename))
+        self._save_in_background(filename)
+        self._saving_as = filename
+
+    def _ask_save_as_filename(self) -> None | str:
         # resolve the suggested save as name
         if self.model.isempty():
             suggested_filename = "SaveAs"
         else:
             try:
                 suggested_filename = self._resolve_suggested_filename(
-                    ChosenRenderer(**self.model.meta_as_dict()), "SameAs"
+                    chosen_renderer()(**self.model.meta_as_dict()), "SameAs"
                 )
                 print(suggested_filename)
             except Exception as err:
@@ -230,24 +339,38 @@ class CodeRyplDocumentWindow(QMainWindow):
             "RPLM Files (*.rplm)",
         )
 
-        if filename == "":  # then save canceled
-            return
+        return None if filename == "" else filename
 
-        path = pathlib.Path(filename)
+    def _rename(self, filename: str) -> None:
+        # alter the data/rename instead of opening a new file
+        name = str(pathlib.Path(filename))
+        self.model.filename = name
+        self.set_window_title(name)
+        self.app.recent_files.add(name)
 
-        # TODO: maybe spruce this up?
+    def _save_before_close(self) -> bool:
+        """
+        saves on this thread, so the window only closes once the edits are written.
+        False (after showing why) if they were not
+        """
+        filename = self.model.filename
+        if filename is None:
+            filename = self._ask_save_as_filename()
+            if filename is None:  # then save canceled
+                return False
+
+        # saves already queued are written first
+        self._saver.wait()
         try:
-            if filename:
-                self.model.save_to_file(filename)
+            self.model.save_to_file(filename)
         except Exception as e:
             blocking_popup(f"Error saving file({type(e).__name__}): {e}")
-            raise e
+            return False
 
-        # alter the data/rename instead of opening a new file
-        name = str(path)
-        self.model.filename = name
-        self.model.set_as_saved_now()
-        self.set_window_title(name)
+        if filename != self.model.filename:
+            self._rename(filename)
+            self.model.set_as_saved_now()
+        return True
 
     def set_window_title(self, title: str) -> None:
         self._title = title.split("/")[-1]
@@ -260,18 +383,13 @@ class CodeRyplDocumentWindow(QMainWindow):
         )[self.model.changed()]
         self.setWindowTitle(f"CodeRypl - {self._title}{edit_msg}")
 
-    def close(self) -> bool:
-        should_close = self._check_for_save_on_close()
-        print(f"{should_close=}")
-        if should_close:
-            return super().close()
-        else:
-            return False
+    def _has_unsaved_work(self) -> bool:
+        return self.model.changed() and not (
+            self.model.isempty() and self.model.filename is None
+        )
 
     def _check_for_save_on_close(self) -> bool:
-        if not self.model.changed() or (
-            self.model.isempty() and self.model.filename is None
-        ):
+        if not self._has_unsaved_work():
             return True
         else:
             # make a popup to ask if they want to save
@@ -285,10 +403,9 @@ class CodeRyplDocumentWindow(QMainWindow):
             popup.setIcon(QMessageBox.Warning)
             choice = popup.exec()
 
-            # if they choose to save, save
+            # if they choose to save, save (and only close if that worked)
             if choice == QMessageBox.Save:
-                self.save()
-                return True
+                return self._save_before_close()
             elif choice == QMessageBox.Cancel:
                 print("cancel")
                 return False
@@ -309,12 +426,13 @@ class CodeRyplDocumentWindow(QMainWindow):
                 if check == QMessageBox.Cancel:
                     return False
                 elif check == QMessageBox.Discard:
+                    self._changes_discarded = True
                     return True
         return False
 
     def export_replacements(self):
         try:
-            renderer = ChosenRenderer(**self.model.meta_as_dict())
+            renderer = chosen_renderer()(**self.model.meta_as_dict())
 
             exportname = self._resolve_suggested_filename(renderer, "Untitled") + ".txt"
 
@@ -351,23 +469,24 @@ class CodeRyplDocumentWindow(QMainWindow):
 
             try:
                 # do the actual export!!
-                with exportpath.open("w") as file:
-                    file.truncate(0)
-                    self.model.export_into(file, renderer=renderer)
+                stats = self.model.export_to(str(exportpath), renderer=renderer)
             except Exception as err:
                 blocking_popup(f"Error exporting file({type(err).__name__}): {err}")
                 raise err
             else:
                 # TODO: consider removing this
                 # show a confirmation dialog
-                blocking_popup(f"Export Successful!\n" f"(exported to: {exportpath!r})")
+                blocking_popup(
+                    f"Export Successful!\n"
+                    f"({stats.rows:,} rows, exported to: {exportpath!r})"
+                )
 
         except Exception as e:
             blocking_popup(f"{type(e).__name__}: {e}")
             raise e
 
     def _resolve_suggested_filename(
-        self, renderer: ChosenRenderer, default: str
+        self, renderer: RplmFileRenderer, default: str
     ) -> str:
         currentname = self.model.filename
         suggested_name = renderer.suggested_filename()
@@ -382,7 +501,17 @@ class CodeRyplDocumentWindow(QMainWindow):
     # === qt / gui setup ===
 
     def closeEvent(self, event) -> None:
+        # close() is not overridden, so this is the one place closing is checked
         if self._check_for_save_on_close():
+            # do not let the window (or app) go away with a save still being written
+            self._saver.wait()
+            if self._recovery is not None:
+                # the journal is only deleted once the edits are saved or the user
+                # chose to discard them, otherwise the next launch can recover it
+                self._recovery.close(
+                    discard=self._changes_discarded or not self._has_unsaved_work()
+                )
+                self._recovery = None
             return super().closeEvent(event)
         else:
             event.ignore()
@@ -421,6 +550,11 @@ class CodeRyplDocumentWindow(QMainWindow):
         # --- the player table ---
         self.player_table = player_table = RplmTableView(
             Player.num_cols(),
+            # last names and positions
+            cols_with_completion={
+                1: ColumnCompleterDelegate,
+                3: ColumnCompleterDelegate,
+            },
             num_opt_cols=1,
         )
         self.coach_table = coach_table = RplmTableView(
@@ -448,6 +582,8 @@ class CodeRyplDocumentWindow(QMainWindow):
             normalize=renderer_tools.normalize_school,
             on_change=lambda: self.model.set_meta(school=school_input.text()),
         )
+        # the schools directory is only read once the input is first focused
+        self.school_completer = SchoolCompleter(school_input)
 
         self.sport_input = sport_input = self._make_metatext_input(
             prompt="SportsBall",
@@ -548,7 +684,13 @@ class CodeRyplDocumentWindow(QMainWindow):
 
         return widget
 
-    def load_file_model(self, model: RplmFile) -> None:
+    def load_file_model(
+        self, model: RplmFile, *, recovery: None | RecoveryJournal = None
+    ) -> None:
+        """
+        recovery is the journal of a recovered model (see recovery.recover),
+        otherwise a new one is started
+        """
 
         self.model = model
         self.set_window_title(
@@ -566,3 +708,11 @@ class CodeRyplDocumentWindow(QMainWindow):
             self.category_input.setText(model.category)
         if len(model.season):
             self.season_input.setText(model.season)
+
+        if model.filename is not None:
+            self.app.recent_files.add(model.filename)
+
+        # after setting the meta inputs so loading is not journaled as edits
+        if self._recovery is not None:
+            self._recovery.close()
+        self._recovery = RecoveryJournal(model) if recovery is None else recovery
@@ -0,0 +1,200 @@
+"""
+Compact, replayable records of the edits made to an RplmList.
+
+An RplmList reports every change it makes to its `edit_listeners` as one of these,
+they hold just enough to re-apply or revert the change (eg: the undo journal).
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+
+from typing import *
+
+if TYPE_CHECKING:
+    from .core import RplmRows
+
+# rough per-record cost of the tuple/object wrapping the payload
+_RECORD_OVERHEAD = 64
+
+
+def _row_bytes(cols: tuple[str, ...]) -> int:
+    return sys.getsizeof(cols) + sum(map(sys.getsizeof, cols))
+
+
+def index_runs(indices: Iterable[int]) -> list[tuple[int, int]]:
+    """
+    groups ascending row indices into runs of consecutive rows as (start, stop)
+    """
+    runs: list[tuple[int, int]] = []
+    for row in indices:
+        if len(runs) and runs[-1][1] == row:
+            runs[-1] = (runs[-1][0], row + 1)
+        else:
+            runs.append((row, row + 1))
+    return runs
+
+
+class CellSet(NamedTuple):
+    row: int
+    col: int
+    old: str
+    new: str
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        rplm_list._set_cell(self.row, self.col, self.new)
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        rplm_list._set_cell(self.row, self.col, self.old)
+
+    def focus(self) -> tuple[int, int]:
+        return (self.row, self.col)
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + sys.getsizeof(self.old) + sys.getsizeof(self.new)
+
+
+class RowsInserted(NamedTuple):
+    row: int
+    rows: tuple[tuple[str, ...], ...]
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        rplm_list._insert_rows(self.row, rplm_list._rows_from_cols(self.rows))
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        rplm_list._remove_rows(self.row, self.row + len(self.rows))
+
+    def focus(self) -> tuple[int, int]:
+        return (self.row, 0)
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + sum(map(_row_bytes, self.rows))
+
+
+class RowsRemoved(NamedTuple):
+    row: int
+    rows: tuple[tuple[str, ...], ...]
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        rplm_list._remove_rows(self.row, self.row + len(self.rows))
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        rplm_list._insert_rows(self.row, rplm_list._rows_from_cols(self.rows))
+
+    def focus(self) -> tuple[int, int]:
+        return (self.row, 0)
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + sum(map(_row_bytes, self.rows))
+
+
+class EmptyRowsRemoved(NamedTuple):
+    """
+    bulk removal of empty rows (ie remove_empty_lines), the rows are known to be
+    empty so only their (ascending) indices are kept
+    """
+
+    indices: array
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        rplm_list._remove_empty_rows(self.indices)
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        rplm_list._restore_empty_rows(self.indices)
+
+    def focus(self) -> tuple[int, int]:
+        return (self.indices[0] if len(self.indices) else 0, 0)
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + self.indices.itemsize * len(self.indices)
+
+
+class EmptyRowsInserted(NamedTuple):
+    """
+    the inverse of EmptyRowsRemoved, the indices are where the empty rows end up
+    """
+
+    indices: array
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        rplm_list._restore_empty_rows(self.indices)
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        rplm_list._remove_empty_rows(self.indices)
+
+    def focus(self) -> tuple[int, int]:
+        return (self.indices[0] if len(self.indices) else 0, 0)
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + self.indices.itemsize * len(self.indices)
+
+
+class EditGroup(NamedTuple):
+    """
+    several edits that make up one user action (eg: a drag swap)
+    """
+
+    edits: tuple[Edit, ...]
+
+    def apply(self, rplm_list: RplmRows) -> None:
+        for edit in self.edits:
+            edit.apply(rplm_list)
+
+    def revert(self, rplm_list: RplmRows) -> None:
+        for edit in reversed(self.edits):
+            edit.revert(rplm_list)
+
+    def focus(self) -> tuple[int, int]:
+        return self.edits[0].focus()
+
+    def nbytes(self) -> int:
+        return _RECORD_OVERHEAD + sum(edit.nbytes() for edit in self.edits)
+
+
+Edit = Union[
+    CellSet, RowsInserted, RowsRemoved, EmptyRowsRemoved, EmptyRowsInserted, EditGroup
+]
+
+
+_EDIT_TYPES: dict[str, type] = {
+    edit_type.__name__: edit_type
+    for edit_type in (
+        CellSet,
+        RowsInserted,
+        RowsRemoved,
+        EmptyRowsRemoved,
+        EmptyRowsInserted,
+        EditGroup,
+    )
+}
+
+
+def edit_to_plain(edit: Edit) -> list:
+    """
+    converts an edit to lists / strs / ints / bytes (eg: for msgpack), the inverse
+    of edit_from_plain
+    """
+    if isinstance(edit, EditGroup):
+        return ["EditGroup", [edit_to_plain(e) for e in edit.edits]]
+    elif isinstance(edit, (EmptyRowsRemoved, EmptyRowsInserted)):
+        return [type(edit).__name__, edit.indices.typecode, edit.indices.tobytes()]
+    else:
+        return [type(edit).__name__, *edit]
+
+
+def edit_from_plain(plain: Sequence) -> Edit:
+    kind, *fields = plain
+    edit_type = _EDIT_TYPES[kind]
+    if edit_type is EditGroup:
+        return EditGroup(tuple(map(edit_from_plain, fields[0])))
+    elif edit_type in (EmptyRowsRemoved, EmptyRowsInserted):
+        typecode, raw = fields
+        indices = array(typecode)
+        indices.frombytes(raw)
+        return edit_type(indices)
+    elif edit_type in (RowsInserted, RowsRemoved):
+        row, rows = fields
+        return edit_type(row, tuple(map(tuple, rows)))
+    else:
+        return edit_type(*fields)
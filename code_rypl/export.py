@@ -0,0 +1,331 @@
+"""
+Exporting an RplmFile through a renderer into a text file, and into other formats
+(csv, json lines, msgpack) in the same pass.
+
+The rows are rendered a chunk at a time and the lines gathered into one large
+write, with nothing logged per row, so exporting is bound by the renderer. Renderers
+with the batch methods (render_players/render_coaches) are given each chunk as
+columns, the others are called per row. Each chunk is rendered once and handed to
+every sink (ExportSink), which formats and buffers it for its own file.
+"""
+
+from __future__ import annotations
+
+import io
+import csv
+import json
+import time
+import itertools
+import contextlib
+
+from typing import *
+from typing import TextIO, IO
+
+from .core import Rplm, RplmFile, RplmRows, Player, Coach
+from .renderers.template import RplmFileRenderer
+from .saving import replacing
+
+# characters of rendered lines gathered before they are written out
+EXPORT_BUFFER_SIZE = 1 << 20
+# rows rendered at a time
+EXPORT_CHUNK_ROWS = 4096
+
+
+class ExportStats(NamedTuple):
+    rows: int
+    seconds: float
+    # set by cached exports (see export_cache.py), the rows that had to be rendered
+    rendered: None | int = None
+    written: bool = True  # False if the output file was left as it was
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self) -> str:
+        cached = (
+            ""
+            if self.rendered is None
+            else f", {self.rendered:,} rendered"
+            + ("" if self.written else ", output unchanged")
+        )
+        return (
+            f"exported {self.rows:,} rows in {self.seconds:.3f}s "
+            f"({self.rows_per_second:,.0f} rows/s{cached})"
+        )
+
+
+def nonempty_chunks(
+    rplm_list: RplmRows, chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[list[tuple[str, ...]]]:
+    """
+    the column tuples of the rows that are not empty, chunk_rows at a time
+    """
+    rows = (cols for cols in (rplm.as_cols() for rplm in rplm_list) if any(cols))
+    while len(chunk := list(itertools.islice(rows, chunk_rows))):
+        yield chunk
+
+
+def _field_names(rplm_type: Type[Rplm]) -> list[str]:
+    # the keyword names, in column order
+    return sorted(rplm_type.field_spec, key=rplm_type.field_spec.__getitem__)
+
+
+def _render_rows(
+    chunk: list[tuple[str, ...]],
+    rplm_type: Type[Rplm],
+    render: Callable[..., str],
+) -> list[str]:
+    names = _field_names(rplm_type)
+    return [render(**dict(zip(names, cols))) for cols in chunk]
+
+
+def _batch_renderer(
+    batch: Callable[[Sequence[Sequence[str]]], list[str]],
+) -> Callable[[list[tuple[str, ...]]], list[str]]:
+    def render_chunk(chunk: list[tuple[str, ...]]) -> list[str]:
+        lines = batch(list(zip(*chunk)))
+        if len(lines) != len(chunk):
+            raise ValueError(
+                f"{batch} rendered {len(lines)} lines for {len(chunk)} rows"
+            )
+        return lines
+
+    return render_chunk
+
+
+def chunk_renderer(
+    renderer: RplmFileRenderer, rplm_type: Type[Rplm]
+) -> Callable[[list[tuple[str, ...]]], list[str]]:
+    """
+    renders a chunk of column tuples of rplm_type into lines, through the
+    renderer's batch method when it has one
+    """
+    single: Callable[..., str]
+    if rplm_type is Player:
+        single, batch_name = renderer.render_player, "render_players"
+    else:
+        single, batch_name = renderer.render_coach, "render_coaches"
+    batch = getattr(renderer, batch_name, None)
+    if callable(batch):
+        return _batch_renderer(batch)
+    return lambda chunk: _render_rows(chunk, rplm_type, single)
+
+
+# the columns of the structured formats (csv, jsonl, msgpack), players leave kind
+# empty and coaches num and posn, "line" is the row as the renderer rendered it
+EXPORT_COLUMNS = ("type", "first", "last", "num", "posn", "kind", "line")
+
+_TYPE_NAMES: dict[Type[Rplm], str] = {Player: "player", Coach: "coach"}
+
+
+class ExportSink:
+    """
+    one output of an export, given each chunk of rows with their rendered lines.
+    buffers what it writes until buffer_size is reached, flush writes the rest
+    """
+
+    # the extension of the files, and how they are opened
+    suffix: ClassVar[str]
+    binary: ClassVar[bool] = False
+    open_args: ClassVar[dict[str, Any]] = dict(encoding="utf-8", newline="")
+
+    def __init__(self, file: IO, *, buffer_size: int = EXPORT_BUFFER_SIZE) -> None:
+        self.file = file
+        self.buffer_size = buffer_size
+        self._buffer: list[Any] = []
+        self._buffered = 0
+
+    def write_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> None:
+        self._write(self.format_rows(rplm_type, chunk, lines))
+
+    def format_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> str | bytes:
+        raise NotImplementedError
+
+    def _write(self, data: str | bytes) -> None:
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self._buffer):
+            self.file.write((b"" if self.binary else "").join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+
+class TextSink(ExportSink):
+    """
+    the replacements file, a rendered line per row
+    """
+
+    suffix = ".txt"
+    # the same as open(filename, "w"), what exports were always written with
+    open_args = dict()
+
+    def format_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> str:
+        return "\n".join(lines) + "\n"
+
+
+class CsvSink(ExportSink):
+    suffix = ".csv"
+
+    def __init__(self, file: IO, *, buffer_size: int = EXPORT_BUFFER_SIZE) -> None:
+        super().__init__(file, buffer_size=buffer_size)
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def format_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> str:
+        # the row's columns in the place of their EXPORT_COLUMNS
+        spots = [EXPORT_COLUMNS.index(name) - 1 for name in _field_names(rplm_type)]
+        empty = [""] * (len(EXPORT_COLUMNS) - 2)
+        type_name = _TYPE_NAMES[rplm_type]
+
+        def csv_row(cols: tuple[str, ...], line: str) -> list[str]:
+            row = empty.copy()
+            for spot, value in zip(spots, cols):
+                row[spot] = value
+            return [type_name, *row, line]
+
+        self._writer.writerows(map(csv_row, chunk, lines))
+        text = self._text.getvalue()
+        self._text.seek(0)
+        self._text.truncate()
+        return text
+
+
+def _records(
+    rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+) -> Iterator[dict[str, str]]:
+    # eg: {"type": "player", "first": ..., "last": ..., "num": ..., "posn": ..., "line": ...}
+    names = ("type", *_field_names(rplm_type), "line")
+    type_name = _TYPE_NAMES[rplm_type]
+    return (
+        dict(zip(names, (type_name, *cols, line))) for cols, line in zip(chunk, lines)
+    )
+
+
+class JsonLinesSink(ExportSink):
+    """
+    a json object per row, with only the fields of its type
+    """
+
+    suffix = ".jsonl"
+    open_args = dict(encoding="utf-8", newline="\n")
+
+    def format_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> str:
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        return "".join(
+            f"{dumps(record)}\n" for record in _records(rplm_type, chunk, lines)
+        )
+
+
+class MsgpackSink(ExportSink):
+    """
+    a stream of msgpack maps, one per row like JsonLinesSink
+    """
+
+    suffix = ".msgpack"
+    binary = True
+    open_args = dict()
+
+    def __init__(self, file: IO, *, buffer_size: int = EXPORT_BUFFER_SIZE) -> None:
+        import msgpack  # type: ignore[import]
+
+        super().__init__(file, buffer_size=buffer_size)
+        self._pack = msgpack.Packer().pack
+
+    def format_rows(
+        self, rplm_type: Type[Rplm], chunk: list[tuple[str, ...]], lines: list[str]
+    ) -> bytes:
+        return b"".join(map(self._pack, _records(rplm_type, chunk, lines)))
+
+
+# the formats that can be exported, by name (eg: for the command line)
+EXPORT_FORMATS: dict[str, Type[ExportSink]] = {
+    "txt": TextSink,
+    "csv": CsvSink,
+    "jsonl": JsonLinesSink,
+    "msgpack": MsgpackSink,
+}
+
+
+def export_into_sinks(
+    model: RplmFile, sinks: Sequence[ExportSink], renderer: RplmFileRenderer
+) -> ExportStats:
+    """
+    one pass over the non-empty players then coaches, each chunk is rendered once
+    and given to every sink
+    """
+    start = time.perf_counter()
+    num_rows = 0
+
+    for rplm_list, rplm_type in ((model.players, Player), (model.coaches, Coach)):
+        render = chunk_renderer(renderer, rplm_type)
+        for chunk in nonempty_chunks(rplm_list):
+            lines = render(chunk)
+            num_rows += len(lines)
+            for sink in sinks:
+                sink.write_rows(rplm_type, chunk, lines)
+
+    for sink in sinks:
+        sink.flush()
+    return ExportStats(num_rows, time.perf_counter() - start)
+
+
+def export_rplm(
+    model: RplmFile,
+    file: TextIO,
+    renderer: RplmFileRenderer,
+    *,
+    buffer_size: int = EXPORT_BUFFER_SIZE,
+) -> ExportStats:
+    """
+    writes a line per non-empty player then coach, as rendered by the renderer
+    """
+    return export_into_sinks(model, [TextSink(file, buffer_size=buffer_size)], renderer)
+
+
+def export_formats(
+    model: RplmFile,
+    filenames: Mapping[str, str],
+    renderer: RplmFileRenderer,
+    *,
+    buffer_size: int = EXPORT_BUFFER_SIZE,
+) -> ExportStats:
+    """
+    exports into a file per format in one pass, eg: {"txt": "a.txt", "csv": "a.csv"}.
+    the files are only replaced once they are all written (see saving.replacing)
+    """
+    unknown = set(filenames) - EXPORT_FORMATS.keys()
+    if len(unknown):
+        raise ValueError(
+            f"unknown export formats {', '.join(sorted(unknown))}, "
+            f"choose from: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    with contextlib.ExitStack() as stack:
+        sinks = []
+        for name, filename in filenames.items():
+            sink_type = EXPORT_FORMATS[name]
+            file = stack.enter_context(
+                replacing(
+                    filename,
+                    "wb" if sink_type.binary else "w",
+                    **sink_type.open_args,
+                )
+            )
+            sinks.append(sink_type(file, buffer_size=buffer_size))
+        return export_into_sinks(model, sinks, renderer)
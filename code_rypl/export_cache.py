@@ -0,0 +1,262 @@
+"""
+Incremental re-exports: only the rows that changed since the last export are
+rendered, and the output file is not rewritten at all if nothing changed.
+
+A small cache file next to the .rplm remembers, for the last export, the renderer
+(its class, the digest of its source, and the build), the metadata, the output file
+(with its size and mtime), and the text of each exported row. The previous output
+is the cache of the rendered lines, so it is re-read instead of storing them twice.
+
+Players are looked up row by row, as a player's line only depends on its own
+fields. A coach's line can depend on the coaches before it (eg: the numbering in
+the default renderer's _kind_abbv) and renderers keep that count as they go, so
+the coaches are reused all together or rendered all again.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import locale
+import hashlib
+import inspect
+import pathlib
+import itertools
+
+from typing import *
+
+from .core import RplmFile, RplmRows, Player, Coach, MetaAsDict
+from .export import ExportStats, EXPORT_CHUNK_ROWS, chunk_renderer
+from .renderers.template import RplmFileRenderer
+from .saving import write_atomically
+
+EXPORT_CACHE_VERSION = 1
+
+# separate the fields of a row and the rows of a section in the cache
+_FIELD_SEP = "\x1f"
+_ROW_SEP = "\x1e"
+
+
+def export_cache_path(filename: str) -> pathlib.Path:
+    """
+    eg: the cache for Hockey.rplm is .Hockey.rplm.export-cache in the same directory
+    """
+    path = pathlib.Path(filename)
+    return path.with_name(f".{path.name}.export-cache")
+
+
+def renderer_identity(renderer: RplmFileRenderer) -> None | str:
+    """
+    names the renderer's code, None if it cannot be told when that changes (in
+    which case nothing is cached)
+    """
+    try:
+        from . import versioning
+    except Exception as err:  # eg: a dev build run from outside its git checkout
+        print(f"not caching the export, the build cannot be told: {err}")
+        return None
+
+    cls = type(renderer)
+    try:
+        # renderers made from templates name their template (see renderers/compiled.py)
+        source = getattr(cls, "source_file", None) or inspect.getsourcefile(cls)
+        digest = hashlib.blake2b(pathlib.Path(source).read_bytes(), digest_size=16)  # type: ignore[arg-type]
+    except (TypeError, OSError):
+        return None
+    # the build covers the helpers the renderer uses (eg: renderers/tools.py)
+    return (
+        f"{cls.__module__}.{cls.__qualname__}:{digest.hexdigest()}"
+        f":{versioning.__build_number__}"
+    )
+
+
+def _row_keys(rows: list[tuple[str, ...]]) -> None | str:
+    """
+    the rows as one string, None if the separators cannot tell the rows apart
+    (ie a field contains one of them)
+    """
+    keys = _ROW_SEP.join(map(_FIELD_SEP.join, rows))
+    num_fields = sum(map(len, rows))
+    if keys.count(_FIELD_SEP) != num_fields - len(rows) or keys.count(_ROW_SEP) != max(
+        len(rows) - 1, 0
+    ):
+        return None
+    return keys
+
+
+def _split_keys(keys: str, num_rows: int) -> list[str]:
+    return keys.split(_ROW_SEP) if num_rows else []
+
+
+class ExportCache(NamedTuple):
+    renderer: str
+    meta: MetaAsDict
+    output: str
+    size: int
+    mtime_ns: int
+    num_players: int
+    players: str
+    num_coaches: int
+    coaches: str
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> None | ExportCache:
+        import msgpack  # type: ignore[import]
+
+        try:
+            with path.open("rb") as file:
+                version, *fields = msgpack.unpack(file)
+            if version != EXPORT_CACHE_VERSION:
+                return None
+            return cls(*fields)
+        except FileNotFoundError:
+            return None
+        except Exception as err:  # a damaged cache just means a full export
+            print(f"ignoring unreadable export cache {path}: {err}")
+            return None
+
+    def save(self, path: pathlib.Path) -> None:
+        import msgpack  # type: ignore[import]
+
+        data = msgpack.packb([EXPORT_CACHE_VERSION, *self])
+        try:
+            write_atomically(str(path), lambda: [data])
+        except OSError as err:
+            print(f"could not save the export cache {path}: {err}")
+
+    def previous_lines(self) -> None | list[str]:
+        """
+        the lines of the last export, None if the output was changed (or removed)
+        since
+        """
+        try:
+            stat = os.stat(self.output)
+            if (stat.st_size, stat.st_mtime_ns) != (self.size, self.mtime_ns):
+                return None
+            with open(self.output, encoding=export_encoding()) as file:
+                lines = file.read().split("\n")
+        except (OSError, UnicodeDecodeError):
+            return None
+        if lines[-1] != "" or len(lines) - 1 != self.num_players + self.num_coaches:
+            return None
+        return lines[:-1]
+
+
+def export_encoding() -> str:
+    # the same as open(filename, "w"), what exports were always written with
+    return locale.getpreferredencoding(False)
+
+
+def _nonempty_rows(rplm_list: RplmRows) -> list[tuple[str, ...]]:
+    return [cols for cols in (rplm.as_cols() for rplm in rplm_list) if any(cols)]
+
+
+def _render(
+    rows: list[tuple[str, ...]], render: Callable[[list[tuple[str, ...]]], list[str]]
+) -> list[str]:
+    lines: list[str] = []
+    for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        lines.extend(render(rows[start : start + EXPORT_CHUNK_ROWS]))
+    return lines
+
+
+def export_to_file(
+    model: RplmFile,
+    filename: str,
+    renderer: RplmFileRenderer,
+    *,
+    use_cache: bool = True,
+) -> ExportStats:
+    """
+    exports the model into filename, re-using what it can of the last export from
+    the model's .rplm file into the same file. the renderer must be newly made
+    """
+    start = time.perf_counter()
+    output = str(pathlib.Path(filename).resolve())
+    meta = model.meta_as_dict()
+
+    players = _nonempty_rows(model.players)
+    coaches = _nonempty_rows(model.coaches)
+    player_keys, coach_keys = _row_keys(players), _row_keys(coaches)
+    # only looked up for a cache, it loads versioning (which may need git)
+    identity = None
+    cache_path = None
+    if use_cache and model.filename is not None:
+        identity = renderer_identity(renderer)
+        if identity is not None and player_keys is not None and coach_keys is not None:
+            cache_path = export_cache_path(model.filename)
+
+    # what is still valid from the last export
+    cache = None if cache_path is None else ExportCache.load(cache_path)
+    previous = None
+    if cache is not None and (cache.renderer, cache.meta, cache.output) == (
+        identity,
+        meta,
+        output,
+    ):
+        previous = cache.previous_lines()
+
+    num_rows = len(players) + len(coaches)
+    if (
+        previous is not None
+        and cache is not None
+        and (cache.players, cache.coaches) == (player_keys, coach_keys)
+    ):
+        return ExportStats(num_rows, time.perf_counter() - start, 0, False)
+
+    # players, reusing the line of any row that was exported last time
+    known: dict[str, str] = {}
+    if previous is not None and cache is not None and player_keys is not None:
+        known = dict(
+            zip(
+                _split_keys(cache.players, cache.num_players),
+                previous[: cache.num_players],
+            )
+        )
+    player_lines: list[None | str] = [None] * len(players)
+    missing: list[int] = []
+    for row, key in enumerate(
+        _split_keys(player_keys, len(players))
+        if player_keys is not None
+        else itertools.repeat("", len(players))
+    ):
+        line = known.get(key)
+        if line is None:
+            missing.append(row)
+        else:
+            player_lines[row] = line
+    rendered = _render(
+        [players[row] for row in missing], chunk_renderer(renderer, Player)
+    )
+    for row, line in zip(missing, rendered):
+        player_lines[row] = line
+
+    # the coaches, all or nothing
+    if previous is not None and cache is not None and cache.coaches == coach_keys:
+        coach_lines = previous[cache.num_players :]
+    else:
+        coach_lines = _render(coaches, chunk_renderer(renderer, Coach))
+        rendered.extend(coach_lines)
+
+    lines = itertools.chain(player_lines, coach_lines)
+    text = "".join(f"{line}\n" for line in lines)  # type: ignore[str-bytes-safe]
+    data = text.replace("\n", os.linesep).encode(export_encoding())
+    written = write_atomically(output, lambda: [data])
+
+    if cache_path is not None:
+        assert identity is not None and player_keys is not None
+        assert coach_keys is not None
+        stat = os.stat(output)
+        ExportCache(
+            identity,
+            meta,
+            output,
+            stat.st_size,
+            stat.st_mtime_ns,
+            len(players),
+            player_keys,
+            len(coaches),
+            coach_keys,
+        ).save(cache_path)
+
+    return ExportStats(num_rows, time.perf_counter() - start, len(rendered), written)
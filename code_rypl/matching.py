@@ -0,0 +1,224 @@
+"""
+Ranked completions for a table column (see table.ColumnCompleter), from the values
+already in the column and optionally more carried over from elsewhere (eg: the last
+names of an earlier season).
+
+What was typed matches a value, best first:
+    1. as a prefix, "Ass" -> "Assistant"
+    2. at the start of a later word, "coach" -> "Head Coach"
+    3. as a subsequence from the start of a word, "hdc" -> "Head Coach" (only looked
+       for if 1 and 2 come up short)
+and within each, the values used most in the column come first, then the carried
+over values alphabetically.
+
+Prefix and word start matches are the runs of sorted key lists found by bisecting
+(the values in the column are kept sorted as they change), so a keystroke costs
+about the completions it returns rather than the number of values. Subsequences
+have to start where a value or one of its words starts, so only the values in the
+runs for the first typed character are checked, and of those only the ones with
+all the typed characters (by a mask of the characters in each key).
+"""
+
+from __future__ import annotations
+
+import re
+import bisect
+import heapq
+
+from typing import *
+
+# completions returned for each keystroke
+COMPLETION_LIMIT = 20
+
+_WORD_START = re.compile(r"(?<=[\s\-/(.])\w")
+
+
+def _key(text: str) -> str:
+    return text.casefold()
+
+
+def _word_keys(value: str) -> list[str]:
+    # the keys of the value from each of its words after the first
+    key = _key(value)
+    return [key[match.start() :] for match in _WORD_START.finditer(key)]
+
+
+def _char_mask(key: str) -> int:
+    # a bit for each character in the key (some characters share bits)
+    mask = 0
+    for char in key:
+        mask |= 1 << (ord(char) % 63)
+    return mask
+
+
+def _run(keys: list[str], typed: str) -> range:
+    # the keys starting with typed, keys is sorted
+    start = bisect.bisect_left(keys, typed)
+    stop = bisect.bisect_left(keys, typed + "\U0010ffff", start)
+    return range(start, stop)
+
+
+class _SortedKeys:
+    """
+    (key, value) pairs sorted by key, as lists so the keys can be bisected, with
+    the characters in each key as a mask to rule out subsequences quickly
+    """
+
+    def __init__(self, pairs: Iterable[tuple[str, str]] = ()) -> None:
+        ordered = sorted(pairs)
+        self.keys = [key for key, _ in ordered]
+        self.values = [value for _, value in ordered]
+        self.masks = [_char_mask(key) for key in self.keys]
+
+    def add(self, key: str, value: str) -> None:
+        at = bisect.bisect_left(self.keys, key)
+        # same keys are ordered by value, to find them again in discard
+        while at < len(self.keys) and self.keys[at] == key and self.values[at] < value:
+            at += 1
+        self.keys.insert(at, key)
+        self.values.insert(at, value)
+        self.masks.insert(at, _char_mask(key))
+
+    def discard(self, key: str, value: str) -> None:
+        for at in _run(self.keys, key):
+            if self.keys[at] == key and self.values[at] == value:
+                del self.keys[at]
+                del self.values[at]
+                del self.masks[at]
+                return
+
+    def matching(self, typed: str) -> Iterator[str]:
+        values = self.values
+        return (values[at] for at in _run(self.keys, typed))
+
+    def matching_subsequence(self, key: str, pattern: re.Pattern) -> Iterator[str]:
+        # the values with a key starting with key's first character that the pattern
+        # matches, the keys missing any of its characters are not matched against
+        keys, values, masks = self.keys, self.values, self.masks
+        mask, match = _char_mask(key), pattern.match
+        return (
+            values[at]
+            for at in _run(keys, key[0])
+            if masks[at] & mask == mask and match(keys[at])
+        )
+
+
+class _Pool:
+    """
+    values to complete from, by their keys and by the keys of their later words
+    """
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        values = list(values)
+        self.values: set[str] = set(values)
+        self.starts = _SortedKeys((_key(value), value) for value in values)
+        self.words = _SortedKeys(
+            (word, value) for value in values for word in _word_keys(value)
+        )
+
+    def add(self, value: str) -> None:
+        if value in self.values:
+            return
+        self.values.add(value)
+        self.starts.add(_key(value), value)
+        for word in _word_keys(value):
+            self.words.add(word, value)
+
+    def discard(self, value: str) -> None:
+        if value not in self.values:
+            return
+        self.values.discard(value)
+        self.starts.discard(_key(value), value)
+        for word in _word_keys(value):
+            self.words.discard(word, value)
+
+
+class ColumnMatcher:
+    """
+    ranks the values of a column (kept up to date with add/discard/reset) and the
+    carried over values against what was typed. count is how many times a value
+    is used in the column (eg: ColumnValues.count)
+    """
+
+    def __init__(
+        self,
+        values: Iterable[str],
+        count: Callable[[str], int],
+        carried_over: Iterable[str] = (),
+    ) -> None:
+        self.count = count
+        self._column = _Pool(values)
+        self._carried = _Pool(carried_over)
+
+    def add(self, value: str) -> None:
+        if value != "":
+            self._column.add(value)
+
+    def discard(self, value: str) -> None:
+        self._column.discard(value)
+
+    def reset(self, values: Iterable[str]) -> None:
+        self._column = _Pool(values)
+
+    def set_carried_over(self, values: Iterable[str]) -> None:
+        self._carried = _Pool(values)
+
+    def complete(self, typed: str, limit: int = COMPLETION_LIMIT) -> list[str]:
+        """
+        the best values for what was typed, best first
+        """
+        key = _key(typed)
+        if not len(key):
+            return []
+
+        found: dict[str, None] = {}  # ordered, without repeats
+        column, carried = self._column, self._carried
+        for matching in (
+            lambda pool: pool.starts.matching(key),
+            lambda pool: pool.words.matching(key),
+        ):
+            # the values in the column, most used first
+            self._take(found, self._most_used(matching(column), limit), limit)
+            # then the carried over ones, alphabetically (as they are sorted)
+            self._take(
+                found,
+                (value for value in matching(carried) if value not in column.values),
+                limit,
+            )
+            if len(found) >= limit:
+                return list(found)
+
+        if len(key) > 1:
+            self._take(found, self._subsequences(key, limit - len(found)), limit)
+        return list(found)
+
+    def _most_used(self, values: Iterable[str], limit: int) -> list[str]:
+        count = self.count
+        return heapq.nsmallest(limit, values, key=lambda value: (-count(value), value))
+
+    @staticmethod
+    def _take(found: dict[str, None], values: Iterable[str], limit: int) -> None:
+        for value in values:
+            if len(found) >= limit:
+                return
+            found.setdefault(value)
+
+    def _subsequences(self, key: str, wanted: int) -> list[str]:
+        # the first character has to start the value or one of its words, so only
+        # the values in that character's runs are checked
+        pattern = re.compile(".*?".join(map(re.escape, key)))
+        column, carried = self._column, self._carried
+
+        in_column = [
+            value
+            for sorted_keys in (column.starts, column.words)
+            for value in sorted_keys.matching_subsequence(key, pattern)
+        ]
+        found = self._most_used(in_column, wanted)
+        for sorted_keys in (carried.starts, carried.words):
+            for value in sorted_keys.matching_subsequence(key, pattern):
+                if len(found) >= wanted:
+                    return found
+                if value not in column.values:
+                    found.append(value)
+        return found
@@ -1,21 +1,49 @@
+"""
+The Qt side of the document model, layered over core.py: RplmList and
+ColumnValueIndex are the table and completion models the GUI edits through, and
+RplmFile makes its row lists RplmLists.
+"""
+
 from __future__ import annotations
 
-import time
+import os
+import queue
+import threading
 
 from typing import *
-from typing import TextIO, BinaryIO
-
-import pathlib
-import msgpack  # type: ignore[import]
 
-from .renderers.template import RplmFileRenderer
-from .renderers.tools import normalize_title
+from . import core
+from .core import (
+    R,
+    Rplm,
+    Player,
+    Coach,
+    MetaAsDict,
+    PlayerAsDict,
+    CoachAsDict,
+    SaveDict,
+    RplmPreview,
+    SaveSnapshot,
+    RplmRows,
+    ColumnValues,
+    pack_rplm,
+    pack_rplm_v2,
+    paused_gc,
+    SAVE_CHUNK_ROWS,
+    RPLM_V2_MAGIC,
+    DEFAULT_FORMAT_VERSION,
+)
+from .column_store import ColumnStore
+from .saving import write_atomically
 
 from PySide6 import QtGui
 
 from PySide6.QtCore import (
     Qt,
+    QObject,
+    Signal,
     QAbstractTableModel,
+    QAbstractListModel,
     QModelIndex,
     QByteArray,
     QMimeData,
@@ -25,6 +53,7 @@ from PySide6.QtWidgets import (
     QMessageBox,
 )
 
+
 # TODO: move this into a separate file for ui logic?
 # or.... only let it be used in the main window vie catching raised errors.
 # consider making a custom exeption for this? it could wrap the original error or a str
@@ -34,445 +63,112 @@ def blocking_popup(message):
     msgbox.exec()
 
 
-R = TypeVar("R", bound="Rplm")
-
-
-class Rplm:
-
-    field_spec: ClassVar[dict[str, int]]
-    _cols: dict[int, str]
-
-    def __new__(cls, *args, **kwargs):
-        if cls is Rplm:
-            raise TypeError("cannot instantiate abstract class Rplm")
-        return object.__new__(cls)
-
-    def __init__(self, **kwargs: str) -> None:
-
-        spec = self.field_spec
-
-        assert (
-            len(extras := set(kwargs) - set(spec)) == 0
-        ), f"unexpedted kwargs: {extras}"
-
-        assert (
-            len(missing := set(spec) - set(kwargs)) == 0
-        ), f"missing kwargs: {missing}"
-
-        assert set(spec) == set(kwargs), (
-            f"argument errors, got {set(kwargs)}, "
-            "however this assert should not have been reached, please report this bug"
-        )
-
-        self._cols = {spec[f]: kwargs[f] for f in kwargs}
-
-    def __repr__(self) -> str:
-        return f"{type(self).__name__}({self._cols})"
-
-    @classmethod
-    def from_cols(self: Type[R], *args: str) -> R:
-        assert len(args) == len(
-            self.field_spec
-        ), f"expected {len(self.field_spec)}, got {len(args)}"
-        return self(**{f: args[col] for f, col in self.field_spec.items()})
-
-    def hashstr(self) -> str:
-        return "({})".format(", ".join(self._cols.values()))
-
-    def as_cols(self) -> tuple[str, ...]:
-        return tuple(self._cols[col] for col in range(self.num_cols()))
-
-    def get_col(self, col: int) -> str:
-        return self._cols[col]
-
-    def set_col(self, col: int, value: str) -> None:
-        self._cols[col] = value
-
-    def field(self, name: str) -> str:
-        return self._cols[self.field_spec[name]]
-
-    def as_fields(self) -> dict[str, str]:
-        return {f: self.field(f) for f in self.field_spec}
-
-    def isempty(self) -> bool:
-        return set(self._cols.values()) == {""}
-
-    @classmethod
-    def empty(cls: Type[R]) -> R:
-        return cls(**{f: "" for f in cls.field_spec})
-
-    @classmethod
-    def num_cols(cls) -> int:
-        return len(cls.field_spec)  # type: ignore
-
-    @classmethod
-    def prompt_for_col(cls, col: int) -> str:
-        for prompt, colno in cls.field_spec.items():
-            if colno == col:
-                return prompt
-        raise RuntimeError(f"unknown column {col} for {cls.__name__}")
-
-
-class Player(Rplm):
-
-    # TODO: make this a tuple
-    field_spec = dict(
-        first=0,
-        last=1,
-        num=2,
-        posn=3,
-    )
-
-
-class Coach(Rplm):
-
-    field_spec = dict(
-        first=0,
-        last=1,
-        kind=2,
-    )
-
-
-class MetaAsDict(TypedDict):
-    school: str
-    sport: str
-    category: str
-    season: str
-
-
-class PlayerAsDict(TypedDict):
-    first: str
-    last: str
-    num: str
-    posn: str
-
-
-class CoachAsDict(TypedDict):
-    first: str
-    last: str
-    kind: str
-
-
-class SaveDict(TypedDict):
-    meta: MetaAsDict
-    players: tuple[PlayerAsDict, ...]
-    coaches: tuple[CoachAsDict, ...]
-
-
-class RplmFile:
-
-    metadata_spec: ClassVar[set[str]] = {"school", "sport", "category", "season"}
-
-    filename: None | str
-    school: str
-    sport: str
-    category: str
-    season: str
-    players: RplmList[Player]
-    coaches: RplmList[Coach]
-
-    def __init__(
-        self,
-        *,
-        filename: None | str = None,
-        school: str = "",
-        sport: str = "",
-        category: str = "",
-        season: str = "",
-        players: Iterable[Player] | None = None,
-        coaches: Iterable[Coach] | None = None,
-        set_selected_cell: Callable[[QModelIndex], None] | None = None,
-    ) -> None:
-        super().__init__()
-
-        self.players = players = (
-            RplmList([Player.empty()]) if players is None else RplmList(players)
-        )
-        self.coaches = coaches = (
-            RplmList([Coach.empty()]) if coaches is None else RplmList(coaches)
-        )
-
-        coaches.add_normalizer(2, normalize_title)
-
-        self.school = school
-        self.sport = sport
-        self.category = category
-        self.season = season
-
-        self.filename = filename
-
-        # TODO: store a hash of the last saved file contents here
-        # self._last_save: int = None
-        self._last_used_index = QModelIndex()
-
-        # intentionally  using the set_selected_cell setter not the internal attribute
-        self.set_selected_cell = (
-            set_selected_cell if set_selected_cell is not None else (lambda _: None)
-        )
-
-        self._last_save_hash: int | None = None
-
-    def set_as_saved_now(self) -> None:
-        self._last_save_hash = hash(self.hashstr())
-
-    def changed(self) -> bool:
-        # print(f"changed? {self.hashstr()} {self._last_save_hash}")
-        return self._last_save_hash != hash(self.hashstr())
-
-    @property
-    def set_selected_cell(self) -> Callable[[QModelIndex], None]:
-        return self._set_selected_cell
-
-    @set_selected_cell.setter
-    def set_selected_cell(self, set_selected_cell: Callable[[QModelIndex], None]):
-        self._set_selected_cell = set_selected_cell
-        self.players.set_selected_cell = set_selected_cell
-        self.coaches.set_selected_cell = set_selected_cell
-
-    @classmethod
-    def open(cls, filename: str) -> RplmFile:
-        path = pathlib.Path(filename)
-        assert path.exists(), f"{filename} does not exist"
-        assert path.is_file(), f"{filename} is not a file"
-        assert path.suffix == ".rplm", f"{filename} is not a .rplm file"
-
-        with path.open("rb") as file:
-            file_model = cls._from_file(file)
-        file_model.set_as_saved_now()
-        return file_model
-
-    def save_to_file(self, filename: str) -> None:
-        path = pathlib.Path(filename)
-
-        if path.exists():
-            assert path.is_file(), f"{filename} is not a file"
-
-        assert path.suffix == ".rplm", f"{filename} is not a .rplm file"
-
-        # this is an odd check but i cannot being myself to get rid of it
-        if path.exists() and filename != self.filename:
-            blocking_popup(f"{filename} already exists, overwriting")
-
-        path.parent.mkdir(parents=True, exist_ok=True)
-
-        with path.open("wb") as file:
-            file.truncate(0)
-            self._into_file(file)
-
-        if filename == self.filename:
-            self.set_as_saved_now()
-
-    def _into_file(self, into: BinaryIO) -> None:
-        data = self._to_save_dict()
-        # TODO: add hash to see if the file has changed
-        msgpack.pack(data, into)
-
-    def _to_save_dict(self) -> SaveDict:
-        return SaveDict(
-            meta=self.meta_as_dict(),
-            players=tuple(p.as_fields() for p in self.players),  # type: ignore
-            coaches=tuple(c.as_fields() for c in self.coaches),  # type: ignore
-        )
-
-    @classmethod
-    def _from_file(cls, file: BinaryIO) -> RplmFile:
+# the roles RplmList.data answers, and the color of the prompts in empty cells
+_CELL_ROLES = frozenset(
+    {
+        Qt.ItemDataRole.DisplayRole,
+        Qt.ItemDataRole.EditRole,
+        Qt.ItemDataRole.ForegroundRole,
+    }
+)
+_PROMPT_COLOR = QtGui.QColor("gray")
 
-        data = msgpack.unpack(file)
 
-        # validate the data
+class ColumnValueIndex(ColumnValues, QAbstractListModel):
+    """
+    doubles as the completion model for the column so editors can share one
+    long-lived model
+    """
 
-        # check for missing keys
-        assert "meta" in data, f"missing meta section in {file}"
-        meta: MetaAsDict = data["meta"]
+    # NOTE: no __iter__, PySide then stops the QCompleter seeing inserted rows
 
-        # check all the meta fields are present
-        assert set(meta) == set(
-            cls.metadata_spec
-        ), f"missing meta fields: {set(cls.metadata_spec) - set(meta)}"
+    def _begin_insert(self, first: int, last: int) -> None:
+        self.beginInsertRows(QModelIndex(), first, last)
 
-        assert "players" in data, f"missing players section in {file}"
-        players: list[PlayerAsDict] = data["players"]
+    def _end_insert(self) -> None:
+        self.endInsertRows()
 
-        assert "coaches" in data, f"missing coaches section in {file}"
-        coaches: List[CoachAsDict] = data["coaches"]
+    def _begin_remove(self, first: int, last: int) -> None:
+        self.beginRemoveRows(QModelIndex(), first, last)
 
-        return cls(
-            **meta,
-            players=(Player(**p) for p in players),
-            coaches=(Coach(**c) for c in coaches),
-            filename=file.name,
-        )
+    def _end_remove(self) -> None:
+        self.endRemoveRows()
 
-    @classmethod
-    def untitled(cls) -> RplmFile:
-        return cls(filename=None)
+    def _begin_reset(self) -> None:
+        self.beginResetModel()
 
-    def isempty(self) -> bool:
-        return (
-            self.players.isempty()
-            and self.coaches.isempty()
-            and set(m.strip() for m in self.meta_as_dict().values()) == {""}  # type: ignore
-        )
+    def _end_reset(self) -> None:
+        self.endResetModel()
 
-    def hashstr(self) -> str:
-        return hash(
-            "|".join(
-                (
-                    self.school,
-                    self.sport,
-                    self.category,
-                    self.season,
-                    str(self.filename),
-                    self.players.hashstr(),
-                    self.coaches.hashstr(),
-                )
-            )
-        )
+    def _changed(self, first: int, last: int) -> None:
+        self.dataChanged.emit(self.index(first), self.index(last))
 
-    def meta_as_dict(self) -> MetaAsDict:
-        return dict(
-            school=self.school,
-            sport=self.sport,
-            category=self.category,
-            season=self.season,
-        )
+    # QT interface methods
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._values)
 
-    def set_meta(
-        self,
-        school: None | str = None,
-        sport: None | str = None,
-        category: None | str = None,
-        season: None | str = None,
-    ):
-        if school is not None:
-            self.school = school
-        if sport is not None:
-            self.sport = sport
-        if category is not None:
-            self.category = category
-        if season is not None:
-            self.season = season
-
-    def export_into(self, file: TextIO, *, renderer: RplmFileRenderer) -> None:
-
-        file.writelines(
-            renderer.render_player(**player.as_fields()) + "\n"
-            for player in self.players
-            if not player.isempty()
-        )
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole):  # type: ignore
+        if index.isValid() and (role == Qt.DisplayRole or role == Qt.EditRole):
+            return self._values[index.row()]
+        return None
 
-        file.writelines(
-            renderer.render_coach(**coach.as_fields()) + "\n"
-            for coach in self.coaches
-            if (not coach.isempty(), print(coach))[0]
-        )
 
-    def remove_empty_lines(self) -> None:
-        self.players.remove_empty_lines()
-        self.coaches.remove_empty_lines()
+class RplmList(RplmRows[R], QAbstractTableModel):
 
+    values_type = ColumnValueIndex
 
-class RplmList(Generic[R], QAbstractTableModel):
     def __init__(
         self,
-        data: Iterable[R],
+        data: Iterable[R] | ColumnStore[R],
         set_selected_cell: Callable[[QModelIndex], None] = None,
         normalizers: dict[int, Callable[[str], str]] | None = None,
     ):
-        super().__init__()
-
-        # input sanitization
-        normalizers = {} if normalizers is None else normalizers
-
-        self._data = list(data)
-        assert len(self._data) > 0, f"cannot create an empty RplmList"
-
-        self._data_type = data_type = type(self._data[0])
+        super().__init__(data, normalizers)
 
-        if len(normalizers) > 0:
-            assert (
-                max(normalizers) < data_type.num_cols()
-            ), f"normalizers contain columns out of range, such include {set(n for n in normalizers if n > data_type.num_cols())}"
-
-        self._normalizers = normalizers
+        self._last_used_index = QModelIndex()
+        self._prompts = self._data_type.prompts()
 
         # live settable attr
         self.set_selected_cell: Callable[[QModelIndex], None] = (
             (lambda _: None) if set_selected_cell is None else set_selected_cell
         )
 
-    def add_normalizer(self, col: int, normalizer: Callable[[str], str]) -> None:
-        assert col < self._data_type.num_cols(), f"column {col} out of range"
-        assert col not in self._normalizers, f"column {col} already has a normalizer"
-        self._normalizers[col] = normalizer
-
-    def isempty(self) -> bool:
-        return len(self._data) == 0 or all(d.isempty() for d in self._data)
-
-    def hashstr(self) -> str:
-        return f"(players:{'|'.join(d.hashstr() for d in self._data)})"
-
-    def __len__(self) -> int:
-        return len(self._data)
-
-    def __str__(self) -> str:
-        return f"{type(self).__name__}[{self._data_type.__name__}](...)"
-
-    def __iter__(self) -> Iterator[R]:
-        return iter(self._data)
+    def select_cell(self, row: int, col: int) -> None:
+        self.set_selected_cell(self.index(row, col))
 
     def current_rplm(self) -> R:
         return self._data[self._last_used_index.row()]
 
-    def get_col_set(self, col: int) -> Set[str]:
-        return {rplm.get_col(col) for rplm in self._data if not rplm.isempty()}
-
-    def get_rplm_field(self, row: int, col: int) -> str:
-        return self._data[row].get_col(col)
+    def column_values(self, col: int) -> ColumnValueIndex:
+        return cast(ColumnValueIndex, super().column_values(col))
 
-    def get_rplm(self, row: int) -> R:
-        return self._data[row]
+    # --- change hooks, as qt signals ---
 
-    def set_rplm_field(self, row: int, col: int, value) -> None:
+    def _begin_insert(self, first: int, last: int) -> None:
+        self.beginInsertRows(QModelIndex(), first, last)
 
-        value = value.strip()
+    def _end_insert(self) -> None:
+        self.endInsertRows()
 
-        if value == self._data_type.prompt_for_col(col):
-            value = ""
+    def _begin_remove(self, first: int, last: int) -> None:
+        self.beginRemoveRows(QModelIndex(), first, last)
 
-        rplm = self._data[row]
+    def _end_remove(self) -> None:
+        self.endRemoveRows()
 
-        normed_value = self._normalizers.get(col, lambda _: _)(value)
+    def _begin_reset(self) -> None:
+        self.beginResetModel()
 
-        rplm.set_col(col, value if normed_value is None else normed_value)
+    def _end_reset(self) -> None:
+        self.endResetModel()
 
-    def append(self, rplm: R):
-        self._data.append(rplm)
-        self.refresh()
+    def _cell_changed(self, row: int, col: int) -> None:
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index)
 
-    def insert(self, row: int, rplm: R) -> None:
-        self._data.insert(row, rplm)
-        self.refresh()
-
-    def refresh(self) -> None:
-        if len(self._data) == 0:
-            self._data.append(self._data_type.empty())  # type: ignore
+    def _layout_changed(self) -> None:
         self.layoutChanged.emit()
 
-    def pop(self, row: int) -> R:
-        data = self._data
-        item = data.pop(row)
-        if len(data) == 0:
-            data.append(self._data_type.empty())  # type: ignore
-        self.refresh()
-        return item
-
-    def remove_empty_lines(self) -> None:
-        self._data = data = [r for r in self._data if not r.isempty()]
-        if len(data) == 0:
-            data.append(self._data_type.empty())  # type: ignore
-        self.refresh()
-
     # === qt / ui interface ===
 
     # QT interface methods
@@ -484,26 +180,17 @@ class RplmList(Generic[R], QAbstractTableModel):
         return self._data_type.num_cols()
 
     def data(self, index: QModelIndex, role: Qt.ItemDataRole):  # type: ignore
-
-        # print(f"{self}.data({index}, {role})")
-
-        if not index.isValid():
+        # called for every visible cell and role on each repaint, so only reads
+        if role not in _CELL_ROLES or not index.isValid():
             return None
 
-        self._last_used_index = index
-
-        rplm = self._data[index.row()]
-        value = rplm.get_col(index.column())
-
-        if role == Qt.DisplayRole or role == Qt.EditRole:
-            return (
-                value if len(value) else self._data_type.prompt_for_col(index.column())
-            )
+        col = index.column()
+        value = self.get_rplm_field(index.row(), col)
 
-        elif role == Qt.ForegroundRole:
-            return None if len(value) else QtGui.QColor("gray")
-
-        return None
+        # empty cells show their column's prompt, in gray
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return None if len(value) else _PROMPT_COLOR
+        return value if len(value) else self._prompts[col]
 
     def setData(self, index, value, role):
 
@@ -557,11 +244,10 @@ class RplmList(Generic[R], QAbstractTableModel):
             src_value = self.get_rplm_field(*src_pos)
             dest_value = self.get_rplm_field(*dest_pos)
 
-            self.set_rplm_field(*dest_pos, src_value)
-            self.set_rplm_field(*src_pos, dest_value)
-
-            # update the table
-            self.refresh()
+            # each set emits its own dataChanged, grouped so the swap is one undo step
+            with self.grouped_edits():
+                self.set_rplm_field(*dest_pos, src_value)
+                self.set_rplm_field(*src_pos, dest_value)
 
             # keep focus on the dragged item (feels a bit more natural)
             self.set_selected_cell(parent)
@@ -571,3 +257,117 @@ class RplmList(Generic[R], QAbstractTableModel):
             )
 
         return True
+
+
+class RplmFile(core.RplmFile):
+
+    players: RplmList[Player]
+    coaches: RplmList[Coach]
+
+    rows_type = RplmList
+
+    def __init__(
+        self,
+        *,
+        filename: None | str = None,
+        school: str = "",
+        sport: str = "",
+        category: str = "",
+        season: str = "",
+        players: Iterable[Player] | None = None,
+        coaches: Iterable[Coach] | None = None,
+        set_selected_cell: Callable[[QModelIndex], None] | None = None,
+        columnar: bool = False,
+        format_version: int = DEFAULT_FORMAT_VERSION,
+    ) -> None:
+        super().__init__(
+            filename=filename,
+            school=school,
+            sport=sport,
+            category=category,
+            season=season,
+            players=players,
+            coaches=coaches,
+            columnar=columnar,
+            format_version=format_version,
+        )
+
+        # intentionally  using the set_selected_cell setter not the internal attribute
+        self.set_selected_cell = (
+            set_selected_cell if set_selected_cell is not None else (lambda _: None)
+        )
+
+    @property
+    def set_selected_cell(self) -> Callable[[QModelIndex], None]:
+        return self._set_selected_cell
+
+    @set_selected_cell.setter
+    def set_selected_cell(self, set_selected_cell: Callable[[QModelIndex], None]):
+        self._set_selected_cell = set_selected_cell
+        self.players.set_selected_cell = set_selected_cell
+        self.coaches.set_selected_cell = set_selected_cell
+
+    def check_save_target(self, filename: str) -> None:
+        super().check_save_target(filename)
+
+        # this is an odd check but i cannot being myself to get rid of it
+        if os.path.exists(filename) and filename != self.filename:
+            blocking_popup(f"{filename} already exists, overwriting")
+
+
+class SaveResult(NamedTuple):
+    model: RplmFile
+    snapshot: SaveSnapshot
+    written: bool  # False if the file on disk was already identical
+    error: None | Exception
+    stat: None | os.stat_result  # of the file right after saving
+
+
+class BackgroundSaver(QObject):
+    """
+    saves snapshots of RplmFiles on a worker thread, one at a time in the order
+    they were requested, and emits `saved` (on the GUI thread) as each finishes
+    """
+
+    saved = Signal(object)  # SaveResult
+
+    def __init__(self, parent: None | QObject = None) -> None:
+        super().__init__(parent)
+        self._queue: queue.Queue[tuple[RplmFile, SaveSnapshot]] = queue.Queue()
+        self._worker: None | threading.Thread = None
+
+    def save(self, model: RplmFile, filename: str) -> None:
+        """
+        snapshots the model now, so later edits are not part of this save
+        """
+        model.check_save_target(filename)
+        self._queue.put((model, model.snapshot(filename)))
+
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._work, name="rplm-saver", daemon=True
+            )
+            self._worker.start()
+
+    def wait(self) -> None:
+        """
+        blocks until every requested save has been written
+        """
+        self._queue.join()
+
+    def _work(self) -> None:
+        while True:
+            model, snapshot = self._queue.get()
+            try:
+                written = write_atomically(snapshot.filename, snapshot.packed_chunks)
+                stat = os.stat(snapshot.filename)
+                result = SaveResult(model, snapshot, written, None, stat)
+            except Exception as err:
+                result = SaveResult(model, snapshot, False, err, None)
+
+            try:
+                self.saved.emit(result)
+            except RuntimeError:  # the saver was deleted with its window
+                pass
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,159 @@
+"""
+The recently opened files, with previews of their meta and row counts.
+
+The previews come from RplmFile.peek and are kept in a small on-disk cache keyed
+by filename, an entry is only re-read when the file's size or mtime changes. So
+listing lots of (mostly unchanged) files is a stat each.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+
+from typing import *
+
+from .core import RplmFile, RplmPreview
+from .saving import write_atomically
+
+# files listed in the Open Recent menu
+RECENT_LIMIT = 10
+# previews kept in the cache, the least recently used are dropped past this
+PREVIEW_CACHE_LIMIT = 512
+
+
+def recent_path() -> pathlib.Path:
+    override = os.environ.get("CODE_RYPL_RECENT_FILE")
+    if override:
+        return pathlib.Path(override)
+    return pathlib.Path.home() / ".code_rypl" / "recent.msgpack"
+
+
+def describe(filename: str, preview: None | RplmPreview) -> str:
+    """
+    a one line summary for menus, eg: "Hockey.rplm - Test School, Men's Hockey 2022-23 (25 players, 3 coaches)"
+    """
+    name = pathlib.Path(filename).name
+    if preview is None:
+        return f"{name} - (unreadable)"
+
+    meta = preview.meta
+    about = " ".join(
+        part for part in (meta["category"], meta["sport"], meta["season"]) if part
+    )
+    school = meta["school"] or "no school"
+    return (
+        f"{name} - {school}, {about or 'no details'} "
+        f"({preview.num_players} players, {preview.num_coaches} coaches)"
+    )
+
+
+class RecentFiles:
+    def __init__(self, path: None | pathlib.Path = None) -> None:
+        self.path = recent_path() if path is None else path
+
+        self._recent: list[str] = []
+        # filename -> [size, mtime_ns, *RplmPreview], in least to most recently used
+        self._previews: dict[str, list] = {}
+        self._dirty = False
+        # read on first use, not while starting up
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        import msgpack  # type: ignore[import]
+
+        try:
+            with self.path.open("rb") as file:
+                data = msgpack.unpack(file)
+            recent, previews = data["recent"], data["previews"]
+            assert isinstance(recent, list) and isinstance(previews, dict)
+        except FileNotFoundError:
+            return
+        except Exception as err:  # a corrupt cache is just started over
+            print(f"ignoring unreadable recent files cache {self.path}: {err}")
+            return
+
+        self._recent = recent
+        self._previews = previews
+
+    def _save(self) -> None:
+        import msgpack  # type: ignore[import]
+
+        data = msgpack.packb(dict(recent=self._recent, previews=self._previews))
+        try:
+            write_atomically(str(self.path), lambda: [data])
+        except OSError as err:
+            print(f"could not save the recent files cache {self.path}: {err}")
+        self._dirty = False
+
+    def filenames(self) -> list[str]:
+        self._load()
+        return list(self._recent)
+
+    def add(self, filename: str) -> None:
+        self._load()
+        filename = str(pathlib.Path(filename).resolve())
+        if filename in self._recent:
+            self._recent.remove(filename)
+        self._recent.insert(0, filename)
+        del self._recent[RECENT_LIMIT:]
+        self._save()
+
+    def remove(self, filename: str) -> None:
+        self._load()
+        filename = str(pathlib.Path(filename).resolve())
+        if filename in self._recent:
+            self._recent.remove(filename)
+            self._save()
+
+    def clear(self) -> None:
+        self._load()
+        self._recent.clear()
+        self._save()
+
+    def preview(self, filename: str) -> None | RplmPreview:
+        """
+        the preview of any .rplm file, from the cache if it has not changed since.
+        None if it cannot be read
+        """
+        self._load()
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        key = [stat.st_size, stat.st_mtime_ns]
+
+        cached = self._previews.pop(filename, None)
+        if cached is not None and cached[:2] == key:
+            self._previews[filename] = cached  # now the most recently used
+            return RplmPreview(*cached[2:])
+
+        try:
+            preview = RplmFile.peek(filename)
+        except Exception as err:
+            print(f"could not preview {filename}: {err}")
+            return None
+
+        self._previews[filename] = key + list(preview)
+        while len(self._previews) > PREVIEW_CACHE_LIMIT:
+            del self._previews[next(iter(self._previews))]
+        self._dirty = True
+        return preview
+
+    def previews(self) -> list[tuple[str, None | RplmPreview]]:
+        """
+        the recent files (that still exist) with their previews
+        """
+        self._load()
+        entries = [
+            (filename, self.preview(filename))
+            for filename in self._recent
+            if os.path.isfile(filename)
+        ]
+        if self._dirty:
+            self._save()
+        return entries
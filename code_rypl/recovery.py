@@ -0,0 +1,326 @@
+"""
+Crash recovery of unsaved edits.
+
+Every edit and metadata change made to an open document is appended to a journal
+in the recovery directory as a length prefixed msgpack record. A worker thread
+writes the records in small batches, the journal is compacted to just the unsaved
+edits when the document is saved, and deleted when it is closed. So a journal
+left behind by a process that is no longer running means a crash, and replaying
+it onto the file it was recorded against gets the unsaved edits back.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+import uuid
+import queue
+import struct
+import pathlib
+import itertools
+import threading
+
+from typing import *
+
+from .model import RplmFile
+from .edits import Edit, edit_to_plain, edit_from_plain
+from .saving import write_atomically
+
+if TYPE_CHECKING:
+    from . import core
+    from .core import RplmRows
+
+JOURNAL_MAGIC = b"RPLJ\x01"
+JOURNAL_SUFFIX = ".rplj"
+# added to journals that could not be recovered, so they are not offered again
+FAILED_SUFFIX = ".failed"
+
+# the worker lets records gather for this long before writing (and fsync-ing) them
+BATCH_SECONDS = 0.25
+
+# each record is prefixed with its length so a torn last record can be detected
+_LENGTH = struct.Struct("<I")
+
+
+class RecoveryError(Exception):
+    pass
+
+
+def recovery_dir() -> pathlib.Path:
+    override = os.environ.get("CODE_RYPL_RECOVERY_DIR")
+    if override:
+        return pathlib.Path(override)
+    return pathlib.Path.home() / ".code_rypl" / "recovery"
+
+
+def _frame(record: Any) -> bytes:
+    import msgpack  # type: ignore[import]
+
+    body = msgpack.packb(record)
+    return _LENGTH.pack(len(body)) + body
+
+
+def read_journal(path: pathlib.Path) -> tuple[dict[str, Any], list[list]]:
+    """
+    returns the header and the records, a partially written record at the end
+    (ie the process died mid-write) is ignored
+    """
+    import msgpack  # type: ignore[import]
+
+    records = []
+    with path.open("rb") as file:
+        if file.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise RecoveryError(f"{path} is not a recovery journal")
+        while len(prefix := file.read(_LENGTH.size)) == _LENGTH.size:
+            (length,) = _LENGTH.unpack(prefix)
+            body = file.read(length)
+            if len(body) < length:
+                break
+            try:
+                records.append(msgpack.unpackb(body))
+            except ValueError:
+                break
+
+    if not len(records) or not isinstance(records[0], dict):
+        raise RecoveryError(f"{path} has no header")
+    header, *records = records
+    return header, records
+
+
+def _pid_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        kernel32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        kernel32.CloseHandle(handle)
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, but someone else's
+        return True
+    return True
+
+
+def orphaned_journals(directory: None | pathlib.Path = None) -> list[pathlib.Path]:
+    """
+    the journals whose process is no longer running, ie that crashed
+    """
+    directory = recovery_dir() if directory is None else directory
+    if not directory.is_dir():
+        return []
+
+    orphans = []
+    for path in sorted(directory.glob(f"*{JOURNAL_SUFFIX}")):
+        try:
+            pid = int(path.name.split("-")[0])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            orphans.append(path)
+    return orphans
+
+
+def set_aside(path: pathlib.Path) -> pathlib.Path:
+    """
+    renames a journal that could not be recovered out of the way, eg:
+    123-ab.rplj -> 123-ab.rplj.failed, the edits are kept but no longer offered
+    """
+    failed = path.with_name(path.name + FAILED_SUFFIX)
+    path.replace(failed)
+    return failed
+
+
+def recover(path: pathlib.Path) -> RecoveryJournal:
+    """
+    replays an orphaned journal onto the file (or untitled document) it was
+    recorded against. the journal is handed over to the returned RecoveryJournal,
+    whose .model is the recovered document
+    """
+    header, records = read_journal(path)
+    filename: None | str = header["filename"]
+
+    if filename is None:
+        model = RplmFile.untitled()
+    else:
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            raise RecoveryError(f"{filename} no longer exists")
+        if (stat.st_size, stat.st_mtime_ns) != (header["size"], header["mtime_ns"]):
+            raise RecoveryError(f"{filename} was changed since the edits were made")
+        model = RplmFile.open(filename)
+
+    for record in records:
+        _apply(model, record)
+
+    # the recovered edits are unsaved, keep them journaled in case of another crash
+    generation = model.edit_generation()
+    journal = RecoveryJournal(
+        model, records=([kind, generation, *rest] for kind, _, *rest in records)
+    )
+    journal.flush()  # written out before the old journal is gone
+    path.unlink()
+    return journal
+
+
+def _apply(model: RplmFile, record: list) -> None:
+    kind, _, *fields = record
+    if kind == "edit":
+        section, plain = fields
+        edit_from_plain(plain).apply(getattr(model, section))
+    elif kind == "meta":
+        (changes,) = fields
+        model.set_meta(**changes)
+    else:
+        raise RecoveryError(f"unknown journal record {kind!r}")
+
+
+class _Create(NamedTuple):
+    header: dict[str, Any]
+    records: list[list]
+
+
+class _Compact(NamedTuple):
+    filename: None | str
+    generation: int
+    size: None | int
+    mtime_ns: None | int
+
+
+class _Close(NamedTuple):
+    discard: bool
+
+
+class RecoveryJournal:
+    """
+    journals the edits to one RplmFile, see the module docstring
+    """
+
+    def __init__(
+        self,
+        model: RplmFile,
+        *,
+        directory: None | pathlib.Path = None,
+        records: Iterable[list] = (),
+    ) -> None:
+        self.model = model
+
+        directory = recovery_dir() if directory is None else directory
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / f"{os.getpid()}-{uuid.uuid4().hex}{JOURNAL_SUFFIX}"
+
+        # framed records, or a _Create / _Compact / _Close for the worker to do in
+        # order. the journal is written by the worker from the start, so opening a
+        # document does not wait on it
+        self._queue: queue.Queue[bytes | _Create | _Compact | _Close] = queue.Queue()
+        self._queue.put(_Create(self._header(model.filename), list(records)))
+        self._worker = threading.Thread(
+            target=self._work, name="rplm-recovery", daemon=True
+        )
+        self._worker.start()
+
+        model.players.edit_listeners.append(self._record_edit)
+        model.coaches.edit_listeners.append(self._record_edit)
+        model.meta_listeners.append(self._record_meta)
+
+    @staticmethod
+    def _header(
+        filename: None | str,
+        size: None | int = None,
+        mtime_ns: None | int = None,
+    ) -> dict[str, Any]:
+        if filename is not None and size is None and os.path.isfile(filename):
+            stat = os.stat(filename)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        return dict(pid=os.getpid(), filename=filename, size=size, mtime_ns=mtime_ns)
+
+    def _record_edit(self, rplm_list: RplmRows, edit: Edit) -> None:
+        section = "players" if rplm_list is self.model.players else "coaches"
+        self._queue.put(
+            _frame(["edit", self.model.edit_generation(), section, edit_to_plain(edit)])
+        )
+
+    def _record_meta(self, model: core.RplmFile, changes: dict[str, str]) -> None:
+        self._queue.put(_frame(["meta", model.edit_generation(), changes]))
+
+    def compact(self, filename: str, generation: int, stat: os.stat_result) -> None:
+        """
+        drops the edits up to and including `generation`, now that they are saved
+        in `filename` (whose stat is the one right after saving)
+        """
+        self._queue.put(_Compact(filename, generation, stat.st_size, stat.st_mtime_ns))
+
+    def flush(self) -> None:
+        """
+        blocks until every record so far has been written
+        """
+        self._queue.join()
+
+    def close(self, *, discard: bool = True) -> None:
+        """
+        stops journaling, and deletes the journal unless discard is False
+        """
+        self.model.players.edit_listeners.remove(self._record_edit)
+        self.model.coaches.edit_listeners.remove(self._record_edit)
+        self.model.meta_listeners.remove(self._record_meta)
+
+        self._queue.put(_Close(discard))
+        self._worker.join()
+
+    def _work(self) -> None:
+        file = self.path.open("ab")
+        try:
+            while True:
+                batch = [self._queue.get()]
+                if isinstance(batch[0], bytes):
+                    time.sleep(BATCH_SECONDS)
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                for item in batch:
+                    if isinstance(item, bytes):
+                        file.write(item)
+                    elif isinstance(item, _Create):
+                        file.write(JOURNAL_MAGIC + _frame(item.header))
+                        for record in item.records:
+                            file.write(_frame(record))
+                    elif isinstance(item, _Compact):
+                        file.close()
+                        self._compact(item)
+                        file = self.path.open("ab")
+                    elif isinstance(item, _Close):
+                        file.close()
+                        if item.discard:
+                            self.path.unlink()
+                        for _ in batch:
+                            self._queue.task_done()
+                        return
+
+                file.flush()
+                os.fsync(file.fileno())
+                for _ in batch:
+                    self._queue.task_done()
+        finally:
+            file.close()
+
+    def _compact(self, compact: _Compact) -> None:
+        _, records = read_journal(self.path)
+        header = self._header(compact.filename, compact.size, compact.mtime_ns)
+        unsaved = [record for record in records if record[1] > compact.generation]
+        write_atomically(
+            str(self.path),
+            lambda: itertools.chain(
+                [JOURNAL_MAGIC + _frame(header)], map(_frame, unsaved)
+            ),
+        )
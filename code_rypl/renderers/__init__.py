@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from types import ModuleType
+
+from typing import *
+
+if TYPE_CHECKING:
+    from .template import RplmFileRenderer
+
+
+# the modules of the built in renderers are imported statically (if lazily), so
+# pyinstaller finds them when freezing the app
+
+
+def _default_module() -> ModuleType:
+    from . import default
+
+    return default
+
+
+def _test_module() -> ModuleType:
+    from . import test
+
+    return test
+
+
+# --renderer=<name> -> imports the module defining its RplmFileRenderer
+BUILTIN_RENDERERS: dict[str, Callable[[], ModuleType]] = {
+    "default": _default_module,
+    "test": _test_module,
+}
+
+# renderers made from templates are <renderers dir>/<name>.json, see compiled.py
+TEMPLATE_SUFFIX = ".json"
+
+# the renderers compiled from templates so far, by name
+_compiled: dict[str, tuple[float, Type[RplmFileRenderer]]] = {}
+
+
+def renderers_dir() -> pathlib.Path:
+    override = os.environ.get("CODE_RYPL_RENDERERS_DIR")
+    if override:
+        return pathlib.Path(override)
+    return pathlib.Path.home() / ".code_rypl" / "renderers"
+
+
+def template_path(name: str) -> pathlib.Path:
+    return renderers_dir() / f"{name}{TEMPLATE_SUFFIX}"
+
+
+def renderer_exists(name: str) -> bool:
+    """
+    if there is a renderer by that name, without loading it
+    """
+    return name in BUILTIN_RENDERERS or (
+        name.isidentifier() and template_path(name).is_file()
+    )
+
+
+def available_renderers() -> list[str]:
+    """
+    the names of the built in renderers and of the templates in the renderers dir
+    """
+    templates = {
+        path.stem
+        for path in renderers_dir().glob(f"*{TEMPLATE_SUFFIX}")
+        if path.stem.isidentifier()
+    }
+    return sorted(templates | BUILTIN_RENDERERS.keys())
+
+
+def load_renderer(name: str) -> Type[RplmFileRenderer]:
+    """
+    the RplmFileRenderer class of a renderer by name, a built in renderer or one
+    compiled from its template (again only if the template changed since)
+    """
+    if name in BUILTIN_RENDERERS:
+        return BUILTIN_RENDERERS[name]().RplmFileRenderer
+
+    if not renderer_exists(name):
+        raise ValueError(
+            f"unknown renderer {name!r}, "
+            f"choose from: {', '.join(available_renderers())}"
+        )
+
+    path = template_path(name)
+    mtime = path.stat().st_mtime
+    if name not in _compiled or _compiled[name][0] != mtime:
+        from .compiled import compile_renderer
+
+        _compiled[name] = (mtime, compile_renderer(path))
+    return _compiled[name][1]
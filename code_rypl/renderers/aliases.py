@@ -0,0 +1,166 @@
+"""
+Looking up what a user typed among a fixed set of names and their aliases (eg: the
+sports and categories in tools.py), built once at import.
+
+An exact lookup is a dict lookup of the typed text's key. Otherwise the aliases
+within a few edits (depending on the length) are searched for in a BK-tree (a tree
+of the aliases by edit distance), so "basketbal" or "lacrose" still find their
+sport, and the closest of those wins. A misspelling as close to two different
+names finds neither.
+"""
+
+from __future__ import annotations
+
+import functools
+
+from typing import *
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    the levenshtein distance, the fewest inserts, deletes, and substitutions
+    that turn a into b
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for row, char_a in enumerate(a, 1):
+        current = [row]
+        for col, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[col] + 1,
+                    current[col - 1] + 1,
+                    previous[col - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def swap_distance(a: str, b: str) -> int:
+    """
+    edit_distance where swapping two neighbouring letters is also one edit (the
+    optimal string alignment distance), what allowed_edits counts. not used to
+    build the BK-tree, as it is not a metric
+    """
+    rows = [list(range(len(b) + 1))]
+    for row, char_a in enumerate(a, 1):
+        current = [row]
+        for col, char_b in enumerate(b, 1):
+            distance = min(
+                rows[-1][col] + 1,
+                current[col - 1] + 1,
+                rows[-1][col - 1] + (char_a != char_b),
+            )
+            if row > 1 and col > 1 and char_a == b[col - 2] and a[row - 2] == char_b:
+                distance = min(distance, rows[-2][col - 2] + 1)
+            current.append(distance)
+        rows.append(current)
+    return rows[-1][-1]
+
+
+def allowed_edits(key: str) -> int:
+    """
+    how far a misspelling can be from an alias, none for short keys (eg: "fb",
+    "m") where one edit is another word entirely
+    """
+    if len(key) < 4:
+        return 0
+    elif len(key) < 8:
+        return 1
+    else:
+        return 2
+
+
+class _BKNode:
+    __slots__ = ("alias", "children")
+
+    def __init__(self, alias: str) -> None:
+        self.alias = alias
+        self.children: dict[int, _BKNode] = {}
+
+
+class AliasIndex:
+    """
+    the names, each with its aliases, keyed by key (eg: tools.matchify)
+    """
+
+    def __init__(
+        self,
+        aliases: Mapping[str, Iterable[str]],
+        key: Callable[[str], str],
+        fuzzy_cache_size: int = 1024,
+    ) -> None:
+        self.key = key
+        self._names: dict[str, str] = {}  # key of an alias -> its name
+        for name, name_aliases in aliases.items():
+            for alias in (name, *name_aliases):
+                alias_key = key(alias)
+                if self._names.setdefault(alias_key, name) != name:
+                    raise ValueError(
+                        f"{alias!r} is an alias of both "
+                        f"{self._names[alias_key]!r} and {name!r}"
+                    )
+
+        self._root: None | _BKNode = None
+        for alias_key in self._names:
+            self._add(alias_key)
+
+        self.closest = functools.lru_cache(maxsize=fuzzy_cache_size)(self._closest)
+
+    def _add(self, alias: str) -> None:
+        if self._root is None:
+            self._root = _BKNode(alias)
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(alias, node.alias)
+            if distance in node.children:
+                node = node.children[distance]
+            else:
+                node.children[distance] = _BKNode(alias)
+                return
+
+    def exact(self, text: str) -> None | str:
+        """
+        the name text is an alias of, or None
+        """
+        return self._names.get(self.key(text))
+
+    def lookup(self, text: str) -> None | str:
+        """
+        the name text is an alias of, or the name of the one closest alias within
+        allowed_edits, or None
+        """
+        key = self.key(text)
+        name = self._names.get(key)
+        if name is None and allowed_edits(key):
+            name = self.closest(key)
+        return name
+
+    def _closest(self, key: str) -> None | str:
+        limit = allowed_edits(key)
+        # a swap is two edits to edit_distance, so search twice as far for them
+        radius = 2 * limit
+        distances: dict[str, int] = {}
+
+        # only the subtrees within radius of the node's distance can hold a match
+        pending = [] if self._root is None else [self._root]
+        while len(pending):
+            node = pending.pop()
+            distance = edit_distance(key, node.alias)
+            if distance <= radius:
+                distances[node.alias] = swap_distance(key, node.alias)
+            pending.extend(
+                child
+                for edge, child in node.children.items()
+                if distance - radius <= edge <= distance + radius
+            )
+
+        closest = min((d for d in distances.values() if d <= limit), default=None)
+        if closest is None:
+            return None
+        names = {self._names[a] for a, d in distances.items() if d == closest}
+        # as close to two names is too close to call
+        return names.pop() if len(names) == 1 else None
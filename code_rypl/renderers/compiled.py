@@ -0,0 +1,276 @@
+"""
+Renderers written as templates instead of python, eg: <renderers dir>/short.json
+
+    {
+        "player": "{call}{num}\\t{inst_school}'s {posn?, }{first} {last} ({num})",
+        "coach": "{call}{kind_abbv}\\t{inst_school}'s {kind}, {first} {last}",
+        "filename": "{call}{season}"
+    }
+
+player and coach are the replacement lines, filename (optional) is the name suggested
+when exporting. {field} is replaced by its value, {field?text} is the field followed
+by text or nothing at all if the field is empty (eg: "{posn?, }" above), and {{ and }}
+are literal braces. the fields are:
+    players: first, last, num, posn (without their escapes, like the default renderer)
+    coaches: first, last, kind, kind_num (counts the coaches of each kind so far),
+        kind_abbv (kind then kind_num, like the default renderer)
+    any line: call, inst_school, school_abbv, sport_abbv, sex, and the metadata as
+        entered: school, sport, category, season (without its escape)
+
+Each template is compiled once into python functions, the lines become f-strings
+with the metadata bound as closure variables, so a template renders about as fast
+as a renderer written by hand.
+"""
+
+from __future__ import annotations
+
+import re
+import json
+import pathlib
+
+from typing import *
+
+from .tools import strip_escape, abbreviate, normalize_title
+from .default import abbv_sport, abbv_sex, _strip_escape_column
+
+PLAYER_FIELDS = ("first", "last", "num", "posn")
+COACH_FIELDS = ("first", "last", "kind", "kind_num", "kind_abbv")
+META_FIELDS = (
+    "call",
+    "inst_school",
+    "school_abbv",
+    "sport_abbv",
+    "sex",
+    "school",
+    "sport",
+    "category",
+    "season",
+)
+
+_PLACEHOLDER = re.compile(r"\{\{|\}\}|\{(\w+)(?:\?([^{}]*))?\}|[{}]")
+
+
+class RendererTemplateError(ValueError):
+    pass
+
+
+class _Part(NamedTuple):
+    text: str  # the literal text, or the text after the field if it is not empty
+    field: None | str  # None for literal text
+
+
+def parse_line(template: str, fields: Sequence[str], what: str) -> list[_Part]:
+    """
+    eg: "{first} {posn?, }" -> [Part("", "first"), Part(" ", None), Part(", ", "posn")]
+    """
+    parts: list[_Part] = []
+    pos = 0
+    for match in _PLACEHOLDER.finditer(template):
+        if match.start() > pos:
+            parts.append(_Part(template[pos : match.start()], None))
+        pos = match.end()
+
+        token = match.group()
+        if token in {"{{", "}}"}:
+            parts.append(_Part(token[0], None))
+        elif match.group(1) is None:
+            raise RendererTemplateError(
+                f"unmatched {token!r} in the {what} template {template!r}, "
+                f"use {token * 2!r} for a literal brace"
+            )
+        elif match.group(1) not in fields:
+            raise RendererTemplateError(
+                f"unknown field {match.group(1)!r} in the {what} template, "
+                f"available are: {', '.join(fields)}"
+            )
+        else:
+            parts.append(_Part(match.group(2) or "", match.group(1)))
+    if pos < len(template):
+        parts.append(_Part(template[pos:], None))
+    return parts
+
+
+def _fstring(parts: list[_Part], constants: dict[str, str]) -> str:
+    """
+    the python source of an f-string for the line, the text after optional fields
+    is put in constants (backslashes are not allowed in f-string expressions)
+    """
+    source = []
+    for text, field in parts:
+        if field is None:
+            # repr escapes the text, only the braces (and a ' quote) are left to do
+            escaped = repr(text)
+            body = escaped[1:-1]
+            if escaped[0] == '"':
+                body = body.replace("'", "\\'")
+            source.append(body.replace("{", "{{").replace("}", "}}"))
+        elif len(text):
+            name = f"_after{len(constants)}"
+            constants[name] = text
+            source.append(f"{{({field} + {name}) if {field} else _EMPTY}}")
+        else:
+            source.append(f"{{{field}}}")
+    return "f'" + "".join(source) + "'"
+
+
+def _uses(parts: list[_Part], *fields: str) -> bool:
+    return any(part.field in fields for part in parts)
+
+
+class RendererTemplate(NamedTuple):
+    name: str
+    player: str
+    coach: str
+    filename: None | str = None
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> RendererTemplate:
+        with path.open("rb") as file:
+            try:
+                raw = json.load(file)
+            except ValueError as err:
+                raise RendererTemplateError(f"{path}: {err}") from None
+        if not isinstance(raw, dict):
+            raise RendererTemplateError(f"{path}: expected an object of templates")
+
+        unknown = set(raw) - {"player", "coach", "filename"}
+        if len(unknown):
+            raise RendererTemplateError(
+                f"{path}: unknown keys {', '.join(sorted(unknown))}, "
+                f"expected player, coach, and optionally filename"
+            )
+        for key in ("player", "coach"):
+            if not isinstance(raw.get(key), str):
+                raise RendererTemplateError(f"{path}: {key!r} must be a string")
+        if not isinstance(raw.get("filename", ""), str):
+            raise RendererTemplateError(f"{path}: 'filename' must be a string")
+        return cls(path.stem, raw["player"], raw["coach"], raw.get("filename"))
+
+    def source(self) -> str:
+        """
+        the python source of make(<meta fields>), which returns the render functions
+        """
+        player = parse_line(self.player, PLAYER_FIELDS + META_FIELDS, "player")
+        coach = parse_line(self.coach, COACH_FIELDS + META_FIELDS, "coach")
+        filename = (
+            None
+            if self.filename is None
+            else parse_line(self.filename, META_FIELDS, "filename")
+        )
+        constants: dict[str, str] = {}
+        player_line = _fstring(player, constants)
+        coach_line = _fstring(coach, constants)
+        counted = _uses(coach, "kind_num", "kind_abbv")
+
+        lines = [f"{name} = {text!r}" for name, text in constants.items()]
+        lines += [
+            f"def make(*, {', '.join(META_FIELDS)}):",
+            # the coaches seen of each kind, like the default renderer's _kind_abbv
+            "    counts = {}",
+            "    def count(kind):",
+            "        counts[kind] = num = counts.get(kind, 0) + 1",
+            "        return str(num)",
+            "",
+            "    def render_player(*, first, last, num, posn):",
+            "        first, last = strip_escape(first), strip_escape(last)",
+            "        num, posn = strip_escape(num), strip_escape(posn)",
+            f"        return {player_line}",
+            "",
+            "    def render_players(columns):",
+            "        firsts, lasts, nums, posns = map(_strip_escape_column, columns)",
+            f"        return [{player_line}",
+            "            for first, last, num, posn in zip(firsts, lasts, nums, posns)]",
+            "",
+            "    def render_coach(*, first, last, kind):",
+            f"        kind_num = {'count(kind)' if counted else '_EMPTY'}",
+            "        kind_abbv = kind + kind_num",
+            f"        return {coach_line}",
+            "",
+            "    def render_coaches(columns):",
+            "        firsts, lasts, kinds = columns",
+        ]
+        if counted:
+            lines += [
+                "        kind_nums = [count(kind) for kind in kinds]",
+                f"        return [{coach_line}",
+                "            for first, last, kind, kind_num, kind_abbv in zip(",
+                "                firsts, lasts, kinds, kind_nums,",
+                "                map(str.__add__, kinds, kind_nums))]",
+            ]
+        else:
+            lines += [
+                f"        return [{coach_line}",
+                "            for first, last, kind in zip(firsts, lasts, kinds)]",
+            ]
+        lines += [
+            "",
+            "    def suggested_filename():",
+            f"        return {'None' if filename is None else _fstring(filename, {})}",
+            "",
+            "    return render_player, render_players, render_coach, render_coaches, suggested_filename",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def compile(self, origin: str) -> Callable[..., tuple[Callable, ...]]:
+        namespace: dict[str, Any] = dict(
+            strip_escape=strip_escape,
+            _strip_escape_column=_strip_escape_column,
+            _EMPTY="",
+        )
+        exec(compile(self.source(), f"<renderer template {origin}>", "exec"), namespace)
+        return namespace["make"]
+
+
+class TemplateRenderer:
+    """
+    the base of the renderers made from templates, see compile_renderer
+    """
+
+    make: ClassVar[Callable[..., tuple[Callable, ...]]]
+    # the template file, the export cache uses it to tell when the renderer changed
+    source_file: ClassVar[str]
+
+    render_player: Callable[..., str]
+    render_players: Callable[[Sequence[Sequence[str]]], list[str]]
+    render_coach: Callable[..., str]
+    render_coaches: Callable[[Sequence[Sequence[str]]], list[str]]
+    suggested_filename: Callable[[], None | str]
+
+    def __init__(self, *, school: str, sport: str, category: str, season: str) -> None:
+        inst_school = normalize_title(school)
+        school_abbv = abbreviate(inst_school)
+        sport_abbv = abbv_sport(sport)
+        sex = abbv_sex(category)
+        (
+            self.render_player,
+            self.render_players,
+            self.render_coach,
+            self.render_coaches,
+            self.suggested_filename,
+        ) = self.make(
+            call=f"{school_abbv}{sex}{sport_abbv}",
+            inst_school=inst_school,
+            school_abbv=school_abbv,
+            sport_abbv=sport_abbv,
+            sex=sex,
+            school=school,
+            sport=sport,
+            category=category,
+            season=strip_escape(season),
+        )
+
+
+def compile_renderer(path: pathlib.Path) -> Type[TemplateRenderer]:
+    """
+    a RplmFileRenderer class from the template file at path
+    """
+    template = RendererTemplate.load(path)
+    try:
+        make = template.compile(str(path))
+    except RendererTemplateError as err:
+        raise RendererTemplateError(f"{path}: {err}") from None
+    return type(
+        f"TemplateRenderer_{template.name}",
+        (TemplateRenderer,),
+        dict(make=staticmethod(make), source_file=str(path)),
+    )
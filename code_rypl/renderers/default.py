@@ -9,6 +9,7 @@ from .tools import (
     remove_prepositions,
     normalize_category,
     sport_abrev_to_formal_name,
+    sport_aliases,
     matchify,
     norm_or_pass,
 )
@@ -39,14 +40,18 @@ def _strong_strip(st):
     return "".join(st.lower().split())
 
 
+_SPORT_ABBREVIATIONS = {
+    formal: abbv for abbv, formal in sport_abrev_to_formal_name.items()
+}
+
+
 def abbv_sport(sport: str) -> str:
     """
     Abbreviates a sport name.
     """
-    matchable = matchify(sport)
-    for abbv, formal in sport_abrev_to_formal_name.items():
-        if matchable in {abbv, matchify(formal)}:
-            return abbv
+    formal = sport_aliases.lookup(sport)
+    if formal is not None:
+        return _SPORT_ABBREVIATIONS[formal]
     raise SportsAbbreviationError(
         f"{sport!r} is not a valid sport. valid sports are: {', '.join(map(repr,sorted(sport_abrev_to_formal_name.keys())))}"
     )
@@ -67,6 +72,12 @@ def abbv_sex(text: str) -> str:
         raise SexError(f"unkown sex {text!r}, allowed include men, women, and none")
 
 
+def _strip_escape_column(column: Sequence[str]) -> list[str]:
+    # columns repeat a lot (numbers, positions), strip each distinct value once
+    stripped = {value: strip_escape(value) for value in set(column)}
+    return list(map(stripped.__getitem__, column))
+
+
 class RplmFileRenderer:
     def __init__(self, *, school: str, sport: str, category: str, season: str) -> None:
 
@@ -108,6 +119,21 @@ class RplmFileRenderer:
             )
         )
 
+    def render_players(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        """
+        the same lines as render_player, for the players given as columns
+        (first, last, num, posn)
+        """
+        firsts, lasts, nums, posns = map(_strip_escape_column, columns)
+        call, school = self.call, self.inst_school
+        return [
+            f"{call}{num}\t{school}'s {posn}{first} {last} ({num}), "
+            f"\t{first} {last} ({num}), \t{last}"
+            for first, last, num, posn in zip(
+                firsts, lasts, nums, (f"{p}, " if len(p) else "" for p in posns)
+            )
+        ]
+
     def render_coach(self, *, first: str, last: str, kind: str) -> str:
         """
         returns the output line into the exported  file for the coach
@@ -123,6 +149,21 @@ class RplmFileRenderer:
             )
         )
 
+    def render_coaches(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        """
+        the same lines as render_coach, for the coaches given as columns
+        (first, last, kind)
+        """
+        firsts, lasts, kinds = columns
+        call, school = self.call, self.inst_school
+        # in order, the kind abbreviations count the coaches of each kind
+        kind_abs = [self._kind_abbv(kind) for kind in kinds]
+        return [
+            f"{call}{kind_ab}\t{school}'s {kind}, {first} {last}, "
+            f"\t{first} {last}, \t{last}"
+            for first, last, kind, kind_ab in zip(firsts, lasts, kinds, kind_abs)
+        ]
+
     def _kind_abbv(self, kind: str) -> str:
         # increment the kind for the next coach or make it 1 if it doesn't exist
         self.coaches[kind] = self.coaches.get(kind, 0) + 1
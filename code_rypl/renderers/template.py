@@ -23,3 +23,25 @@ class RplmFileRenderer(Protocol):
         returns the output line into the exported  file for the coach
         """
         ...
+
+
+@runtime_checkable
+class BatchRplmFileRenderer(RplmFileRenderer, Protocol):
+    """
+    a renderer that can also render many rows at once, these are optional and
+    the export uses them (over render_player/render_coach) when a renderer has them
+    """
+
+    def render_players(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        """
+        returns the output lines for the players given as columns, in the
+        order first, last, num, posn (ie: columns[0][n] is the nth player's first name)
+        """
+        ...
+
+    def render_coaches(self, columns: Sequence[Sequence[str]]) -> list[str]:
+        """
+        returns the output lines for the coaches given as columns, in the
+        order first, last, kind
+        """
+        ...
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from typing import *
 
+from .aliases import AliasIndex
+
 sport_abrev_to_formal_name = {
     "hky": "Hockey",
     "bball": "Basketball",
@@ -127,20 +129,28 @@ def normalize_school(school: str) -> None | str:
         return normalize_title(school)
 
 
+# the sports by any of their names, eg: "hky", "hockey", and "hocky" are all Hockey
+sport_aliases = AliasIndex(
+    {formal: [abbrev] for abbrev, formal in sport_abrev_to_formal_name.items()},
+    key=matchify,
+)
+
+
 def normalize_sports(sport: str) -> None | str:
 
     # if the starts starts with a colon then only stip (including the space after the colon)
     if isescaped(sport):
         return ":" + strip_escape(sport)
 
-    matchable = matchify(sport)
+    return sport_aliases.lookup(sport)
 
-    # if the sport a value in the known_sport_abbrevs then return the key
-    for abbrev, full_name in sport_abrev_to_formal_name.items():
-        if matchable in {abbrev, matchify(full_name)}:
-            return full_name
-    else:
-        return None
+
+def _category_key(raw_cato: str) -> str:
+    # eg: "Women's", "womens", and "women" are all "women"
+    return matchify(raw_cato).rstrip("s'").replace(" ", "").replace("-", "")
+
+
+category_aliases = AliasIndex(category_formal_to_variations, key=_category_key)
 
 
 def normalize_category(raw_cato: str) -> None | str:
@@ -148,16 +158,7 @@ def normalize_category(raw_cato: str) -> None | str:
     if isescaped(raw_cato):
         return ":" + strip_escape(raw_cato)
 
-    matchable = matchify(raw_cato).rstrip("s'").replace(" ", "").replace("-", "")
-
-    for (
-        formal,
-        variations,
-    ) in category_formal_to_variations.items():
-        if matchable in variations:
-            return formal
-    else:
-        return None
+    return category_aliases.lookup(raw_cato)
 
 
 def normalize_season(season: str) -> None | str:
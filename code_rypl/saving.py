@@ -0,0 +1,94 @@
+"""
+Crash safe saving of .rplm files (see model.BackgroundSaver to save off of the GUI
+thread).
+
+Files are written to a temp file next to the target, fsync'd, and renamed over it,
+so a crash or a full disk mid-save leaves the previous file intact.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import pathlib
+import tempfile
+import contextlib
+
+from typing import *
+
+# permissions for newly created files, existing files keep their own
+NEW_FILE_MODE = 0o644
+
+
+def same_contents(path: pathlib.Path, chunks: Iterable[bytes]) -> bool:
+    """
+    compares the chunks against the file without holding either in memory, stops
+    at the first difference
+    """
+    with path.open("rb") as existing:
+        for chunk in chunks:
+            if existing.read(len(chunk)) != chunk:
+                return False
+        return existing.read(1) == b""
+
+
+def write_atomically(filename: str, chunks: Callable[[], Iterable[bytes]]) -> bool:
+    """
+    replaces the file with the bytes from chunks(), returns False (and does not
+    touch the disk) if the file already holds exactly those bytes.
+    chunks is called once or twice, each call must produce the same bytes
+    """
+    path = pathlib.Path(filename)
+    if path.is_file() and same_contents(path, chunks()):
+        return False
+
+    with replacing(filename, "wb") as tmp:
+        for chunk in chunks():
+            tmp.write(chunk)
+    return True
+
+
+@contextlib.contextmanager
+def replacing(filename: str, mode: str, **open_args: Any) -> Iterator[IO]:
+    """
+    a temp file next to filename that is renamed over it once the block finishes,
+    if the block raises the temp file is removed and filename is left as it was.
+    mode is "w" or "wb", open_args are passed to open (eg: encoding, newline)
+    """
+    path = pathlib.Path(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, **open_args) as tmp:
+            yield tmp
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+        if path.exists():
+            shutil.copymode(path, tmpname)
+        else:
+            os.chmod(tmpname, NEW_FILE_MODE)
+        os.replace(tmpname, path)
+    except BaseException:
+        try:
+            os.unlink(tmpname)
+        except OSError:
+            pass
+        raise
+
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: pathlib.Path) -> None:
+    # make the rename itself durable, not supported on windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,173 @@
+"""
+Validation of the data read from .rplm files.
+
+The checks for each row type are compiled (once) from its field_spec into a
+function that validates a whole section in one pass and builds the rows through
+Rplm.trusted, skipping the per-row checks of Rplm.__init__. Every problem found is
+collected, with its section and row number, into one RplmFileError.
+"""
+
+from __future__ import annotations
+
+from typing import *
+
+if TYPE_CHECKING:
+    from .core import Rplm
+
+# problems kept in an RplmFileError, the rest are only counted
+MAX_PROBLEMS = 100
+
+
+class Problem(NamedTuple):
+    section: str
+    row: None | int  # None for problems not about a specific row
+    message: str
+
+    def __str__(self) -> str:
+        where = self.section if self.row is None else f"{self.section}[{self.row}]"
+        return f"{where}: {self.message}"
+
+
+class RplmFileError(Exception):
+    def __init__(self, source: str, problems: Problems) -> None:
+        self.source = source
+        self.problems = list(problems)
+        self.num_problems = problems.total
+        shown = "\n".join(f"  {problem}" for problem in self.problems)
+        more = self.num_problems - len(self.problems)
+        super().__init__(
+            f"{self.num_problems} problem(s) in {source}:\n{shown}"
+            + (f"\n  ... and {more} more" if more else "")
+        )
+
+
+class Problems(list):
+    """
+    the problems found so far, only the first MAX_PROBLEMS are kept
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.total = 0
+
+    def add(self, section: str, row: None | int, message: str) -> None:
+        self.total += 1
+        if len(self) < MAX_PROBLEMS:
+            self.append(Problem(section, row, message))
+
+    def raise_any(self, source: str) -> None:
+        if self.total:
+            raise RplmFileError(source, self)
+
+
+def check_meta(meta: Any, metadata_spec: Iterable[str], problems: Problems) -> bool:
+    if not isinstance(meta, dict):
+        problems.add("meta", None, f"expected a map, got {type(meta).__name__}")
+        return False
+    return _check_fields(meta, set(metadata_spec), "meta", None, problems)
+
+
+def _check_fields(
+    item: dict, expected: set[str], section: str, row: None | int, problems: Problems
+) -> bool:
+    ok = True
+    if len(missing := expected - set(item)):
+        problems.add(section, row, f"missing fields {sorted(missing)}")
+        ok = False
+    if len(extra := set(item) - expected):
+        problems.add(section, row, f"unexpected fields {sorted(map(str, extra))}")
+        ok = False
+    for field in sorted(expected & set(item)):
+        if type(item[field]) is not str:
+            problems.add(
+                section,
+                row,
+                f"field {field!r} should be a str, got {type(item[field]).__name__}",
+            )
+            ok = False
+    return ok
+
+
+def _explain_row(
+    rplm_type: Type[Rplm], section: str, row: int, item: Any, problems: Problems
+) -> None:
+    # the slow path, only taken for rows the compiled check rejected
+    if not isinstance(item, dict):
+        problems.add(section, row, f"expected a map, got {type(item).__name__}")
+    else:
+        _check_fields(item, set(rplm_type.field_spec), section, row, problems)
+
+
+SectionValidator = Callable[[Iterable[Any], Problems], Iterator["Rplm"]]
+RowFactory = Callable[..., "Rplm"]
+
+_validators: dict[tuple[type, str], SectionValidator] = {}
+_row_factories: dict[type, RowFactory] = {}
+
+
+def section_validator(rplm_type: Type[Rplm], section: str) -> SectionValidator:
+    """
+    the compiled validator for maps of rplm_type's fields (the v1 layout), it
+    yields the rows built from the valid maps and adds problems for the rest
+    """
+    key = (rplm_type, section)
+    validator = _validators.get(key)
+    if validator is None:
+        validator = _validators[key] = _compile_section_validator(rplm_type, section)
+    return validator
+
+
+def row_factory(rplm_type: Type[Rplm]) -> RowFactory:
+    """
+    a compiled rplm_type.trusted taking the columns as separate arguments
+    (eg: for map(factory, *columns))
+    """
+    factory = _row_factories.get(rplm_type)
+    if factory is None:
+        factory = _row_factories[rplm_type] = _compile_row_factory(rplm_type)
+    return factory
+
+
+def _compile_row_factory(rplm_type: Type[Rplm]) -> RowFactory:
+    args = ", ".join(f"c{col}" for col in range(rplm_type.num_cols()))
+    cols = ", ".join(f"{col}: c{col}" for col in range(rplm_type.num_cols()))
+    source = f"def build({args}):\n    return trusted({{{cols}}})\n"
+    return _compile(source, "build", trusted=rplm_type.trusted)
+
+
+def _compile_section_validator(rplm_type: Type[Rplm], section: str) -> SectionValidator:
+    spec = rplm_type.field_spec
+    fields = sorted(spec, key=spec.__getitem__)  # in column order
+    names = [f"v{spec[field]}" for field in fields]
+
+    lines = [
+        "def validate(items, problems):",
+        "    for row, item in enumerate(items):",
+        "        if type(item) is dict and item.keys() == expected:",
+        f"            {', '.join(names)}, = "
+        + ", ".join(f"item[{f!r}]" for f in fields),
+        "            if " + " and ".join(f"type({n}) is str" for n in names) + ":",
+        "                rplm = new(rplm_type)",
+        "                rplm._cols = {"
+        + ", ".join(f"{spec[f]}: {n}" for f, n in zip(fields, names))
+        + "}",
+        "                yield rplm",
+        "                continue",
+        "        explain(rplm_type, section, row, item, problems)",
+    ]
+    # the inlined equivalent of rplm_type.trusted
+    return _compile(
+        "\n".join(lines) + "\n",
+        "validate",
+        new=object.__new__,
+        expected=set(spec),
+        explain=_explain_row,
+        rplm_type=rplm_type,
+        section=section,
+    )
+
+
+def _compile(source: str, name: str, **namespace: Any) -> Any:
+    code = compile(source, f"<compiled {name}>", "exec")
+    exec(code, namespace)
+    return namespace[name]
@@ -0,0 +1,108 @@
+"""
+Completing school names from a directory of institutions, a text file with a name
+per line (~/.code_rypl/schools.txt, or $CODE_RYPL_SCHOOLS_FILE).
+
+A name can be found from the start of any of its words, so "state" finds "Ohio
+State University" (after the names that start with "state"). The index is a trie
+flattened into sorted lists: every word start of every name is a key, and the keys
+under a prefix are a contiguous run of the sorted list found with a bisect. So a
+keystroke costs a bisect and a walk over the completions it returns, however many
+names there are, and thousands of names do not cost a node per character.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import bisect
+import pathlib
+
+from typing import *
+
+# completions returned for each keystroke
+COMPLETION_LIMIT = 50
+
+# where a word starts, eg: "Texas A&M University-Commerce" has 4
+_WORD_START = re.compile(r"(?:^|(?<=[\s\-/(]))\w")
+
+
+def schools_path() -> pathlib.Path:
+    override = os.environ.get("CODE_RYPL_SCHOOLS_FILE")
+    if override:
+        return pathlib.Path(override)
+    return pathlib.Path.home() / ".code_rypl" / "schools.txt"
+
+
+def _key(text: str) -> str:
+    # case and spacing do not matter
+    return " ".join(text.casefold().split())
+
+
+class SchoolIndex:
+    """
+    the names of the schools, searchable from the start of any word
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        # in order, without repeats (eg: the same name in two places)
+        self.names = list(dict.fromkeys(filter(None, map(str.strip, names))))
+
+        # (key, name index) for where the names start, then for their other words.
+        # the names starting with what was typed come first
+        starts: list[tuple[str, int]] = []
+        inner: list[tuple[str, int]] = []
+        for index, name in enumerate(self.names):
+            key = _key(name)
+            starts.append((key, index))
+            inner.extend(
+                (key[match.start() :], index)
+                for match in _WORD_START.finditer(key)
+                if match.start() > 0
+            )
+
+        self._runs = []
+        for entries in (starts, inner):
+            entries.sort()
+            self._runs.append(
+                ([key for key, _ in entries], [index for _, index in entries])
+            )
+
+    @classmethod
+    def load(cls, path: None | pathlib.Path = None) -> SchoolIndex:
+        """
+        the schools in the file (a name per line, # for comments), none if there is
+        no such file
+        """
+        path = schools_path() if path is None else path
+        try:
+            with path.open(encoding="utf-8") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return cls(())
+        return cls(line for line in lines if not line.lstrip().startswith("#"))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def complete(self, typed: str, limit: int = COMPLETION_LIMIT) -> list[str]:
+        """
+        the names with a word starting with typed, those that start with it first
+        """
+        key = _key(typed)
+        if not len(key):
+            return []
+
+        found: list[str] = []
+        seen: set[int] = set()
+        for keys, indices in self._runs:
+            for at in range(bisect.bisect_left(keys, key), len(keys)):
+                if not keys[at].startswith(key):
+                    break
+                index = indices[at]
+                if index in seen:
+                    continue
+                seen.add(index)
+                found.append(self.names[index])
+                if len(found) >= limit:
+                    return found
+        return found
@@ -4,11 +4,13 @@ import sys
 from typing import *
 
 from .model import *
+from .matching import ColumnMatcher
 
 from PySide6.QtCore import (
     Qt,
     QEvent,
     QObject,
+    QStringListModel,
 )
 
 from PySide6.QtWidgets import (
@@ -38,46 +40,97 @@ class ColumnItemDeleagate(QStyledItemDelegate):
 
 
 class ColumnCompleter(QCompleter):
+    """
+    completes from the column's values ranked by matching.ColumnMatcher, inline
+    while the best match starts with what was typed, otherwise as a popup of all
+    the matches (eg: "hdc" -> "Head Coach")
+    """
+
     def __init__(
         self,
-        completions: Sequence[str],
+        completions: ColumnValueIndex,
         parent: Optional[QObject] = None,
+        carried_over: Iterable[str] = (),
     ) -> None:
         self._completions = completions
-        super().__init__(completions, parent)
-        self.setCaseSensitivity(Qt.CaseInsensitive)
-
-        self.setFilterMode(Qt.MatchStartsWith)
-        self.setCompletionMode(QCompleter.InlineCompletion)
-        # self.setFilterMode(Qt.MatchContains)
-        # self.setCompletionMode(QCompleter.PopupCompletion)
-
-    # TODOL when there is on suggestion switch to inline suggestions
-    # def adjust_mode(self, *args) -> None:
-    #     print("adjusting mode", *args)
-    #     completions = self._completions
-    #     if len(completions) == 1:
-    #         self.setFilterMode(Qt.MatchStartsWith)
-    #         self.setCompletionMode(QCompleter.InlineCompletion)
-    #     else:
-    #         self.setFilterMode(Qt.MatchContains)
-    #         self.setCompletionMode(QCompleter.PopupCompletion)
+        super().__init__(parent)
+        self.matcher = ColumnMatcher(
+            completions.values(), completions.count, carried_over
+        )
+        # the matches for what was typed, in order
+        self.completion_model = QStringListModel(self)
+        self.setModel(self.completion_model)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setFilterMode(Qt.MatchFlag.MatchStartsWith)
+        self.setCompletionMode(QCompleter.CompletionMode.InlineCompletion)
+
+        # the column's values change as the list is edited
+        completions.rowsInserted.connect(self._values_inserted)
+        completions.rowsAboutToBeRemoved.connect(self._values_removed)
+        # a method, not a lambda, so it is disconnected once the completer is deleted
+        completions.modelReset.connect(self._values_reset)
+
+    def _value(self, row: int) -> str:
+        completions = self._completions
+        return completions.data(completions.index(row), Qt.ItemDataRole.EditRole)
+
+    def _values_inserted(self, _, first: int, last: int) -> None:
+        for row in range(first, last + 1):
+            self.matcher.add(self._value(row))
+
+    def _values_removed(self, _, first: int, last: int) -> None:
+        for row in range(first, last + 1):
+            self.matcher.discard(self._value(row))
+
+    def _values_reset(self) -> None:
+        self.matcher.reset(self._completions.values())
+
+    def set_typed(self, text: str) -> None:
+        """
+        update the matches, connected to the editor's textEdited so they are ready
+        before the line edit asks for a completion
+        """
+        matches = self.matcher.complete(text)
+        inline = len(matches) > 0 and matches[0].casefold().startswith(text.casefold())
+        self.setCompletionMode(
+            QCompleter.CompletionMode.InlineCompletion
+            if inline
+            else QCompleter.CompletionMode.UnfilteredPopupCompletion
+        )
+        self.completion_model.setStringList(matches)
 
 
 class ColumnCompleterDelegate(ColumnItemDeleagate):
+
+    _completer: None | ColumnCompleter = None
+
     def createEditor(self, parent, option, index):
 
         self.editor = editor = QLineEdit(parent)
 
         editor.installEventFilter(self._table)
 
-        completionlist = self._table._rplm_list.get_col_set(index.column())
-
-        completer = ColumnCompleter(completionlist, parent)
+        # the RplmList keeps the column's values up to date, so the completer only
+        # needs replacing when a different list (ie file) is loaded into the table
+        completions = self._table._rplm_list.column_values(index.column())
+        if self._completer is None or self._completer._completions is not completions:
+            if self._completer is not None:
+                # the last list's, it is parented to the table so would never be freed
+                self._completer.deleteLater()
+            self._completer = ColumnCompleter(
+                completions,
+                self._table,
+                carried_over=self._table.carried_over(index.column()),
+            )
 
-        editor.setCompleter(completer)
+        editor.textEdited.connect(self._completer.set_typed)
+        editor.setCompleter(self._completer)
         return editor
 
+    def set_carried_over(self, values: Iterable[str]) -> None:
+        if self._completer is not None:
+            self._completer.matcher.set_carried_over(values)
+
 
 # class CoachItemDelegate(ColumnCompleterDelegate):
 #     def createEditor(self, parent, option, index):
@@ -108,6 +161,9 @@ class RplmTableView(QTableView):
             assert col < num_cols, f"col {col} is out of range, has to be < {num_cols}"
             self.setItemDelegateForColumn(col, delegate_type(self))
 
+        # completions from elsewhere (eg: an earlier season) for each column
+        self._carried_over: dict[int, tuple[str, ...]] = {}
+
         self._init_format()
 
         # navigation state
@@ -118,6 +174,19 @@ class RplmTableView(QTableView):
         rplm_ls.set_selected_cell = self.setCurrentIndex
         self.setModel(rplm_ls)
 
+    def carried_over(self, col: int) -> tuple[str, ...]:
+        return self._carried_over.get(col, ())
+
+    def set_carried_over(self, col: int, values: Iterable[str]) -> None:
+        """
+        also complete the column with values (eg: the last names of an earlier
+        season), ranked after the values already in the column
+        """
+        self._carried_over[col] = values = tuple(values)
+        delegate = self.itemDelegateForColumn(col)
+        if isinstance(delegate, ColumnCompleterDelegate):
+            delegate.set_carried_over(values)
+
     def _init_format(self):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
@@ -208,17 +277,24 @@ class RplmTableView(QTableView):
 
     def eventFilter(self, _, event) -> bool:
 
-        index = self.currentIndex()
+        # input sanitation, every event of the table and its editors comes here
+        if event.type() != QEvent.KeyPress:
+            return False
 
-        # input sanitation
-        if not index.isValid() or event.type() != QEvent.KeyPress:
+        index = self.currentIndex()
+        if not index.isValid():
             return False
 
-        is_enter = event.key() == Qt.Key_Enter or event.key() == Qt.Key_Return
-        is_tab = event.key() == Qt.Key_Tab
-        is_backtab = event.key() == Qt.Key_Backtab
-        is_delete = event.key() == Qt.Key_Delete or event.key() == Qt.Key_Backspace
-        is_escape = event.key() == Qt.Key_Escape
+        key = event.key()
+        is_enter = key == Qt.Key_Enter or key == Qt.Key_Return
+        is_tab = key == Qt.Key_Tab
+        is_backtab = key == Qt.Key_Backtab
+        is_delete = key == Qt.Key_Delete or key == Qt.Key_Backspace
+        is_escape = key == Qt.Key_Escape
+
+        # other keys (eg: typing) go on to the editor without looking at the rows
+        if not (is_enter or is_tab or is_backtab or is_delete):
+            return False
 
         with_shift = event.modifiers() & Qt.ShiftModifier
         with_control = event.modifiers() & Qt.MetaModifier
@@ -229,28 +305,24 @@ class RplmTableView(QTableView):
         at_last_col = index.column() == self._num_cols - 1
 
         # TODO: above line needs to be two variables for proper tab/enter behavior
-        row_empty = self._rplm_list.get_rplm(index.row()).isempty()
-        cell_was_empty = (
-            self._rplm_list.get_rplm_field(index.row(), index.column()) == ""
-        )
-        if is_tab:
-            print("tab")
+        # (only looked up by the branches that need it)
+        def row_empty() -> bool:
+            return self._rplm_list.get_rplm(index.row()).isempty()
 
         if is_delete and with_shift:
             self.remove_selected_row()
             return True
         elif is_delete:
-            self._rplm_list.get_rplm(index.row()).set_col(index.column(), "")
-            self._rplm_list.refresh()
+            self._rplm_list.set_rplm_field(index.row(), index.column(), "")
             return True
         elif is_tab and at_bottom and at_last_col:
-            if row_empty:
+            if row_empty():
                 self.go_col(0)
             else:
                 self.insert_below()
             return True
         if is_tab and at_last_col:
-            if row_empty:
+            if row_empty():
                 self.go_col(0)
             else:
                 self.go(index.row() + 1, 0)
@@ -272,7 +344,7 @@ class RplmTableView(QTableView):
                 self.insert_below()
                 return True
             elif at_bottom and in_opt_col:
-                if row_empty:
+                if row_empty():
                     self.go_col(0)
                 else:
                     self.insert_below()
@@ -281,7 +353,7 @@ class RplmTableView(QTableView):
                 self.move_down()
                 self.go_col(0)
                 return True
-            if row_empty and at_bottom:
+            if row_empty() and at_bottom:
                 return True
             else:
                 # this gate prenet an enter down after an insert into a row above
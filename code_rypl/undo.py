@@ -0,0 +1,162 @@
+"""
+Undo / redo for the RplmLists of a document.
+
+The journal keeps the compact Edit records (see edits.py) the lists report rather
+than snapshots of the document, and forgets the oldest steps once they take more
+than a byte budget.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+
+from typing import *
+
+from .edits import Edit, CellSet
+
+if TYPE_CHECKING:
+    from .core import RplmRows
+
+DEFAULT_BYTE_BUDGET = 8 * 1024 * 1024  # 8 MiB
+# consecutive sets of the same cell within this many seconds are one undo step
+DEFAULT_COALESCE_SECONDS = 2.0
+
+
+class UndoStep(NamedTuple):
+    rplm_list: RplmRows
+    edit: Edit
+    timestamp: float
+    nbytes: int
+
+
+class UndoJournal:
+    def __init__(
+        self,
+        *rplm_lists: RplmRows,
+        byte_budget: int = DEFAULT_BYTE_BUDGET,
+        coalesce_seconds: float = DEFAULT_COALESCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.byte_budget = byte_budget
+        self.coalesce_seconds = coalesce_seconds
+        self._clock = clock
+
+        self._undo: deque[UndoStep] = deque()
+        self._redo: list[UndoStep] = []
+        self._nbytes = 0
+
+        # set while undoing/redoing so the replayed edits are not journaled again
+        self._replaying = False
+
+        for rplm_list in rplm_lists:
+            self.attach(rplm_list)
+
+    def attach(self, rplm_list: RplmRows) -> None:
+        rplm_list.edit_listeners.append(self._record)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(undo={len(self._undo)}, redo={len(self._redo)}, "
+            f"nbytes={self._nbytes}/{self.byte_budget})"
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        the estimated memory held by the undo and redo steps
+        """
+        return self._nbytes
+
+    def can_undo(self) -> bool:
+        return len(self._undo) > 0
+
+    def can_redo(self) -> bool:
+        return len(self._redo) > 0
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._nbytes = 0
+
+    def undo(self) -> bool:
+        """
+        reverts the last edit, returns False if there was nothing to undo
+        """
+        if not self.can_undo():
+            return False
+        step = self._undo.pop()
+        self._replay(step, step.edit.revert)
+        self._redo.append(step)
+        return True
+
+    def redo(self) -> bool:
+        """
+        re-applies the last undone edit, returns False if there was nothing to redo
+        """
+        if not self.can_redo():
+            return False
+        step = self._redo.pop()
+        self._replay(step, step.edit.apply)
+        self._undo.append(step)
+        return True
+
+    def _replay(self, step: UndoStep, action: Callable[[RplmRows], None]) -> None:
+        self._replaying = True
+        try:
+            action(step.rplm_list)
+        finally:
+            self._replaying = False
+
+        rplm_list = step.rplm_list
+        row, col = step.edit.focus()
+        rplm_list.select_cell(min(row, len(rplm_list) - 1), col)
+
+    def _record(self, rplm_list: RplmRows, edit: Edit) -> None:
+        if self._replaying:
+            return
+
+        # a new edit forks the history, the undone steps can no longer be redone
+        for step in self._redo:
+            self._nbytes -= step.nbytes
+        self._redo.clear()
+
+        now = self._clock()
+        if self._coalesce(rplm_list, edit, now):
+            return
+
+        step = UndoStep(rplm_list, edit, now, edit.nbytes())
+        self._undo.append(step)
+        self._nbytes += step.nbytes
+        self._enforce_budget()
+
+    def _coalesce(self, rplm_list: RplmRows, edit: Edit, now: float) -> bool:
+        """
+        merges a cell set into the last step if it set the same cell moments ago
+        """
+        if not isinstance(edit, CellSet) or not self.can_undo():
+            return False
+
+        last = self._undo[-1]
+        if not (
+            isinstance(last.edit, CellSet)
+            and last.rplm_list is rplm_list
+            and last.edit.focus() == edit.focus()
+            and now - last.timestamp <= self.coalesce_seconds
+        ):
+            return False
+
+        self._undo.pop()
+        self._nbytes -= last.nbytes
+
+        merged = last.edit._replace(new=edit.new)
+        if merged.old != merged.new:  # typed then un-typed, nothing to undo
+            step = UndoStep(rplm_list, merged, now, merged.nbytes())
+            self._undo.append(step)
+            self._nbytes += step.nbytes
+        return True
+
+    def _enforce_budget(self) -> None:
+        # always keep the latest step, even when it alone is over budget
+        while self._nbytes > self.byte_budget and len(self._undo) > 1:
+            self._nbytes -= self._undo.popleft().nbytes
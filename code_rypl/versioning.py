@@ -12,11 +12,17 @@ test script:
 
 
 import sys
+import json
+import pathlib
 import datetime
 from typing import *
-import git
 from enum import Enum
 
+# dev builds cache their git info in the repo's git dir, keyed by what HEAD points
+# at, so starting from a checkout only imports GitPython (and runs git) after a
+# commit or a branch switch
+BUILD_INFO_CACHE = "code_rypl_build_info.json"
+
 
 class BuildMode(Enum):
     dev = "dev"
@@ -32,6 +38,77 @@ class BuildMode(Enum):
         # fmt: on
 
 
+def _find_git_dir(start: pathlib.Path) -> None | pathlib.Path:
+    for directory in (start, *start.parents):
+        dotgit = directory / ".git"
+        if dotgit.is_dir():
+            return dotgit
+        elif dotgit.is_file():  # a worktree or submodule points at its git dir
+            text = dotgit.read_text().strip()
+            if text.startswith("gitdir:"):
+                return (directory / text[len("gitdir:") :].strip()).resolve()
+    return None
+
+
+def _read_head(git_dir: pathlib.Path) -> None | tuple[str, str]:
+    """
+    the (branch name, commit hash) HEAD points at, read straight from the git dir.
+    None when it cannot be worked out that way (eg: a detached HEAD)
+    """
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: refs/heads/"):
+            return None
+        ref = head[len("ref: ") :]
+
+        # worktrees keep their branches in the main git dir
+        common_dir = git_dir
+        if (git_dir / "commondir").is_file():
+            common_dir = git_dir / (git_dir / "commondir").read_text().strip()
+
+        for refs_dir in (git_dir, common_dir):
+            if (refs_dir / ref).is_file():
+                return ref[len("refs/heads/") :], (refs_dir / ref).read_text().strip()
+        for line in (common_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(f" {ref}"):
+                return ref[len("refs/heads/") :], line.split(" ", 1)[0]
+    except OSError:
+        pass
+    return None
+
+
+def dev_build_info() -> tuple[str, str]:
+    """
+    the (branch name, build number) of the checkout run from
+    """
+    git_dir = _find_git_dir(pathlib.Path.cwd())
+    head = None if git_dir is None else _read_head(git_dir)
+
+    cache_path = None if git_dir is None else git_dir / BUILD_INFO_CACHE
+    if head is not None and cache_path is not None:
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached["head"] == list(head):
+                return cached["branch"], cached["build_number"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    import git  # slow to import, so only when the cache is missing or stale
+
+    repo = git.Repo(search_parent_directories=True)
+    branch = repo.active_branch.name
+    build_number = repo.git.rev_parse(repo.active_branch.commit.hexsha, short=7)
+
+    if head is not None and cache_path is not None:
+        try:
+            cache_path.write_text(
+                json.dumps(dict(head=head, branch=branch, build_number=build_number))
+            )
+        except OSError:
+            pass
+    return branch, build_number
+
+
 # ===== possible pre-processed values =====
 # === DO NOT CHANGE THESE LINES ====
 # START
@@ -71,10 +148,8 @@ if not __pre_processed__:
     assert __build_mode__ is None
     assert __build_number__ == ""
 
-    repo = git.Repo(search_parent_directories=True)
-    __branch_name__ = repo.active_branch.name
+    __branch_name__, __build_number__ = dev_build_info()
     __build_mode__ = BuildMode.dev
-    __build_number__ = repo.git.rev_parse(repo.active_branch.commit.hexsha, short=7)
 
 
 def full_version() -> str: